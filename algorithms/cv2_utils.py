@@ -1,10 +1,46 @@
 """
 OpenCV工具函数，支持中文字符绘制
 """
+import platform
+from functools import lru_cache
+
 import cv2
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont
-from typing import Tuple, Optional
+from typing import List, Optional, Sequence, Tuple
+
+TextItem = Tuple[str, Tuple[int, int]]
+
+# 各系统的默认字体
+if platform.system() == 'Windows':
+    DEFAULT_FONT_PATH = 'C:/Windows/Fonts/msyh.ttc'  # 微软雅黑
+elif platform.system() == 'Darwin':  # macOS
+    DEFAULT_FONT_PATH = '/System/Library/Fonts/PingFang.ttc'
+else:  # Linux
+    DEFAULT_FONT_PATH = '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'
+
+@lru_cache(maxsize=32)
+def load_font(font_path: Optional[str], font_size: int):
+    """
+    加载字体（按路径和字号缓存，避免每次绘制都从磁盘读取字体文件）
+    
+    指定字体加载失败时依次回退到系统字体和PIL默认字体（可能不支持中文），都失败时返回 None
+    """
+    for path in (font_path, DEFAULT_FONT_PATH):
+        if not path:
+            continue
+        try:
+            return ImageFont.truetype(path, font_size)
+        except (OSError, ValueError):
+            continue
+    try:
+        return ImageFont.load_default()
+    except Exception:
+        return None
+
+def has_chinese(text: str) -> bool:
+    """检查文本是否包含中文字符"""
+    return any('\u4e00' <= char <= '\u9fff' for char in text)
 
 def put_chinese_text(img: np.ndarray, text: str, position: Tuple[int, int], 
                     font_size: int = 20, color: Tuple[int, int, int] = (0, 255, 0),
@@ -35,31 +71,8 @@ def put_chinese_text(img: np.ndarray, text: str, position: Tuple[int, int],
     # 创建绘图对象
     draw = ImageDraw.Draw(img_pil)
     
-    # 尝试加载字体
-    font = None
-    if font_path:
-        try:
-            font = ImageFont.truetype(font_path, font_size)
-        except:
-            font = None
-    
-    # 如果没有指定字体或加载失败，尝试使用系统字体
-    if font is None:
-        try:
-            # Windows系统字体
-            import platform
-            if platform.system() == 'Windows':
-                font = ImageFont.truetype('C:/Windows/Fonts/msyh.ttc', font_size)  # 微软雅黑
-            elif platform.system() == 'Darwin':  # macOS
-                font = ImageFont.truetype('/System/Library/Fonts/PingFang.ttc', font_size)
-            else:  # Linux
-                font = ImageFont.truetype('/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf', font_size)
-        except:
-            # 如果都失败，使用默认字体（可能不支持中文）
-            try:
-                font = ImageFont.load_default()
-            except:
-                font = None
+    # 加载字体（已缓存）
+    font = load_font(font_path, font_size)
     
     # 绘制文本
     # PIL使用RGB颜色，需要转换
@@ -92,9 +105,7 @@ def put_text_safe(img: np.ndarray, text: str, position: Tuple[int, int],
         绘制后的图像
     """
     # 检查是否包含中文字符
-    has_chinese = any('\u4e00' <= char <= '\u9fff' for char in text)
-    
-    if has_chinese:
+    if has_chinese(text):
         # 使用PIL绘制中文
         return put_chinese_text(img, text, position, font_size, color)
     else:
@@ -102,3 +113,77 @@ def put_text_safe(img: np.ndarray, text: str, position: Tuple[int, int],
         return cv2.putText(img, text, position, cv2.FONT_HERSHEY_SIMPLEX, 
                           font_size / 30.0, color, 2)
 
+
+def draw_text_batch(img: np.ndarray, items: Sequence[TextItem], font_size: int = 20,
+                    color: Tuple[int, int, int] = (0, 255, 0), font_path: Optional[str] = None) -> np.ndarray:
+    """
+    一次绘制多段文本
+    
+    英文文本用OpenCV直接绘制；所有中文文本只做一次BGR→RGB→BGR转换，在同一个PIL图像上绘制。
+    绘制顺序与逐段调用 put_text_safe 不同：中文文本总是在全部英文文本之后绘制，
+    标签互相重叠时，重叠处显示中文文本（逐段调用时显示后绘制的文本）；标签不重叠时结果相同。
+    
+    Args:
+        img: 输入图像（BGR格式，英文文本在原图上绘制）
+        items: (文本, 位置) 列表
+        font_size: 字体大小
+        color: 颜色 (B, G, R)
+        font_path: 字体文件路径（可选，默认使用系统字体）
+    
+    Returns:
+        绘制后的图像
+    """
+    chinese_items: List[TextItem] = []
+    for text, position in items:
+        if has_chinese(text):
+            chinese_items.append((text, position))
+        else:
+            img = cv2.putText(img, text, position, cv2.FONT_HERSHEY_SIMPLEX, font_size / 30.0, color, 2)
+    if not chinese_items:
+        return img
+    
+    # 转换为PIL Image（灰度图与 put_chinese_text 一致转为三通道）
+    if len(img.shape) == 2:
+        img_pil = Image.fromarray(cv2.cvtColor(img, cv2.COLOR_GRAY2RGB))
+    elif img.shape[2] == 4:
+        img_pil = Image.fromarray(cv2.cvtColor(img, cv2.COLOR_BGRA2RGBA))
+    else:
+        img_pil = Image.fromarray(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+    
+    draw = ImageDraw.Draw(img_pil)
+    font = load_font(font_path, font_size)
+    rgb_color = (color[2], color[1], color[0])  # BGR -> RGB
+    for text, position in chinese_items:
+        if font:
+            draw.text(position, text, font=font, fill=rgb_color)
+        else:
+            draw.text(position, text, fill=rgb_color)
+    
+    if img_pil.mode == 'RGBA':
+        return cv2.cvtColor(np.array(img_pil), cv2.COLOR_RGBA2BGRA)
+    return cv2.cvtColor(np.array(img_pil), cv2.COLOR_RGB2BGR)
+
+def draw_annotations(img: np.ndarray, polygons: Sequence[np.ndarray], labels: Sequence[TextItem],
+                     color: Tuple[int, int, int] = (0, 255, 0), thickness: int = 2, font_size: int = 18,
+                     font_path: Optional[str] = None) -> np.ndarray:
+    """
+    在图像上绘制一组多边形框和文字标签（框一次 polylines 调用绘制，文字见 draw_text_batch）
+    
+    Args:
+        img: 输入图像（BGR格式，会被原地修改；灰度图有中文标签时转为三通道）
+        polygons: 多边形顶点数组列表（int32，形状 (N, 2)）
+        labels: (文本, 位置) 列表
+        color: 框和文字的颜色 (B, G, R)
+        thickness: 框线宽
+        font_size: 字体大小
+        font_path: 字体文件路径（可选）
+    
+    Returns:
+        绘制后的图像
+    """
+    # 中文标签需要转为三通道绘制，灰度图先转换，使框也以彩色绘制
+    if len(img.shape) == 2 and any(has_chinese(text) for text, _ in labels):
+        img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+    if len(polygons) > 0:
+        cv2.polylines(img, list(polygons), True, color, thickness)
+    return draw_text_batch(img, labels, font_size=font_size, color=color, font_path=font_path)
@@ -3,7 +3,7 @@
 """
 import cv2
 import numpy as np
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Optional, Tuple
 
 def get_info():
     """返回算法信息"""
@@ -36,37 +36,104 @@ def get_info():
         }
     }
 
+def get_footprint(parameters: Dict[str, Any]) -> Optional[int]:
+    """空间作用半径（像素）；Canny 的滞后阈值沿边缘连通传播，是全局运算"""
+    method = parameters.get('method', 'canny')
+    if method == 'canny':
+        return None
+    if method in ('sobel', 'laplacian'):
+        return 1
+    return 0
+
+def get_color_spec(parameters: Dict[str, Any]) -> Dict[str, str]:
+    """颜色空间：只使用灰度，输出单通道边缘图（由执行引擎按需扩展为RGB）"""
+    if parameters.get('method', 'canny') in ('canny', 'sobel', 'laplacian'):
+        return {'input': 'gray', 'output': 'gray'}
+    return {'input': 'any', 'output': 'same'}
+
+def _empty(buffers: Any, shape: Tuple[int, ...], dtype: Any) -> np.ndarray:
+    """从缓冲池取得数组，没有缓冲池时新建"""
+    return buffers.acquire(shape, dtype) if buffers is not None else np.empty(shape, dtype=dtype)
+
 def execute(inputs: Dict[str, Any], parameters: Dict[str, Any]) -> Dict[str, Any]:
-    """执行边缘检测"""
+    """
+    执行边缘检测（边缘图为单通道）
+
+    inputs 中有 buffers 缓冲池时，灰度图、梯度等临时数组和结果都从缓冲池取得，临时数组用完即归还。
+    Sobel/Laplacian 的梯度幅值超过255时取255。
+    """
     image = inputs.get('image')
     if image is None:
         raise ValueError('缺少输入图像')
+    buffers = inputs.get('buffers')
     
     method = parameters.get('method', 'canny')
     threshold1 = int(parameters.get('threshold1', 50))
     threshold2 = int(parameters.get('threshold2', 150))
+    if method not in ('canny', 'sobel', 'laplacian'):
+        return {'image': image, 'output': image}
     
     # 转换为灰度图
     if len(image.shape) == 3:
-        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY, dst=_empty(buffers, image.shape[:2], image.dtype))
     else:
         gray = image
     
     if method == 'canny':
-        edges = cv2.Canny(gray, threshold1, threshold2)
-        result = cv2.cvtColor(edges, cv2.COLOR_GRAY2RGB)
+        result = cv2.Canny(gray, threshold1, threshold2, edges=_empty(buffers, gray.shape, np.uint8))
     elif method == 'sobel':
-        sobelx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
-        sobely = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
-        edges = np.sqrt(sobelx**2 + sobely**2)
-        edges = np.uint8(np.absolute(edges))
-        result = cv2.cvtColor(edges, cv2.COLOR_GRAY2RGB)
-    elif method == 'laplacian':
-        laplacian = cv2.Laplacian(gray, cv2.CV_64F)
-        edges = np.uint8(np.absolute(laplacian))
-        result = cv2.cvtColor(edges, cv2.COLOR_GRAY2RGB)
+        # float32 梯度，平方、求和、开方都就地进行，不产生 float64 临时数组；
+        # 整数梯度的平方和在 float32 中精确，开方后向下取整与 float64 计算一致
+        gx = cv2.Sobel(gray, cv2.CV_32F, 1, 0, dst=_empty(buffers, gray.shape, np.float32), ksize=3)
+        gy = cv2.Sobel(gray, cv2.CV_32F, 0, 1, dst=_empty(buffers, gray.shape, np.float32), ksize=3)
+        np.multiply(gx, gx, out=gx)
+        np.multiply(gy, gy, out=gy)
+        np.add(gx, gy, out=gx)
+        np.sqrt(gx, out=gx)
+        np.minimum(gx, 255, out=gx)
+        result = _empty(buffers, gray.shape, np.uint8)
+        np.copyto(result, gx, casting='unsafe')
+        if buffers is not None:
+            buffers.release(gx)
+            buffers.release(gy)
     else:
-        result = image
+        # 16位有符号整数保存二阶导数，convertScaleAbs 取绝对值并饱和到 uint8
+        laplacian = cv2.Laplacian(gray, cv2.CV_16S, dst=_empty(buffers, gray.shape, np.int16))
+        result = cv2.convertScaleAbs(laplacian, dst=_empty(buffers, gray.shape, np.uint8))
+        if buffers is not None:
+            buffers.release(laplacian)
     
+    if buffers is not None and gray is not image:
+        buffers.release(gray)
     return {'image': result, 'output': result}
 
+def prepare_sweep(inputs: Dict[str, Any], parameters: Dict[str, Any],
+                  name: str) -> Optional[Callable[[Any], Dict[str, Any]]]:
+    """
+    参数扫描：Canny 扫描 threshold1/threshold2 时灰度和 Sobel 梯度只计算一次，每个取值只做非极大值抑制和滞后连接；
+    参数不影响当前方法的结果时只执行一次，所有取值共享同一输出。扫描 method 时返回 None
+    """
+    method = parameters.get('method', 'canny')
+    if name == 'method' or method not in ('canny', 'sobel', 'laplacian'):
+        return None
+    if method != 'canny' or name not in ('threshold1', 'threshold2'):
+        output = execute(inputs, parameters)
+        return lambda value: output
+    image = inputs.get('image')
+    if image is None:
+        raise ValueError('缺少输入图像')
+    buffers = inputs.get('buffers')
+    threshold1 = int(parameters.get('threshold1', 50))
+    threshold2 = int(parameters.get('threshold2', 150))
+    gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY) if len(image.shape) == 3 else image
+    # 与 cv2.Canny(gray, ...) 内部的梯度计算相同（3x3 Sobel，复制边界），结果逐位一致
+    dx = cv2.Sobel(gray, cv2.CV_16S, 1, 0, ksize=3, borderType=cv2.BORDER_REPLICATE)
+    dy = cv2.Sobel(gray, cv2.CV_16S, 0, 1, ksize=3, borderType=cv2.BORDER_REPLICATE)
+    del gray
+
+    def run(value: Any) -> Dict[str, Any]:
+        low, high = (int(value), threshold2) if name == 'threshold1' else (threshold1, int(value))
+        result = cv2.Canny(dx, dy, low, high, edges=_empty(buffers, dx.shape, np.uint8))
+        return {'image': result, 'output': result}
+
+    return run
@@ -3,7 +3,7 @@
 """
 import cv2
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 def get_info():
     """返回算法信息"""
@@ -30,11 +30,34 @@ def get_info():
         }
     }
 
+def get_footprint(parameters: Dict[str, Any]) -> Optional[int]:
+    """
+    空间作用半径（像素）：均值/高斯/中值滤波的输出只取决于核大小范围内的输入。
+    双边滤波按全局运算处理：OpenCV 按图像尺寸选择不同的实现（IPP、SIMD 或逐像素计算，舍入不同），
+    分块或裁剪后的窄图与整图的结果可能相差1
+    """
+    kernel_size = int(parameters.get('kernel_size', 5))
+    if kernel_size % 2 == 0:
+        kernel_size += 1
+    filter_type = parameters.get('filter_type', 'gaussian')
+    if filter_type == 'bilateral':
+        return None
+    if filter_type in ('blur', 'gaussian', 'median'):
+        return kernel_size // 2
+    return 0
+
+def get_color_spec(parameters: Dict[str, Any]) -> Dict[str, str]:
+    """颜色空间：均值/高斯/中值滤波逐通道计算；双边滤波的颜色权重取决于各通道的差异，需要原样的彩色输入"""
+    if parameters.get('filter_type', 'gaussian') == 'bilateral':
+        return {'input': 'rgb', 'output': 'same'}
+    return {'input': 'any', 'output': 'same'}
+
 def execute(inputs: Dict[str, Any], parameters: Dict[str, Any]) -> Dict[str, Any]:
-    """执行图像滤波"""
+    """执行图像滤波（inputs 中有 buffers 缓冲池时，结果写入从缓冲池取得的数组）"""
     image = inputs.get('image')
     if image is None:
         raise ValueError('缺少输入图像')
+    buffers = inputs.get('buffers')
     
     filter_type = parameters.get('filter_type', 'gaussian')
     kernel_size = int(parameters.get('kernel_size', 5))
@@ -43,16 +66,18 @@ def execute(inputs: Dict[str, Any], parameters: Dict[str, Any]) -> Dict[str, Any
     if kernel_size % 2 == 0:
         kernel_size += 1
     
+    if filter_type not in ('blur', 'gaussian', 'median', 'bilateral'):
+        return {'image': image, 'output': image}
+    
+    result = buffers.acquire(image.shape, image.dtype) if buffers is not None else None
     if filter_type == 'blur':
-        result = cv2.blur(image, (kernel_size, kernel_size))
+        result = cv2.blur(image, (kernel_size, kernel_size), dst=result)
     elif filter_type == 'gaussian':
-        result = cv2.GaussianBlur(image, (kernel_size, kernel_size), 0)
+        result = cv2.GaussianBlur(image, (kernel_size, kernel_size), 0, dst=result)
     elif filter_type == 'median':
-        result = cv2.medianBlur(image, kernel_size)
-    elif filter_type == 'bilateral':
-        result = cv2.bilateralFilter(image, kernel_size, 80, 80)
+        result = cv2.medianBlur(image, kernel_size, dst=result)
     else:
-        result = image
+        result = cv2.bilateralFilter(image, kernel_size, 80, 80, dst=result)
     
     return {'image': result, 'output': result}
 
@@ -3,7 +3,7 @@
 """
 import cv2
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 def get_info():
     """返回算法信息"""
@@ -31,6 +31,14 @@ def get_info():
         }
     }
 
+def get_footprint(parameters: Dict[str, Any]) -> Optional[int]:
+    """旋转/缩放后的像素可能来自图像任意位置，是全局运算"""
+    return None
+
+def get_color_spec(parameters: Dict[str, Any]) -> Dict[str, str]:
+    """颜色空间：仿射变换逐通道插值，单通道输入直接处理"""
+    return {'input': 'any', 'output': 'same'}
+
 def execute(inputs: Dict[str, Any], parameters: Dict[str, Any]) -> Dict[str, Any]:
     """执行图像配准"""
     image = inputs.get('image')
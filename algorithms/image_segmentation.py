@@ -3,7 +3,7 @@
 """
 import cv2
 import numpy as np
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Optional, Tuple
 
 def get_info():
     """返回算法信息"""
@@ -29,37 +29,97 @@ def get_info():
         }
     }
 
+def get_footprint(parameters: Dict[str, Any]) -> Optional[int]:
+    """空间作用半径（像素）；固定阈值逐像素运算，Canny 和分水岭（Otsu 全局阈值）是全局运算"""
+    method = parameters.get('method', 'threshold')
+    if method in ('canny', 'watershed'):
+        return None
+    return 0
+
+def get_color_spec(parameters: Dict[str, Any]) -> Dict[str, str]:
+    """颜色空间：只使用灰度，输出单通道掩码（由执行引擎按需扩展为RGB）"""
+    if parameters.get('method', 'threshold') in ('threshold', 'canny', 'watershed'):
+        return {'input': 'gray', 'output': 'gray'}
+    return {'input': 'any', 'output': 'same'}
+
+def _empty(buffers: Any, shape: Tuple[int, ...], dtype: Any) -> np.ndarray:
+    """从缓冲池取得数组，没有缓冲池时新建"""
+    return buffers.acquire(shape, dtype) if buffers is not None else np.empty(shape, dtype=dtype)
+
 def execute(inputs: Dict[str, Any], parameters: Dict[str, Any]) -> Dict[str, Any]:
-    """执行图像分割"""
+    """执行图像分割（分割结果为单通道；inputs 中有 buffers 缓冲池时，临时数组和结果从缓冲池取得）"""
     image = inputs.get('image')
     if image is None:
         raise ValueError('缺少输入图像')
+    buffers = inputs.get('buffers')
     
     method = parameters.get('method', 'threshold')
     threshold_value = int(parameters.get('threshold_value', 127))
+    if method not in ('threshold', 'canny', 'watershed'):
+        return {'image': image, 'output': image}
     
     # 转换为灰度图
     if len(image.shape) == 3:
-        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY, dst=_empty(buffers, image.shape[:2], image.dtype))
     else:
         gray = image
     
     if method == 'threshold':
         # 阈值分割
-        _, result = cv2.threshold(gray, threshold_value, 255, cv2.THRESH_BINARY)
-        result = cv2.cvtColor(result, cv2.COLOR_GRAY2RGB)
+        _, result = cv2.threshold(gray, threshold_value, 255, cv2.THRESH_BINARY,
+                                  dst=_empty(buffers, gray.shape, gray.dtype))
     elif method == 'canny':
         # Canny边缘检测
-        edges = cv2.Canny(gray, 50, 150)
-        result = cv2.cvtColor(edges, cv2.COLOR_GRAY2RGB)
-    elif method == 'watershed':
+        result = cv2.Canny(gray, 50, 150, edges=_empty(buffers, gray.shape, np.uint8))
+    else:
         # 分水岭算法（简化版）
-        _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU,
+                                  dst=_empty(buffers, gray.shape, gray.dtype))
         kernel = np.ones((3, 3), np.uint8)
-        opening = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel, iterations=2)
-        result = cv2.cvtColor(opening, cv2.COLOR_GRAY2RGB)
-    else:
-        result = image
+        result = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel, dst=_empty(buffers, gray.shape, gray.dtype),
+                                  iterations=2)
+        if buffers is not None:
+            buffers.release(thresh)
     
+    if buffers is not None and gray is not image:
+        buffers.release(gray)
     return {'image': result, 'output': result}
 
+def prepare_sweep(inputs: Dict[str, Any], parameters: Dict[str, Any],
+                  name: str) -> Optional[Callable[[Any], Dict[str, Any]]]:
+    """
+    参数扫描：阈值分割扫描 threshold_value 时灰度只转换一次，并用一次直方图统计找出结果相同的阈值
+    （两个阈值之间没有像素时分割结果相同），连续的相同结果只计算一次；
+    参数不影响当前方法的结果时只执行一次，所有取值共享同一输出。扫描 method 时返回 None
+    """
+    method = parameters.get('method', 'threshold')
+    if name == 'method' or method not in ('threshold', 'canny', 'watershed'):
+        return None
+    if method != 'threshold' or name != 'threshold_value':
+        output = execute(inputs, parameters)
+        return lambda value: output
+    image = inputs.get('image')
+    if image is None:
+        raise ValueError('缺少输入图像')
+    buffers = inputs.get('buffers')
+    gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY) if len(image.shape) == 3 else image
+    # 不大于阈值的像素数相同，则大于阈值的像素集合（分割结果）相同
+    below = None
+    if gray.dtype == np.uint8:
+        below = np.cumsum(cv2.calcHist([gray], [0], None, [256], [0, 256]).ravel().astype(np.int64))
+    last = {}
+
+    def run(value: Any) -> Dict[str, Any]:
+        threshold_value = int(value)
+        key = None
+        if below is not None:
+            key = 0 if threshold_value < 0 else int(below[min(threshold_value, 255)])
+            if last and last['key'] == key:
+                return last['output']
+        _, result = cv2.threshold(gray, threshold_value, 255, cv2.THRESH_BINARY,
+                                  dst=_empty(buffers, gray.shape, gray.dtype))
+        last.clear()
+        last.update(key=key, output={'image': result, 'output': result})
+        return last['output']
+
+    return run
@@ -0,0 +1,184 @@
+"""
+OCR识别结果持久化缓存
+
+以 BGR 输入图像的内容哈希 + 提供者配置（名称、模型、选项）为键，把 OCRResult 序列化后
+存入数据目录下的 SQLite 数据库。相同的标签裁剪图再次识别时直接返回缓存结果，
+服务重启后依然有效；多个工作进程可共享同一个数据库文件（WAL模式）。
+
+配置（环境变量）：
+    OCR_CACHE_ENABLED     是否启用（默认开启）
+    OCR_CACHE_PATH        数据库文件路径（默认 data/ocr_cache.sqlite3）
+    OCR_CACHE_TTL         结果有效期（秒，默认7天，0 表示不过期）
+    OCR_CACHE_MAX_BYTES   缓存结果的总字节上限（默认64MB，超出时按最近访问时间淘汰）
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+try:
+    from .ocr_providers import OCRResult
+except ImportError:
+    from algorithms.ocr_providers import OCRResult
+
+logger = logging.getLogger(__name__)
+
+# 命中时最近访问时间的刷新间隔（秒），避免每次命中都写库
+TOUCH_INTERVAL = 60.0
+
+class OCRResultCache:
+    """基于SQLite的OCR结果缓存（线程安全）"""
+
+    def __init__(self, path: str, ttl: float = 7 * 24 * 3600, max_bytes: int = 64 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS ocr_results ('
+                         'key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, '
+                         'created_at REAL NOT NULL, accessed_at REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS ocr_results_accessed ON ocr_results(accessed_at)')
+            self._bytes = conn.execute('SELECT COALESCE(SUM(size), 0) FROM ocr_results').fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def make_key(image: np.ndarray, signature: Dict[str, Any]) -> str:
+        """缓存键：提供者配置 + 图像形状、数据类型和像素内容的哈希"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(json.dumps(signature, sort_keys=True, default=str).encode())
+        digest.update(f'|{image.shape}|{image.dtype.str}|'.encode())
+        digest.update(memoryview(np.ascontiguousarray(image)).cast('B'))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[OCRResult]:
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connect()
+                row = conn.execute('SELECT value, created_at, accessed_at FROM ocr_results WHERE key = ?',
+                                   (key, )).fetchone()
+                if row is None or (self.ttl and now - row[1] > self.ttl):
+                    self.misses += 1
+                    return None
+                if now - row[2] > TOUCH_INTERVAL:
+                    conn.execute('UPDATE ocr_results SET accessed_at = ? WHERE key = ?', (now, key))
+                self.hits += 1
+                value = row[0]
+            except sqlite3.Error as e:
+                self.errors += 1
+                logger.warning("读取OCR结果缓存失败: %s", e)
+                return None
+        return OCRResult.from_dict(json.loads(value))
+
+    def put(self, key: str, result: OCRResult):
+        value = json.dumps(result.to_dict(), ensure_ascii=False).encode('utf-8')
+        if len(value) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connect()
+                row = conn.execute('SELECT size FROM ocr_results WHERE key = ?', (key, )).fetchone()
+                conn.execute('INSERT OR REPLACE INTO ocr_results (key, value, size, created_at, accessed_at) '
+                             'VALUES (?, ?, ?, ?, ?)', (key, value, len(value), now, now))
+                self._bytes += len(value) - (row[0] if row else 0)
+                if self._bytes > self.max_bytes:
+                    self._evict(conn, now)
+            except sqlite3.Error as e:
+                self.errors += 1
+                logger.warning("写入OCR结果缓存失败: %s", e)
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """删除过期结果，仍超出上限时按最近访问时间淘汰到上限的90%"""
+        removed = 0
+        if self.ttl:
+            removed += conn.execute('DELETE FROM ocr_results WHERE created_at < ?', (now - self.ttl, )).rowcount
+        # 其他工作进程也会写入同一数据库，以实际总量为准
+        self._bytes = conn.execute('SELECT COALESCE(SUM(size), 0) FROM ocr_results').fetchone()[0]
+        target = int(self.max_bytes * 0.9)
+        if self._bytes > target:
+            freed = 0
+            keys = []
+            for key, size in conn.execute('SELECT key, size FROM ocr_results ORDER BY accessed_at'):
+                if self._bytes - freed <= target:
+                    break
+                keys.append((key, ))
+                freed += size
+            conn.executemany('DELETE FROM ocr_results WHERE key = ?', keys)
+            self._bytes -= freed
+            removed += len(keys)
+        self.evictions += removed
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute('DELETE FROM ocr_results')
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = 0
+            if self._conn is not None:
+                try:
+                    entries = self._conn.execute('SELECT COUNT(*) FROM ocr_results').fetchone()[0]
+                except sqlite3.Error:
+                    pass
+            lookups = self.hits + self.misses
+            return {
+                'entries': entries,
+                'bytes': self._bytes,
+                'maxBytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'errors': self.errors,
+                'hitRate': self.hits / lookups if lookups else 0.0
+            }
+
+_cache: Optional[OCRResultCache] = None
+_cache_lock = threading.Lock()
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() not in ('', '0', 'false', 'no', 'off')
+
+def get_result_cache() -> Optional[OCRResultCache]:
+    """按环境变量配置创建的全局缓存实例，未启用时返回 None"""
+    global _cache
+    if not _env_flag('OCR_CACHE_ENABLED', True):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = OCRResultCache(
+                os.environ.get('OCR_CACHE_PATH', os.path.join('data', 'ocr_cache.sqlite3')),
+                ttl=float(os.environ.get('OCR_CACHE_TTL', 7 * 24 * 3600)),
+                max_bytes=int(os.environ.get('OCR_CACHE_MAX_BYTES', 64 * 1024 * 1024)))
+        return _cache
+
+def active_result_cache() -> Optional[OCRResultCache]:
+    """已创建的全局缓存实例（不会因调用而创建数据库），用于导出状态"""
+    return _cache
@@ -2,15 +2,29 @@
 OCR提供者抽象层
 支持多种OCR方案：PaddleOCR、DeepSeekOCR等
 """
+import asyncio
 import cv2
+import importlib.metadata
+import importlib.util
+import logging
 import numpy as np
 import os
+import queue
+import threading
+import time
 import base64
 import io
-from typing import Dict, Any, List, Tuple, Optional
+import json
+import random
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable, Dict, Any, Iterator, List, Tuple, Optional
 from abc import ABC, abstractmethod
 from PIL import Image
 
+logger = logging.getLogger(__name__)
+
 # ==================== OCR结果数据类 ====================
 
 class OCRResult:
@@ -41,6 +55,22 @@ class OCRResult:
                 'box': self.boxes[i] if i < len(self.boxes) else None,
                 'poly': self.polys[i] if i < len(self.polys) else None
             }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为可JSON序列化的字典"""
+        return {
+            'texts': list(self.texts),
+            'scores': [float(s) for s in self.scores],
+            'boxes': [[list(p) for p in box] if box else None for box in self.boxes],
+            'polys': [poly.tolist() if poly is not None else None for poly in self.polys]
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'OCRResult':
+        """从 to_dict() 的结果还原"""
+        return cls(data['texts'], data['scores'],
+                   [[tuple(p) for p in box] if box else None for box in data['boxes']],
+                   [np.array(poly, dtype=np.int32) if poly is not None else None for poly in data['polys']])
 
 # ==================== OCR提供者接口 ====================
 
@@ -70,9 +100,44 @@ class OCRProvider(ABC):
     def get_name(self) -> str:
         """获取OCR提供者名称"""
         pass
+    
+    def recognize_batch(self, images: List[np.ndarray], **kwargs) -> List[OCRResult]:
+        """
+        批量识别多张图像（默认逐张识别，支持批量推理的提供者可覆盖）
+        
+        Returns:
+            与输入顺序一致的识别结果列表
+        """
+        return [self.recognize(image, **kwargs) for image in images]
+    
+    def cache_signature(self) -> Dict[str, Any]:
+        """影响识别结果的配置（提供者名称、模型、选项），用作结果缓存键的一部分"""
+        return {'provider': self.get_name()}
 
 # ==================== PaddleOCR提供者 ====================
 
+def is_paddleocr_installed() -> bool:
+    """检查PaddleOCR是否已安装（只查找模块，不导入paddle也不加载模型）"""
+    return importlib.util.find_spec('paddleocr') is not None
+
+@lru_cache(maxsize=1)
+def paddleocr_version() -> Optional[str]:
+    """已安装的PaddleOCR版本（包元数据只读取一次），未安装时为 None"""
+    try:
+        return importlib.metadata.version('paddleocr')
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+def paddleocr_supports_batch() -> bool:
+    """已安装的PaddleOCR是否提供整批推理的 predict 接口（3.x 起有；2.x 只能逐张调用 ocr）"""
+    version = paddleocr_version()
+    if version is None:
+        return False
+    try:
+        return int(version.split('.')[0]) >= 3
+    except ValueError:
+        return False
+
 class PaddleOCRProvider(OCRProvider):
     """PaddleOCR提供者"""
     
@@ -80,8 +145,19 @@ class PaddleOCRProvider(OCRProvider):
         self.use_angle_cls = use_angle_cls
         self.lang = lang
         self._ocr_instance = None
-        self._available = False
-        self._init_ocr()
+        # 只检查是否已安装，模型在首次识别（或调用 load()）时才加载
+        self._available = is_paddleocr_installed()
+        self._load_lock = threading.Lock()
+        # 模型随 PaddleOCR 版本变化，版本号计入缓存键（创建时查询一次）
+        self._version = paddleocr_version()
+    
+    def load(self):
+        """加载PaddleOCR模型（首次识别时自动调用，多线程下只加载一次）"""
+        if self._ocr_instance is not None or not self._available:
+            return
+        with self._load_lock:
+            if self._ocr_instance is None and self._available:
+                self._init_ocr()
     
     def _init_ocr(self):
         """初始化PaddleOCR"""
@@ -95,7 +171,7 @@ class PaddleOCRProvider(OCRProvider):
             self._available = True
         except ImportError as e:
             self._available = False
-            print(f"PaddleOCR未安装: {e}")
+            logger.warning("PaddleOCR未安装: %s", e)
     
     def is_available(self) -> bool:
         return self._available
@@ -103,32 +179,51 @@ class PaddleOCRProvider(OCRProvider):
     def get_name(self) -> str:
         return "PaddleOCR"
     
-    def recognize(self, image: np.ndarray, **kwargs) -> OCRResult:
-        """使用PaddleOCR识别"""
+    def cache_signature(self) -> Dict[str, Any]:
+        return {'provider': self.get_name(), 'use_angle_cls': self.use_angle_cls, 'lang': self.lang,
+                'model': f'paddleocr-{self._version}'}
+    
+    @staticmethod
+    def _to_bgr(image: np.ndarray) -> np.ndarray:
+        """确保图像是三通道BGR格式（灰度图转换，三通道图像按BGR处理）"""
+        if len(image.shape) == 2:
+            return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        return image
+    
+    def _ensure_ready(self):
+        self.load()
         if not self._available or not self._ocr_instance:
             raise RuntimeError("PaddleOCR未正确初始化")
-        
-        # 确保图像是BGR格式
-        if len(image.shape) == 2:
-            image_bgr = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
-        elif image.shape[2] == 3:
-            # 检查是否为RGB，如果是则转换为BGR
-            image_bgr = image.copy()
-        else:
-            image_bgr = image
+    
+    def recognize(self, image: np.ndarray, **kwargs) -> OCRResult:
+        """使用PaddleOCR识别"""
+        self._ensure_ready()
         
         # 执行OCR
-        ocr_result = self._ocr_instance.ocr(image_bgr)
-        
-        # 解析结果
+        ocr_result = self._ocr_instance.ocr(self._to_bgr(image))
+        if ocr_result and isinstance(ocr_result, list) and len(ocr_result) > 0:
+            return self._parse_result(ocr_result[0])
+        return OCRResult([], [], [], [])
+    
+    def recognize_batch(self, images: List[np.ndarray], **kwargs) -> List[OCRResult]:
+        """
+        批量识别：新版PaddleOCR（带 predict 接口）一次推理整批图像，旧版逐张识别
+        """
+        self._ensure_ready()
+        if not hasattr(self._ocr_instance, 'predict'):
+            return [self.recognize(image) for image in images]
+        ocr_results = self._ocr_instance.predict([self._to_bgr(image) for image in images])
+        return [self._parse_result(item) for item in ocr_results]
+    
+    @staticmethod
+    def _parse_result(result_dict: Any) -> OCRResult:
+        """解析单张图像的PaddleOCR识别结果（兼容新旧版本的输出格式）"""
         texts = []
         scores = []
         boxes = []
         polys = []
         
-        if ocr_result and isinstance(ocr_result, list) and len(ocr_result) > 0:
-            result_dict = ocr_result[0]
-            
+        if result_dict:
             if isinstance(result_dict, dict):
                 # 新版本格式
                 rec_texts = result_dict.get('rec_texts', [])
@@ -207,20 +302,397 @@ class PaddleOCRProvider(OCRProvider):
         
         return OCRResult(texts, scores, boxes, polys)
 
+# ==================== OCR实例池 ====================
+
+class OCRPoolTimeoutError(RuntimeError):
+    """等待空闲OCR实例超时，或等待队列已满"""
+
+class OCRProviderPool(OCRProvider):
+    """
+    同一配置的多个OCR提供者实例
+
+    OCR引擎实例不能被多个线程同时调用，每次识别从池中借出一个空闲实例，用完归还。
+    实例在需要时才创建（最多 size 个）；没有空闲实例时调用方排队等待，
+    排队数超过 max_waiting 或等待超过 checkout_timeout 秒时抛出 OCRPoolTimeoutError。
+    推理期间引擎会释放GIL，因此多个实例可以在线程中并行识别。
+    """
+    
+    def __init__(self, factory: Callable[[], OCRProvider], size: int = 1,
+                 checkout_timeout: float = 30.0, max_waiting: Optional[int] = None):
+        self._factory = factory
+        self.size = max(1, size)
+        self.checkout_timeout = checkout_timeout
+        self.max_waiting = max_waiting if max_waiting is not None else self.size * 8
+        self._idle: 'queue.LifoQueue[OCRProvider]' = queue.LifoQueue()
+        self._instances: List[OCRProvider] = []
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+    
+    def _prototype(self) -> OCRProvider:
+        """第一个实例，用于查询名称和可用性"""
+        with self._lock:
+            if not self._instances:
+                self._instances.append(self._factory())
+                self._idle.put(self._instances[0])
+            return self._instances[0]
+    
+    def is_available(self) -> bool:
+        return self._prototype().is_available()
+    
+    def get_name(self) -> str:
+        return self._prototype().get_name()
+    
+    def cache_signature(self) -> Dict[str, Any]:
+        return self._prototype().cache_signature()
+    
+    def load(self):
+        """创建并加载全部实例（用于启动时预加载）"""
+        with self._lock:
+            while len(self._instances) < self.size:
+                instance = self._factory()
+                self._instances.append(instance)
+                self._idle.put(instance)
+        for instance in list(self._instances):
+            if hasattr(instance, 'load'):
+                instance.load()
+    
+    @contextmanager
+    def checkout(self) -> Iterator[OCRProvider]:
+        """借出一个空闲实例，with 块结束时归还"""
+        start = time.perf_counter()
+        instance = None
+        with self._lock:
+            try:
+                instance = self._idle.get_nowait()
+            except queue.Empty:
+                if len(self._instances) < self.size:
+                    instance = self._factory()
+                    self._instances.append(instance)
+                elif self._waiting >= self.max_waiting:
+                    self._rejected += 1
+                    raise OCRPoolTimeoutError(f'OCR等待队列已满（{self._waiting} 个请求在等待），请稍后重试')
+                else:
+                    self._waiting += 1
+        if instance is None:
+            try:
+                instance = self._idle.get(timeout=self.checkout_timeout)
+            except queue.Empty:
+                with self._lock:
+                    self._timeouts += 1
+                raise OCRPoolTimeoutError(f'等待空闲OCR实例超时（{self.checkout_timeout}秒），'
+                                          f'当前实例数 {self.size}，可通过 OCR_POOL_SIZE 调整')
+            finally:
+                with self._lock:
+                    self._waiting -= 1
+        waited = time.perf_counter() - start
+        with self._lock:
+            self._checkouts += 1
+            self._wait_seconds += waited
+            self._max_wait_seconds = max(self._max_wait_seconds, waited)
+        try:
+            yield instance
+        finally:
+            self._idle.put(instance)
+    
+    def recognize(self, image: np.ndarray, **kwargs) -> OCRResult:
+        with self.checkout() as instance:
+            return instance.recognize(image, **kwargs)
+    
+    def recognize_batch(self, images: List[np.ndarray], **kwargs) -> List[OCRResult]:
+        with self.checkout() as instance:
+            return instance.recognize_batch(images, **kwargs)
+    
+    def stats(self) -> Dict[str, Any]:
+        """池状态：实例数、使用中/空闲/等待数、借出次数、超时/拒绝次数、累计和最长等待时间"""
+        with self._lock:
+            idle = self._idle.qsize()
+            return {
+                'size': self.size,
+                'created': len(self._instances),
+                'idle': idle,
+                'inUse': len(self._instances) - idle,
+                'waiting': self._waiting,
+                'checkouts': self._checkouts,
+                'timeouts': self._timeouts,
+                'rejected': self._rejected,
+                'waitSeconds': self._wait_seconds,
+                'maxWaitSeconds': self._max_wait_seconds
+            }
+
+# ==================== 微批调度 ====================
+
+# 当前线程是否绕过微批调度器（见 run_inline）
+_inline = threading.local()
+
+@contextmanager
+def run_inline() -> Iterator[None]:
+    """
+    with 块中当前线程的识别请求不经过微批调度器，直接在当前线程中调用下层提供者（实例池照常借出实例）
+
+    用于性能分析：cProfile 只记录启用它的线程，交给调度线程执行的推理不会出现在分析结果中。
+    """
+    previous = getattr(_inline, 'active', False)
+    _inline.active = True
+    try:
+        yield
+    finally:
+        _inline.active = previous
+
+class OCRBatcher(OCRProvider):
+    """
+    OCR微批调度器
+
+    把并发到达的识别请求（或同一请求中的多张裁剪图）收集成批，一次调用下层提供者的
+    recognize_batch，再把结果分发回各调用方。第一张图像到达后最多等待 max_wait_ms 毫秒
+    凑批，凑满 max_batch_size 张立即执行；下层执行槽位（concurrency，通常等于实例池大小）
+    都在忙时，新请求在队列中继续累积，下一批会更大。以几毫秒的延迟换取更高的吞吐量。
+    """
+    
+    def __init__(self, provider: OCRProvider, max_batch_size: int = 8, max_wait_ms: float = 5.0,
+                 concurrency: int = 1):
+        self.provider = provider
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.concurrency = max(1, concurrency)
+        self._queue: 'queue.Queue[Tuple[np.ndarray, Future, float]]' = queue.Queue()
+        self._slots = threading.Semaphore(self.concurrency)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._images = 0
+        self._max_batch = 0
+    
+    def is_available(self) -> bool:
+        return self.provider.is_available()
+    
+    def get_name(self) -> str:
+        return self.provider.get_name()
+    
+    def cache_signature(self) -> Dict[str, Any]:
+        return self.provider.cache_signature()
+    
+    def load(self):
+        if hasattr(self.provider, 'load'):
+            self.provider.load()
+    
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.concurrency,
+                                                    thread_name_prefix='ocr-batch')
+                self._thread = threading.Thread(target=self._dispatch, name='ocr-batcher', daemon=True)
+                self._thread.start()
+    
+    def submit(self, image: np.ndarray) -> Future:
+        """提交一张图像，返回识别结果的 Future"""
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((image, future, time.perf_counter()))
+        return future
+    
+    def recognize(self, image: np.ndarray, **kwargs) -> OCRResult:
+        if kwargs or getattr(_inline, 'active', False):
+            # 带额外参数的调用无法与其他请求合批；run_inline 中在当前线程执行
+            return self.provider.recognize(image, **kwargs)
+        return self.submit(image).result()
+    
+    def recognize_batch(self, images: List[np.ndarray], **kwargs) -> List[OCRResult]:
+        if kwargs or getattr(_inline, 'active', False):
+            return self.provider.recognize_batch(images, **kwargs)
+        futures = [self.submit(image) for image in images]
+        return [future.result() for future in futures]
+    
+    def _dispatch(self):
+        while True:
+            first = self._queue.get()
+            # 等待空闲执行槽位；期间到达的请求留在队列中并入本批
+            self._slots.acquire()
+            batch = [first]
+            deadline = first[2] + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    if remaining > 0:
+                        batch.append(self._queue.get(timeout=remaining))
+                    else:
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._executor.submit(self._run_batch, batch)
+    
+    def _run_batch(self, batch: List[Tuple[np.ndarray, Future, float]]):
+        try:
+            futures = [future for _, future, _ in batch if future.set_running_or_notify_cancel()]
+            images = [image for image, future, _ in batch if future in futures]
+            if not images:
+                return
+            with self._lock:
+                self._batches += 1
+                self._images += len(images)
+                self._max_batch = max(self._max_batch, len(images))
+            try:
+                results = self.provider.recognize_batch(images)
+                if len(results) != len(images):
+                    raise RuntimeError(f'批量识别返回 {len(results)} 个结果，期望 {len(images)} 个')
+            except BaseException as e:
+                for future in futures:
+                    future.set_exception(e)
+                return
+            for future, result in zip(futures, results):
+                future.set_result(result)
+        finally:
+            self._slots.release()
+    
+    def stats(self) -> Dict[str, Any]:
+        """批次数、已识别图像数、平均/最大批大小、排队图像数"""
+        with self._lock:
+            return {
+                'batches': self._batches,
+                'images': self._images,
+                'avgBatchSize': self._images / self._batches if self._batches else 0.0,
+                'maxBatchSize': self._max_batch,
+                'queued': self._queue.qsize()
+            }
+
+# ==================== 远程调用容错 ====================
+
+class CircuitOpenError(RuntimeError):
+    """熔断器打开，远程服务暂不可用，调用立即失败"""
+
+class CircuitBreaker:
+    """
+    熔断器
+
+    连续失败 failure_threshold 次后打开，reset_timeout 秒内的调用立即失败（不再占用连接和线程等待超时）；
+    之后进入半开状态放行一次试探调用，成功则关闭，失败则重新打开。
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self.rejected = 0
+    
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+    
+    def allow(self) -> bool:
+        """
+        调用前检查，熔断时抛出 CircuitOpenError
+
+        Returns:
+            本次调用是否是半开状态的试探调用（调用方必须以 record_success/record_failure/release_trial 之一结束试探）
+        """
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                self._trial_running = False
+            if self._state == self.CLOSED:
+                return False
+            if self._state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            self.rejected += 1
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+            raise CircuitOpenError(f'远程OCR服务连续失败 {self._failures} 次，已熔断，约 {retry_in:.1f} 秒后重试')
+    
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_running = False
+    
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning("远程OCR服务连续失败 %d 次，熔断 %g 秒", self._failures, self.reset_timeout)
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_running = False
+    
+    def release_trial(self):
+        """试探调用在到达远程服务之前失败（如图像编码出错、等待并发槽位超时），不改变状态，放行下一次试探"""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._trial_running = False
+
+class RemoteCallError(RuntimeError):
+    """
+    远程调用失败；retryable 表示是否值得重试（超时、连接错误、429、5xx），
+    status 为服务返回的HTTP状态码（没有收到响应时为 None）
+    """
+    
+    def __init__(self, message: str, retryable: bool, retry_after: Optional[float] = None,
+                 status: Optional[int] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+        self.status = status
+
 # ==================== DeepSeekOCR提供者 ====================
 
 class DeepSeekOCRProvider(OCRProvider):
-    """DeepSeekOCR提供者（通过API调用）"""
+    """
+    DeepSeekOCR提供者（通过API调用）
+
+    所有调用共用一个带连接池的 requests.Session（复用TCP/TLS连接），并发请求数由信号量限制；
+    超时、连接错误、429 和 5xx 按指数退避（带随机抖动，429 优先遵循 Retry-After）重试，
+    连续失败时熔断，服务不可用期间调用立即失败。
+    """
     
-    def __init__(self, api_key: Optional[str] = None, api_base: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, api_base: Optional[str] = None,
+                 model: str = 'deepseek-chat', max_concurrency: Optional[int] = None,
+                 timeout: Optional[float] = None, connect_timeout: float = 5.0,
+                 max_retries: Optional[int] = None, backoff: float = 0.5,
+                 breaker_threshold: int = 5, breaker_reset: float = 30.0):
         """
         Args:
             api_key: DeepSeek API密钥
             api_base: API基础URL（可选，默认使用DeepSeek官方API）
+            model: 模型名称（需支持视觉输入）
+            max_concurrency: 最大并发请求数（默认环境变量 DEEPSEEK_MAX_CONCURRENCY 或 4）
+            timeout: 读取响应的超时时间（秒，默认环境变量 DEEPSEEK_TIMEOUT 或 30）
+            connect_timeout: 建立连接的超时时间（秒）
+            max_retries: 失败后的最大重试次数（默认环境变量 DEEPSEEK_MAX_RETRIES 或 2）
+            backoff: 退避基准时间（秒），第 n 次重试最多等待 backoff * 2^n
+            breaker_threshold: 连续失败多少次后熔断
+            breaker_reset: 熔断持续时间（秒）
         """
         self.api_key = api_key or os.getenv('DEEPSEEK_API_KEY', '')
         self.api_base = api_base or 'https://api.deepseek.com/v1/chat/completions'
+        self.model = model
+        self.max_concurrency = max(1, max_concurrency or int(os.getenv('DEEPSEEK_MAX_CONCURRENCY', 4)))
+        self.timeout = timeout or float(os.getenv('DEEPSEEK_TIMEOUT', 30))
+        self.connect_timeout = connect_timeout
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('DEEPSEEK_MAX_RETRIES', 2))
+        self.backoff = backoff
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset)
         self._available = bool(self.api_key)
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._session = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
     
     def is_available(self) -> bool:
         return self._available
@@ -228,102 +700,235 @@ class DeepSeekOCRProvider(OCRProvider):
     def get_name(self) -> str:
         return "DeepSeekOCR"
     
+    def cache_signature(self) -> Dict[str, Any]:
+        return {'provider': self.get_name(), 'model': self.model, 'api_base': self.api_base}
+    
+    def _get_session(self):
+        """共享的 requests.Session，连接池大小与最大并发数一致"""
+        with self._lock:
+            if self._session is None:
+                try:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                except ImportError:
+                    raise RuntimeError("需要安装requests库: pip install requests")
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers.update({
+                    'Authorization': f'Bearer {self.api_key}',
+                    'Content-Type': 'application/json'
+                })
+                self._session = session
+            return self._session
+    
+    def _build_payload(self, image: np.ndarray) -> Dict[str, Any]:
+        # 将图像转换为base64
+        if len(image.shape) == 2:
+            image_rgb = cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
+        elif image.shape[2] == 3:
+            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        else:
+            image_rgb = image
+        
+        pil_image = Image.fromarray(image_rgb)
+        buffered = io.BytesIO()
+        pil_image.save(buffered, format="PNG")
+        image_base64 = base64.b64encode(buffered.getvalue()).decode('utf-8')
+        
+        # 构建请求（使用视觉模型）
+        return {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": "请识别这张图片中的所有文字，返回JSON格式：{\"texts\": [\"文本1\", \"文本2\"], \"boxes\": [[[x1,y1],[x2,y2],[x3,y3],[x4,y4]], ...], \"scores\": [0.95, 0.92]}"
+                        },
+                        {
+                            "type": "image_url",
+                            "image_url": {
+                                "url": f"data:image/png;base64,{image_base64}"
+                            }
+                        }
+                    ]
+                }
+            ],
+            "temperature": 0.1
+        }
+    
+    def _post(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """发送一次请求（不重试），失败时抛出 RemoteCallError"""
+        import requests
+        session = self._get_session()
+        try:
+            response = session.post(self.api_base, json=payload, timeout=(self.connect_timeout, self.timeout))
+        except (requests.Timeout, requests.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+            raise RemoteCallError(f'{type(e).__name__}: {e}', retryable=True)
+        except requests.RequestException as e:
+            # 重定向过多、URL无效等，重试也不会成功
+            raise RemoteCallError(f'{type(e).__name__}: {e}', retryable=False)
+        status = response.status_code
+        if status == 429 or status >= 500:
+            retry_after = response.headers.get('Retry-After')
+            try:
+                retry_after = float(retry_after) if retry_after else None
+            except ValueError:
+                retry_after = None
+            raise RemoteCallError(f'HTTP {status}: {response.text[:200]}', retryable=True,
+                                  retry_after=retry_after, status=status)
+        if status >= 400:
+            raise RemoteCallError(f'HTTP {status}: {response.text[:200]}', retryable=False, status=status)
+        try:
+            return response.json()
+        except ValueError as e:
+            raise RemoteCallError(f'响应不是有效的JSON: {e}', retryable=False, status=status)
+    
+    def _call(self, build_payload: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        受并发限制、重试和熔断保护的远程调用（熔断时在编码图像和等待槽位之前就失败）
+
+        半开状态下的试探调用无论以何种异常结束都会了结试探：远程失败计入熔断，
+        请求发出之前的失败（图像编码出错、等待槽位超时）放行下一次试探，熔断器不会一直保持打开。
+        """
+        trial = self.breaker.allow()
+        try:
+            payload = build_payload()
+            if not self._slots.acquire(timeout=self.timeout):
+                raise OCRPoolTimeoutError(f'等待DeepSeekOCR并发槽位超时（{self.timeout}秒），'
+                                          f'当前最大并发数 {self.max_concurrency}')
+            try:
+                attempt = 0
+                while True:
+                    if attempt:
+                        trial = self.breaker.allow()
+                    with self._lock:
+                        self.requests += 1
+                    try:
+                        result = self._post(payload)
+                    except RemoteCallError as e:
+                        # 客户端错误（如密钥无效）说明服务本身正常，不计入熔断；没有收到响应的非重试错误不下结论
+                        if e.retryable:
+                            self.breaker.record_failure()
+                        elif e.status is not None:
+                            self.breaker.record_success()
+                        else:
+                            self.breaker.release_trial()
+                        trial = False
+                        if not e.retryable or attempt >= self.max_retries:
+                            with self._lock:
+                                self.failures += 1
+                            raise
+                        delay = e.retry_after if e.retry_after is not None else \
+                            random.uniform(0, self.backoff * (2 ** attempt))
+                        logger.info("DeepSeekOCR调用失败（%s），%.2f 秒后第 %d 次重试", e, delay, attempt + 1)
+                        with self._lock:
+                            self.retries += 1
+                        time.sleep(min(delay, self.timeout))
+                        attempt += 1
+                        continue
+                    except BaseException:
+                        self.breaker.record_failure()
+                        trial = False
+                        raise
+                    self.breaker.record_success()
+                    trial = False
+                    return result
+            finally:
+                self._slots.release()
+        finally:
+            if trial:
+                self.breaker.release_trial()
+    
     def recognize(self, image: np.ndarray, **kwargs) -> OCRResult:
         """使用DeepSeekOCR API识别"""
         if not self._available:
             raise RuntimeError("DeepSeekOCR API密钥未配置")
         
         try:
-            import requests
-            
-            # 将图像转换为base64
-            if len(image.shape) == 2:
-                image_rgb = cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
-            elif image.shape[2] == 3:
-                image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            else:
-                image_rgb = image
-            
-            pil_image = Image.fromarray(image_rgb)
-            buffered = io.BytesIO()
-            pil_image.save(buffered, format="PNG")
-            image_base64 = base64.b64encode(buffered.getvalue()).decode('utf-8')
-            
-            # 调用DeepSeek API
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            # 构建请求（使用视觉模型）
-            payload = {
-                "model": "deepseek-chat",  # 或使用支持视觉的模型
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": "请识别这张图片中的所有文字，返回JSON格式：{\"texts\": [\"文本1\", \"文本2\"], \"boxes\": [[[x1,y1],[x2,y2],[x3,y3],[x4,y4]], ...], \"scores\": [0.95, 0.92]}"
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/png;base64,{image_base64}"
-                                }
-                            }
-                        ]
-                    }
-                ],
-                "temperature": 0.1
-            }
-            
-            response = requests.post(self.api_base, headers=headers, json=payload, timeout=30)
-            response.raise_for_status()
-            
-            result_data = response.json()
-            
-            # 解析响应
-            # 注意：DeepSeek API的响应格式可能需要根据实际API调整
-            content = result_data.get('choices', [{}])[0].get('message', {}).get('content', '')
-            
-            # 尝试解析JSON响应
-            import json
-            try:
-                # 提取JSON部分
-                json_start = content.find('{')
-                json_end = content.rfind('}') + 1
-                if json_start >= 0 and json_end > json_start:
-                    ocr_data = json.loads(content[json_start:json_end])
-                    
-                    texts = ocr_data.get('texts', [])
-                    scores = ocr_data.get('scores', [1.0] * len(texts))
-                    boxes_data = ocr_data.get('boxes', [])
-                    
-                    boxes = []
-                    polys = []
-                    for box_data in boxes_data:
-                        if isinstance(box_data, list) and len(box_data) >= 4:
-                            box_points = [(int(p[0]), int(p[1])) for p in box_data[:4]]
-                            boxes.append(box_points)
-                            polys.append(np.array(box_data, dtype=np.int32))
-                        else:
-                            boxes.append(None)
-                            polys.append(None)
-                    
-                    return OCRResult(texts, scores, boxes, polys)
-            except (json.JSONDecodeError, KeyError, ValueError) as e:
-                print(f"解析DeepSeekOCR响应失败: {e}")
-                print(f"响应内容: {content[:500]}")
-            
-            # 如果JSON解析失败，尝试提取纯文本
-            texts = [content.strip()] if content.strip() else []
-            return OCRResult(texts, [0.9] * len(texts), [None] * len(texts))
-            
-        except ImportError:
-            raise RuntimeError("需要安装requests库: pip install requests")
+            return self._parse_response(self._call(lambda: self._build_payload(image)))
+        except (CircuitOpenError, OCRPoolTimeoutError):
+            raise
         except Exception as e:
             raise RuntimeError(f"DeepSeekOCR API调用失败: {str(e)}")
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                                    thread_name_prefix='deepseek-ocr')
+            return self._executor
+    
+    def recognize_batch(self, images: List[np.ndarray], **kwargs) -> List[OCRResult]:
+        """并发识别多张图像（并发数受 max_concurrency 限制）"""
+        if len(images) <= 1:
+            return [self.recognize(image, **kwargs) for image in images]
+        executor = self._get_executor()
+        futures = [executor.submit(self.recognize, image, **kwargs) for image in images]
+        return [future.result() for future in futures]
+    
+    async def recognize_many(self, images: List[np.ndarray]) -> List[OCRResult]:
+        """
+        异步并发识别多张图像，供 asyncio 调用方使用（HTTP请求在线程池中执行，不阻塞事件循环）
+        
+        Returns:
+            与输入顺序一致的识别结果列表；任一图像失败时抛出该异常
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        return list(await asyncio.gather(*(loop.run_in_executor(executor, self.recognize, image)
+                                           for image in images)))
+    
+    def stats(self) -> Dict[str, Any]:
+        """请求数、重试次数、最终失败次数、熔断状态和熔断拒绝次数"""
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'retries': self.retries,
+                'failures': self.failures,
+                'circuit': self.breaker.state,
+                'circuitRejected': self.breaker.rejected
+            }
+    
+    @staticmethod
+    def _parse_response(result_data: Dict[str, Any]) -> OCRResult:
+        # 解析响应
+        # 注意：DeepSeek API的响应格式可能需要根据实际API调整
+        content = result_data.get('choices', [{}])[0].get('message', {}).get('content', '')
+        
+        # 尝试解析JSON响应
+        try:
+            # 提取JSON部分
+            json_start = content.find('{')
+            json_end = content.rfind('}') + 1
+            if json_start >= 0 and json_end > json_start:
+                ocr_data = json.loads(content[json_start:json_end])
+                
+                texts = ocr_data.get('texts', [])
+                scores = ocr_data.get('scores', [1.0] * len(texts))
+                boxes_data = ocr_data.get('boxes', [])
+                
+                boxes = []
+                polys = []
+                for box_data in boxes_data:
+                    if isinstance(box_data, list) and len(box_data) >= 4:
+                        box_points = [(int(p[0]), int(p[1])) for p in box_data[:4]]
+                        boxes.append(box_points)
+                        polys.append(np.array(box_data, dtype=np.int32))
+                    else:
+                        boxes.append(None)
+                        polys.append(None)
+                
+                return OCRResult(texts, scores, boxes, polys)
+        except (json.JSONDecodeError, KeyError, ValueError) as e:
+            logger.warning("解析DeepSeekOCR响应失败: %s，响应内容: %s", e, content[:500])
+        
+        # 如果JSON解析失败，尝试提取纯文本
+        texts = [content.strip()] if content.strip() else []
+        return OCRResult(texts, [0.9] * len(texts), [None] * len(texts))
 
 # ==================== OCR提供者工厂 ====================
 
@@ -331,12 +936,35 @@ class OCRProviderFactory:
     """OCR提供者工厂"""
     
     _providers: Dict[str, OCRProvider] = {}
+    _lock = threading.Lock()
+    
+    # PaddleOCR 实例池配置（环境变量 OCR_POOL_SIZE、OCR_POOL_TIMEOUT、OCR_POOL_MAX_WAITING）
+    pool_size = int(os.getenv('OCR_POOL_SIZE', 1))
+    pool_timeout = float(os.getenv('OCR_POOL_TIMEOUT', 30))
+    pool_max_waiting = int(os.getenv('OCR_POOL_MAX_WAITING')) if os.getenv('OCR_POOL_MAX_WAITING') else None
+    # 微批配置（环境变量 OCR_BATCH_SIZE、OCR_BATCH_WAIT_MS），批大小为1时不启用；未设置批大小时
+    # 只在 PaddleOCR 支持整批推理时启用（见 paddle_batch_size）。单个请求最多多等 OCR_BATCH_WAIT_MS 毫秒
+    batch_size = int(os.getenv('OCR_BATCH_SIZE')) if os.getenv('OCR_BATCH_SIZE') else None
+    default_batch_size = 8
+    batch_wait_ms = float(os.getenv('OCR_BATCH_WAIT_MS', 2))
     
     @classmethod
     def register_provider(cls, name: str, provider: OCRProvider):
         """注册OCR提供者"""
         cls._providers[name] = provider
     
+    @classmethod
+    def paddle_batch_size(cls) -> int:
+        """
+        PaddleOCR 的微批大小
+
+        旧版 PaddleOCR 没有 predict 接口，一批图像在一个实例上逐张识别，合批只增加等待、
+        让本可以分散到多个实例的请求排队，因此未配置 OCR_BATCH_SIZE 时只在支持整批推理时启用
+        """
+        if cls.batch_size is not None:
+            return cls.batch_size
+        return cls.default_batch_size if paddleocr_supports_batch() else 1
+    
     @classmethod
     def get_provider(cls, name: str, **kwargs) -> OCRProvider:
         """
@@ -352,30 +980,78 @@ class OCRProviderFactory:
             use_angle_cls = kwargs.get('use_angle_cls', True)
             lang = kwargs.get('lang', 'ch')
             cache_key = f"paddleocr_{use_angle_cls}_{lang}"
-            if cache_key not in cls._providers:
-                cls._providers[cache_key] = PaddleOCRProvider(use_angle_cls=use_angle_cls, lang=lang)
-            return cls._providers[cache_key]
+            with cls._lock:
+                if cache_key not in cls._providers:
+                    # PaddleOCR 引擎不能并发调用，按配置创建实例池
+                    provider: OCRProvider = OCRProviderPool(
+                        lambda: PaddleOCRProvider(use_angle_cls=use_angle_cls, lang=lang),
+                        size=cls.pool_size, checkout_timeout=cls.pool_timeout,
+                        max_waiting=cls.pool_max_waiting)
+                    batch_size = cls.paddle_batch_size()
+                    if batch_size > 1:
+                        # 每个实例同一时刻执行一批
+                        provider = OCRBatcher(provider, max_batch_size=batch_size,
+                                              max_wait_ms=cls.batch_wait_ms, concurrency=cls.pool_size)
+                    cls._providers[cache_key] = provider
+                return cls._providers[cache_key]
         
         elif name_lower == 'deepseekocr':
             api_key = kwargs.get('api_key')
             api_base = kwargs.get('api_base')
             cache_key = f"deepseekocr_{api_key or 'default'}"
-            if cache_key not in cls._providers:
-                cls._providers[cache_key] = DeepSeekOCRProvider(api_key=api_key, api_base=api_base)
-            return cls._providers[cache_key]
+            with cls._lock:
+                if cache_key not in cls._providers:
+                    cls._providers[cache_key] = DeepSeekOCRProvider(api_key=api_key, api_base=api_base)
+                return cls._providers[cache_key]
         
         else:
             raise ValueError(f"未知的OCR提供者: {name}")
     
+    @classmethod
+    def pool_stats(cls) -> Dict[str, Dict[str, Any]]:
+        """各OCR实例池的状态（键为提供者配置）"""
+        with cls._lock:
+            providers = dict(cls._providers)
+        pools = {}
+        for key, provider in providers.items():
+            if isinstance(provider, OCRBatcher):
+                provider = provider.provider
+            if isinstance(provider, OCRProviderPool):
+                pools[key] = provider
+        return {key: pool.stats() for key, pool in pools.items()}
+    
+    @classmethod
+    def batcher_stats(cls) -> Dict[str, Dict[str, Any]]:
+        """各微批调度器的状态（键为提供者配置）"""
+        with cls._lock:
+            batchers = {key: provider for key, provider in cls._providers.items()
+                        if isinstance(provider, OCRBatcher)}
+        return {key: batcher.stats() for key, batcher in batchers.items()}
+    
+    @classmethod
+    def remote_stats(cls) -> Dict[str, Dict[str, Any]]:
+        """远程OCR提供者的调用统计（键为接口地址，同一地址的多个密钥合并统计）"""
+        with cls._lock:
+            remotes = [provider for provider in cls._providers.values()
+                       if isinstance(provider, DeepSeekOCRProvider)]
+        stats: Dict[str, Dict[str, Any]] = {}
+        for provider in remotes:
+            item = provider.stats()
+            total = stats.setdefault(provider.api_base, {'requests': 0, 'retries': 0, 'failures': 0,
+                                                         'circuitRejected': 0, 'circuitOpen': 0})
+            for field in ('requests', 'retries', 'failures', 'circuitRejected'):
+                total[field] += item[field]
+            total['circuitOpen'] = max(total['circuitOpen'], int(item['circuit'] == CircuitBreaker.OPEN))
+        return stats
+    
     @classmethod
     def list_available_providers(cls) -> List[str]:
         """列出所有可用的OCR提供者"""
         available = []
         
-        # 检查PaddleOCR
+        # 检查PaddleOCR（只检查是否已安装，不创建模型实例）
         try:
-            provider = PaddleOCRProvider()
-            if provider.is_available():
+            if is_paddleocr_installed():
                 available.append('paddleocr')
         except:
             pass
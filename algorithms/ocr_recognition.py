@@ -1,10 +1,13 @@
 """
 OCR识别算法模块（支持多种OCR方案：PaddleOCR、DeepSeekOCR等）
 """
+import logging
 import cv2
 import numpy as np
 from typing import Dict, Any, Optional
 
+logger = logging.getLogger(__name__)
+
 # 导入OCR提供者抽象层
 try:
     from .ocr_providers import OCRProviderFactory, OCRResult
@@ -15,19 +18,36 @@ except ImportError:
     except ImportError:
         OCRProviderFactory = None
         OCRResult = None
-        print("警告: OCR提供者模块未找到，将使用PaddleOCR作为默认方案")
+        logger.warning("OCR提供者模块未找到，将使用PaddleOCR作为默认方案")
+
+# OCR结果持久化缓存
+try:
+    from .ocr_cache import get_result_cache
+except ImportError:
+    try:
+        from algorithms.ocr_cache import get_result_cache
+    except ImportError:
+        def get_result_cache():
+            return None
 
 # 导入中文文本绘制工具
 try:
-    from .cv2_utils import put_text_safe
+    from .cv2_utils import draw_annotations, put_text_safe
 except ImportError:
     try:
-        from algorithms.cv2_utils import put_text_safe
+        from algorithms.cv2_utils import draw_annotations, put_text_safe
     except ImportError:
         # 如果导入失败，使用OpenCV默认方法（不支持中文）
         def put_text_safe(img, text, position, font_size=20, color=(0, 255, 0)):
             return cv2.putText(img, text, position, cv2.FONT_HERSHEY_SIMPLEX, 
                               font_size / 30.0, color, 2)
+        
+        def draw_annotations(img, polygons, labels, color=(0, 255, 0), thickness=2, font_size=18):
+            if len(polygons) > 0:
+                cv2.polylines(img, list(polygons), True, color, thickness)
+            for text, position in labels:
+                img = put_text_safe(img, text, position, font_size, color)
+            return img
 
 def get_info():
     """返回算法信息"""
@@ -70,6 +90,19 @@ def get_info():
         }
     }
 
+def get_footprint(parameters: Dict[str, Any]) -> Optional[int]:
+    """文字可能跨越任意分块边界，整图识别"""
+    return None
+
+def warmup():
+    """预先加载默认参数下的PaddleOCR模型（多进程部署时在fork前调用，各工作进程共享只读内存页）"""
+    if OCRProviderFactory is None:
+        return
+    provider = OCRProviderFactory.get_provider('paddleocr', use_angle_cls=True, lang='ch')
+    if provider.is_available():
+        provider.load()
+        logger.info("已预加载 %s 模型", provider.get_name())
+
 def execute(inputs: Dict[str, Any], parameters: Dict[str, Any]) -> Dict[str, Any]:
     """执行OCR识别"""
     image = inputs.get('image')
@@ -121,12 +154,20 @@ def execute(inputs: Dict[str, Any], parameters: Dict[str, Any]) -> Dict[str, Any
             # 灰度图转BGR
             image_bgr = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
         
-        # 执行OCR识别
-        ocr_result: OCRResult = provider.recognize(image_bgr)
+        # 执行OCR识别（相同图像和配置的结果从缓存读取）
+        cache = get_result_cache()
+        cache_key = cache.make_key(image_bgr, provider.cache_signature()) if cache else None
+        ocr_result: Optional[OCRResult] = cache.get(cache_key) if cache else None
+        if ocr_result is None:
+            ocr_result = provider.recognize(image_bgr)
+            if cache:
+                cache.put(cache_key, ocr_result)
         
-        # 处理识别结果
+        # 处理识别结果（识别框和文字先收集，最后一次绘制）
         all_text = []
-        print(f"使用{provider.get_name()}识别到 {len(ocr_result)} 个文本")
+        polygons = []
+        labels = []
+        logger.debug("使用%s识别到 %d 个文本", provider.get_name(), len(ocr_result))
         
         for i, item in enumerate(ocr_result):
             text = item['text']
@@ -140,42 +181,38 @@ def execute(inputs: Dict[str, Any], parameters: Dict[str, Any]) -> Dict[str, Any
             # 添加到文本列表
             all_text.append(f"{text} ({score:.2f})")
             
-            # 在图像上绘制识别框和文字
             if show_boxes and box:
                 try:
                     if poly is not None:
                         # 使用多边形坐标
-                        cv2.polylines(result, [poly], True, (0, 255, 0), 2)
-                        if len(poly) > 0:
-                            top_left = tuple(poly[0])
-                            display_text = text[:20] if len(text) > 20 else text
-                            # 使用支持中文的文本绘制函数
-                            result = put_text_safe(result, display_text, top_left, 
-                                                 font_size=18, color=(0, 255, 0))
+                        points = np.asarray(poly, dtype=np.int32)
                     elif len(box) >= 4:
                         # 使用边界框坐标
                         # box格式: [(x1,y1), (x2,y2), (x3,y3), (x4,y4)]
-                        box_array = np.array(box, dtype=np.int32)
-                        cv2.polylines(result, [box_array], True, (0, 255, 0), 2)
-                        if len(box_array) > 0:
-                            top_left = tuple(box_array[0])
-                            display_text = text[:20] if len(text) > 20 else text
-                            # 使用支持中文的文本绘制函数
-                            result = put_text_safe(result, display_text, top_left, 
-                                                 font_size=18, color=(0, 255, 0))
+                        points = np.array(box, dtype=np.int32)
+                    else:
+                        continue
+                    if points.ndim != 2 or points.shape[1] != 2:
+                        raise ValueError(f'形状 {points.shape}')
+                    polygons.append(points)
+                    if len(points) > 0:
+                        display_text = text[:20] if len(text) > 20 else text
+                        labels.append((display_text, (int(points[0][0]), int(points[0][1]))))
                 except Exception as e:
-                    print(f"绘制识别框失败: {e}")
+                    logger.warning("识别框坐标无效: %s", e)
                     continue
         
+        # 在图像上绘制识别框和文字（中文文字只做一次颜色空间转换）
+        if polygons:
+            result = draw_annotations(result, polygons, labels, color=(0, 255, 0), thickness=2, font_size=18)
+        
         # 合并所有识别的文字
         recognized_text = "\n".join(all_text) if all_text else "未识别到文字"
         
     except Exception as e:
         # 如果OCR识别失败，返回错误信息
         error_msg = f"OCR识别失败: {str(e)}"
-        print(error_msg)
-        import traceback
-        traceback.print_exc()
+        logger.exception(error_msg)
         recognized_text = error_msg
         # 在图像上显示错误信息（使用支持中文的函数）
         result = put_text_safe(result, "OCR识别失败", (10, 30), 
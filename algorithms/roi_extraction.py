@@ -3,7 +3,7 @@ ROI提取算法模块
 """
 import cv2
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 
 def get_info():
     """返回算法信息"""
@@ -40,24 +40,52 @@ def get_info():
         }
     }
 
-def execute(inputs: Dict[str, Any], parameters: Dict[str, Any]) -> Dict[str, Any]:
-    """执行ROI提取"""
-    image = inputs.get('image')
-    if image is None:
-        raise ValueError('缺少输入图像')
-    
+def get_footprint(parameters: Dict[str, Any]) -> Optional[int]:
+    """输出尺寸与输入不同，不能分块执行"""
+    return None
+
+def get_color_spec(parameters: Dict[str, Any]) -> Dict[str, str]:
+    """颜色空间：只截取区域，单通道输入直接处理"""
+    return {'input': 'any', 'output': 'same'}
+
+def get_crop(parameters: Dict[str, Any], shape: Tuple[int, ...]) -> Optional[Tuple[int, int, int, int]]:
+    """
+    对给定尺寸的输入，execute() 截取的区域 (y0, y1, x0, x1)；区域为空（返回原图）时为 None
+
+    执行引擎据此把裁剪提前到上游局部运算之前（见 workflow_engine.find_crop_pushdowns）。
+    """
+    x, y, width, height = _clamp_window(parameters, shape[0], shape[1])
+    if width <= 0 or height <= 0:
+        return None
+    return y, y + height, x, x + width
+
+def crop_parameters(parameters: Dict[str, Any], window: Tuple[int, int, int, int]) -> Dict[str, Any]:
+    """截取指定区域 (y0, y1, x0, x1) 的参数"""
+    y0, y1, x0, x1 = window
+    return dict(parameters, x=x0, y=y0, width=x1 - x0, height=y1 - y0)
+
+def _clamp_window(parameters: Dict[str, Any], h: int, w: int) -> Tuple[int, int, int, int]:
+    """把参数中的区域限制在图像范围内，返回 (x, y, width, height)"""
     x = int(parameters.get('x', 0))
     y = int(parameters.get('y', 0))
     width = int(parameters.get('width', 100))
     height = int(parameters.get('height', 100))
     
-    h, w = image.shape[:2]
-    
     # 确保坐标在图像范围内
     x = max(0, min(x, w - 1))
     y = max(0, min(y, h - 1))
     width = min(width, w - x)
     height = min(height, h - y)
+    return x, y, width, height
+
+def execute(inputs: Dict[str, Any], parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """执行ROI提取"""
+    image = inputs.get('image')
+    if image is None:
+        raise ValueError('缺少输入图像')
+    
+    h, w = image.shape[:2]
+    x, y, width, height = _clamp_window(parameters, h, w)
     
     # 提取ROI
     roi = image[y:y+height, x:x+width]
@@ -1,18 +1,36 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory
 from flask_cors import CORS
 import os
 import json
 import cv2
 import numpy as np
-from PIL import Image
 import base64
-import io
-from typing import Dict, List, Any
+import hashlib
+from typing import Dict, List, Any, Optional
+from urllib.parse import quote
 import importlib
+import logging
+import queue
+import re
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from werkzeug.utils import secure_filename
 
+from buffer_pool import BufferPool
+from caching import ByteLRUCache, NodeOutputCache, hash_array
+from image_codec import MIME_TO_FORMAT, decode_image, encode_image, normalize_format
+from image_store import load_decoded, store_decoded
+from metrics import MetricsRegistry
+from sweep import SweepSummary, parse_sweep_values
+from tiling import TilingOptions
+from workflow_engine import (PlanRegistry, WorkflowError, NodeExecutionError,
+                             compile_workflow, execute_plan, execute_sweep, extract_image)
+
+logger = logging.getLogger(__name__)
+
 app = Flask(__name__, static_folder='static')
 CORS(app)
 
@@ -23,11 +41,160 @@ app.config['JSON_AS_ASCII'] = False
 UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff', 'webp'}
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_CONTENT_LENGTH_MB', 16)) * 1024 * 1024  # 默认16MB
+
+# 结果图像默认的PNG压缩级别（0-9，越低编码越快、文件越大）
+app.config['PNG_COMPRESSION_LEVEL'] = int(os.environ.get('PNG_COMPRESSION_LEVEL', 1))
+
+# 按请求的性能分析（profile=1），默认关闭，仅在排查问题时通过环境变量开启
+app.config['ENABLE_PROFILING'] = os.environ.get('ENABLE_PROFILING', '').lower() in ('1', 'true', 'yes', 'on')
+
+# 批量执行配置：结果输出目录、允许读取的服务器目录（os.pathsep 分隔）、默认进程数
+OUTPUT_FOLDER = 'outputs'
+app.config['OUTPUT_FOLDER'] = OUTPUT_FOLDER
+app.config['BATCH_INPUT_DIRS'] = [UPLOAD_FOLDER] + [
+    d for d in os.environ.get('BATCH_INPUT_DIRS', '').split(os.pathsep) if d]
+app.config['BATCH_WORKERS'] = int(os.environ.get('BATCH_WORKERS', os.cpu_count() or 1))
 
 # 算法模块注册表
 ALGORITHM_MODULES = {}
 
+# 已编译的工作流执行计划
+app.config['MAX_REGISTERED_WORKFLOWS'] = 256
+PLAN_REGISTRY = PlanRegistry(max_plans=app.config['MAX_REGISTERED_WORKFLOWS'])
+
+# 注册的工作流定义同时保存到该目录，多进程部署时任一工作进程都能按 workflowId 找到
+app.config['WORKFLOW_FOLDER'] = os.environ.get('WORKFLOW_FOLDER', 'workflows')
+
+# 多进程部署时的工作进程数（serve.py 启动 gunicorn 前设置）。以下线程数和内存预算未单独配置时按进程数均分，
+# 使整机的计算线程数约为CPU核数、缓存总量与单进程部署相同；单独配置的值为每个进程的取值
+app.config['SERVER_WORKERS'] = max(1, int(os.environ.get('SERVER_WORKERS', 1)))
+
+def _per_worker(total: int) -> int:
+    """整机默认值按工作进程数均分后的每进程取值（至少为1）"""
+    return max(1, total // app.config['SERVER_WORKERS'])
+
+# 节点并行执行线程池（所有请求共享，单个请求可通过 maxParallel 限制并行度）
+app.config['WORKFLOW_MAX_WORKERS'] = int(os.environ.get('WORKFLOW_MAX_WORKERS') or _per_worker(os.cpu_count() or 4))
+NODE_POOL = ThreadPoolExecutor(max_workers=app.config['WORKFLOW_MAX_WORKERS'],
+                               thread_name_prefix='workflow-node')
+
+# 大图分块执行：局部运算节点的输入达到 TILE_MIN_MEGAPIXELS 时按 TILE_SIZE 分块并行处理
+# （块任务使用独立线程池，避免节点任务等待同一线程池中的块任务而死锁）
+app.config['TILE_SIZE'] = int(os.environ.get('TILE_SIZE', 1024))
+app.config['TILE_MIN_MEGAPIXELS'] = float(os.environ.get('TILE_MIN_MEGAPIXELS', 16))
+TILE_POOL = ThreadPoolExecutor(max_workers=app.config['WORKFLOW_MAX_WORKERS'],
+                               thread_name_prefix='workflow-tile')
+TILING = TilingOptions(tile_size=app.config['TILE_SIZE'],
+                       min_pixels=int(app.config['TILE_MIN_MEGAPIXELS'] * 1e6),
+                       pool=TILE_POOL, max_in_flight=app.config['WORKFLOW_MAX_WORKERS'] * 2)
+
+# 节点输出缓存（按字节预算LRU淘汰），参数调整后只需重新计算受影响的节点
+app.config['NODE_CACHE_MAX_BYTES'] = int(os.environ.get('NODE_CACHE_MAX_BYTES') or _per_worker(512 * 1024 * 1024))
+NODE_CACHE = NodeOutputCache(max_bytes=app.config['NODE_CACHE_MAX_BYTES'])
+
+# 节点输出和临时数组的缓冲池（按形状和类型复用整幅图像大小的数组，字节预算为保留的空闲数组上限）
+app.config['BUFFER_POOL_MAX_BYTES'] = int(os.environ.get('BUFFER_POOL_MAX_BYTES') or _per_worker(256 * 1024 * 1024))
+BUFFER_POOL = BufferPool(max_bytes=app.config['BUFFER_POOL_MAX_BYTES'])
+
+# 已上传图像的解码缓存（按上传文件名引用），重复执行时跳过传输和解码
+app.config['IMAGE_CACHE_MAX_BYTES'] = int(os.environ.get('IMAGE_CACHE_MAX_BYTES') or _per_worker(512 * 1024 * 1024))
+IMAGE_CACHE = ByteLRUCache(max_bytes=app.config['IMAGE_CACHE_MAX_BYTES'],
+                           sizeof=lambda entry: entry[0].nbytes)
+
+# 上传时把解码结果保存为 .npy 文件，执行时只读内存映射（各工作进程共享页缓存，不再各自解码）
+app.config['DECODED_STORE_ENABLED'] = os.environ.get('DECODED_STORE_ENABLED', '1').lower() in ('1', 'true', 'yes', 'on')
+
+# 参数扫描：单次请求的取值数上限、缩略图条带的默认高度
+app.config['SWEEP_MAX_VALUES'] = int(os.environ.get('SWEEP_MAX_VALUES', 256))
+app.config['SWEEP_THUMBNAIL_HEIGHT'] = int(os.environ.get('SWEEP_THUMBNAIL_HEIGHT', 128))
+
+# 运行指标（/api/metrics 以 Prometheus 文本格式导出）
+METRICS = MetricsRegistry()
+HTTP_REQUESTS = METRICS.counter('http_requests_total', 'API请求数', ['endpoint', 'status'])
+REQUEST_DURATION = METRICS.histogram('workflow_request_duration_seconds', '工作流执行请求的总耗时', ['endpoint'])
+STAGE_DURATION = METRICS.histogram('workflow_stage_duration_seconds',
+                                   '工作流执行各阶段耗时（decode/execute/encode）', ['stage'])
+NODE_DURATION = METRICS.histogram('workflow_node_duration_seconds', '节点 execute() 耗时（不含缓存命中）',
+                                  ['algorithm'])
+NODE_EXECUTIONS = METRICS.counter('workflow_node_executions_total', '节点执行次数', ['algorithm', 'cached'])
+ACTIVE_EXECUTIONS = METRICS.gauge('workflow_active_executions', '正在执行的工作流数')
+
+def _cache_samples(field: str):
+    def collect():
+        caches = [('node_outputs', NODE_CACHE), ('decoded_images', IMAGE_CACHE), ('buffers', BUFFER_POOL)]
+        # OCR结果缓存在首次识别时才创建
+        ocr_cache = sys.modules.get('algorithms.ocr_cache')
+        if ocr_cache is not None and ocr_cache.active_result_cache() is not None:
+            caches.append(('ocr_results', ocr_cache.active_result_cache()))
+        return [((name, ), cache.stats()[field]) for name, cache in caches]
+    return collect
+
+METRICS.sampled('workflow_cache_entries', '缓存条目数', ['cache'], _cache_samples('entries'))
+METRICS.sampled('workflow_cache_bytes', '缓存占用字节数', ['cache'], _cache_samples('bytes'))
+METRICS.sampled('workflow_cache_max_bytes', '缓存字节预算', ['cache'], _cache_samples('maxBytes'))
+METRICS.sampled('workflow_cache_hits_total', '缓存命中次数', ['cache'], _cache_samples('hits'), kind='counter')
+METRICS.sampled('workflow_cache_misses_total', '缓存未命中次数', ['cache'], _cache_samples('misses'),
+                kind='counter')
+METRICS.sampled('workflow_cache_evictions_total', '缓存淘汰次数', ['cache'], _cache_samples('evictions'),
+                kind='counter')
+METRICS.sampled('workflow_registered_plans', '已注册的执行计划数', [], lambda: [((), len(PLAN_REGISTRY))])
+# 线程池未公开排队任务数，读取其内部工作队列的长度
+METRICS.sampled('workflow_node_queue_depth', '节点线程池中等待执行的任务数', [],
+                lambda: [((), NODE_POOL._work_queue.qsize())])
+
+def _ocr_pool_samples(field: str):
+    def collect():
+        # OCR模块未加载（或尚未创建实例池）时没有数据，不为采集指标而导入
+        providers = sys.modules.get('algorithms.ocr_providers')
+        if providers is None:
+            return []
+        return [((key, ), stats[field]) for key, stats in providers.OCRProviderFactory.pool_stats().items()]
+    return collect
+
+METRICS.sampled('ocr_pool_size', 'OCR实例池容量', ['pool'], _ocr_pool_samples('size'))
+METRICS.sampled('ocr_pool_in_use', '正在识别的OCR实例数', ['pool'], _ocr_pool_samples('inUse'))
+METRICS.sampled('ocr_pool_waiting', '等待空闲OCR实例的请求数', ['pool'], _ocr_pool_samples('waiting'))
+METRICS.sampled('ocr_pool_checkouts_total', 'OCR实例借出次数', ['pool'], _ocr_pool_samples('checkouts'),
+                kind='counter')
+METRICS.sampled('ocr_pool_wait_seconds_total', '等待OCR实例的累计时间（秒）', ['pool'],
+                _ocr_pool_samples('waitSeconds'), kind='counter')
+METRICS.sampled('ocr_pool_timeouts_total', '等待OCR实例超时的次数', ['pool'], _ocr_pool_samples('timeouts'),
+                kind='counter')
+METRICS.sampled('ocr_pool_rejected_total', '等待队列已满被拒绝的次数', ['pool'], _ocr_pool_samples('rejected'),
+                kind='counter')
+
+def _ocr_batch_samples(field: str):
+    def collect():
+        providers = sys.modules.get('algorithms.ocr_providers')
+        if providers is None:
+            return []
+        return [((key, ), stats[field]) for key, stats in providers.OCRProviderFactory.batcher_stats().items()]
+    return collect
+
+METRICS.sampled('ocr_batches_total', 'OCR微批执行次数', ['pool'], _ocr_batch_samples('batches'), kind='counter')
+METRICS.sampled('ocr_batched_images_total', 'OCR微批识别的图像数', ['pool'], _ocr_batch_samples('images'),
+                kind='counter')
+METRICS.sampled('ocr_batch_queued', '等待凑批的OCR图像数', ['pool'], _ocr_batch_samples('queued'))
+
+def _ocr_remote_samples(field: str):
+    def collect():
+        providers = sys.modules.get('algorithms.ocr_providers')
+        if providers is None:
+            return []
+        return [((endpoint, ), stats[field]) for endpoint, stats in providers.OCRProviderFactory.remote_stats().items()]
+    return collect
+
+METRICS.sampled('ocr_remote_requests_total', '远程OCR接口请求次数（含重试）', ['endpoint'],
+                _ocr_remote_samples('requests'), kind='counter')
+METRICS.sampled('ocr_remote_retries_total', '远程OCR接口重试次数', ['endpoint'], _ocr_remote_samples('retries'),
+                kind='counter')
+METRICS.sampled('ocr_remote_failures_total', '重试后仍失败的远程OCR调用次数', ['endpoint'],
+                _ocr_remote_samples('failures'), kind='counter')
+METRICS.sampled('ocr_remote_circuit_rejected_total', '熔断期间被立即拒绝的调用次数', ['endpoint'],
+                _ocr_remote_samples('circuitRejected'), kind='counter')
+METRICS.sampled('ocr_remote_circuit_open', '熔断器是否打开（1为打开）', ['endpoint'], _ocr_remote_samples('circuitOpen'))
+
 def allowed_file(filename):
     """检查文件扩展名是否允许"""
     return '.' in filename and \
@@ -49,7 +216,7 @@ def load_algorithm_modules():
                     if hasattr(module, 'execute'):
                         ALGORITHM_MODULES[module_name] = module
                 except Exception as e:
-                    print(f"加载算法模块 {module_name} 失败: {e}")
+                    logger.warning("加载算法模块 %s 失败: %s", module_name, e)
 
 # 初始化时加载算法模块
 load_algorithm_modules()
@@ -73,18 +240,14 @@ def app_js():
 def upload_image():
     """上传图片到服务器"""
     try:
-        print(f"收到上传请求，方法: {request.method}")
-        print(f"Content-Type: {request.content_type}")
-        print(f"请求文件: {list(request.files.keys())}")
+        logger.debug("收到上传请求，Content-Type: %s，文件字段: %s",
+                     request.content_type, list(request.files.keys()))
         
         if 'file' not in request.files:
-            print("错误: 请求中没有 'file' 字段")
+            logger.warning("上传请求中没有 'file' 字段")
             return jsonify({'error': '没有文件，请确保表单字段名为 file'}), 400
         
         file = request.files['file']
-        print(f"文件对象: {file}")
-        print(f"文件名: {file.filename}")
-        print(f"文件类型: {file.content_type}")
         
         if file.filename == '':
             return jsonify({'error': '未选择文件'}), 400
@@ -94,7 +257,6 @@ def upload_image():
         
         # 确保上传目录存在
         os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-        print(f"上传目录: {os.path.abspath(UPLOAD_FOLDER)}")
         
         # 生成安全的文件名（时间戳 + 原始文件名）
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -102,8 +264,6 @@ def upload_image():
         filename = f"{timestamp}_{original_filename}"
         filepath = os.path.join(UPLOAD_FOLDER, filename)
         
-        print(f"保存文件到: {os.path.abspath(filepath)}")
-        
         # 保存文件
         file.save(filepath)
         
@@ -111,7 +271,14 @@ def upload_image():
             return jsonify({'error': '文件保存失败'}), 500
         
         file_size = os.path.getsize(filepath)
-        print(f"文件保存成功，大小: {file_size} 字节")
+        
+        # 解码一次并保存解码文件，之后的执行直接映射（解码失败不影响上传，执行时再报错）
+        if app.config['DECODED_STORE_ENABLED']:
+            try:
+                with open(filepath, 'rb') as f:
+                    store_decoded(filepath, decode_image(f.read()))
+            except Exception as e:
+                logger.warning("保存 %s 的解码文件失败: %s", filename, e)
         
         # 读取图片并转换为base64（用于前端显示）
         with open(filepath, 'rb') as f:
@@ -140,14 +307,12 @@ def upload_image():
             'size': file_size
         }
         
-        print(f"上传成功: {filename}")
+        logger.info("上传成功: %s（%d 字节）", filename, file_size)
         return jsonify(result)
             
     except Exception as e:
-        import traceback
         error_msg = str(e)
-        traceback.print_exc()
-        print(f"上传异常: {error_msg}")
+        logger.exception("上传异常: %s", error_msg)
         return jsonify({'error': f'上传失败: {error_msg}'}), 500
 
 @app.route('/uploads/<filename>')
@@ -155,9 +320,8 @@ def uploaded_file(filename):
     """提供上传的文件"""
     return send_from_directory(UPLOAD_FOLDER, filename)
 
-@app.route('/api/algorithms', methods=['GET'])
-def get_algorithms():
-    """获取所有可用的算法列表"""
+def build_algorithm_catalog() -> List[Dict[str, Any]]:
+    """调用各算法模块的 get_info() 生成算法列表"""
     algorithms = []
     for name, module in ALGORITHM_MODULES.items():
         if hasattr(module, 'get_info'):
@@ -179,216 +343,794 @@ def get_algorithms():
                 'outputs': ['image'],
                 'parameters': {}
             })
-    return jsonify(algorithms)
+    return algorithms
 
-@app.route('/api/execute', methods=['POST'])
-def execute_workflow():
-    """执行工作流"""
+# 算法列表在首次请求时生成并缓存（JSON正文和ETag），算法模块只在启动时加载，内容不会变化
+_catalog_cache = None
+_catalog_lock = threading.Lock()
+
+def get_algorithm_catalog(refresh: bool = False):
+    """
+    获取缓存的算法列表
+
+    Returns:
+        (JSON正文, ETag)
+    """
+    global _catalog_cache
+    with _catalog_lock:
+        if _catalog_cache is None or refresh:
+            body = json.dumps(build_algorithm_catalog(), ensure_ascii=False)
+            _catalog_cache = (body, hashlib.sha1(body.encode('utf-8')).hexdigest()[:16])
+        return _catalog_cache
+
+@app.route('/api/algorithms', methods=['GET'])
+def get_algorithms():
+    """获取所有可用的算法列表（refresh=1 时重新生成，例如配置OCR密钥后）"""
+    body, etag = get_algorithm_catalog(refresh=_flag(request.args.get('refresh'), False))
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+def _workflow_path(plan_id: str) -> Optional[str]:
+    """已注册工作流定义的文件路径（ID格式不合法时返回 None）"""
+    if not re.fullmatch(r'[0-9a-f]{16}', plan_id):
+        return None
+    return os.path.join(app.config['WORKFLOW_FOLDER'], f'{plan_id}.json')
+
+def save_workflow(plan):
+    """
+    保存规范化的工作流定义和工作流ID（先写临时文件再替换，其他进程不会读到不完整的文件）
+    """
+    filepath = _workflow_path(plan.plan_id)
+    os.makedirs(app.config['WORKFLOW_FOLDER'], exist_ok=True)
+    temp_path = f'{filepath}.{os.getpid()}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(dict(plan.workflow, workflowId=plan.plan_id), f, ensure_ascii=False)
+    os.replace(temp_path, filepath)
+
+def lookup_plan(plan_id: str):
+    """
+    按ID查找执行计划：先查本进程的注册表，再从已保存的工作流定义重新编译
+
+    文件中记录的ID与请求的ID不一致时视为无效；重新编译的计划总是以请求的ID注册，
+    与客户端注册时得到的ID一致（旧版本按未规范化的定义计算ID，重新编译后可能不同）。
+    """
+    plan = PLAN_REGISTRY.get(plan_id)
+    if plan is not None:
+        return plan
+    filepath = _workflow_path(plan_id)
+    if filepath is None or not os.path.isfile(filepath):
+        return None
     try:
-        data = request.json
-        nodes = data.get('nodes', [])
-        edges = data.get('edges', [])
-        input_image = data.get('inputImage')
-        
-        print(f"收到执行请求:")
-        print(f"  节点数量: {len(nodes)}")
-        print(f"  边数量: {len(edges)}")
-        print(f"  输入图像: {'有' if input_image else '无'}")
-        
-        if not input_image:
-            return jsonify({'error': '未提供输入图像'}), 400
-        
-        # 解码输入图像
+        with open(filepath, encoding='utf-8') as f:
+            workflow = json.load(f)
+        plan = compile_workflow(workflow['nodes'], workflow['edges'], ALGORITHM_MODULES)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning("加载已保存的工作流 %s 失败: %s", plan_id, e)
+        return None
+    if workflow.get('workflowId', plan_id) != plan_id:
+        logger.warning("已保存的工作流 %s 的文件记录的ID为 %s，忽略该文件", plan_id, workflow.get('workflowId'))
+        return None
+    if plan.plan_id != plan_id:
+        logger.warning("已保存的工作流 %s 重新编译后ID为 %s，按原ID注册", plan_id, plan.plan_id)
+        plan = plan._replace(plan_id=plan_id)
+    return PLAN_REGISTRY.register(plan)
+
+@app.route('/api/workflows', methods=['POST'])
+def register_workflow():
+    """校验并编译工作流，返回执行计划ID"""
+    data = request.json or {}
+    try:
+        plan = PLAN_REGISTRY.register(
+            compile_workflow(data.get('nodes', []), data.get('edges', []), ALGORITHM_MODULES))
+    except WorkflowError as e:
+        return jsonify({'error': str(e)}), 400
+    save_workflow(plan)
+    result = {'success': True}
+    result.update(plan.describe())
+    return jsonify(result)
+
+@app.route('/api/workflows/<workflow_id>', methods=['GET'])
+def get_workflow(workflow_id):
+    """获取已注册的执行计划"""
+    plan = lookup_plan(workflow_id)
+    if plan is None:
+        return jsonify({'error': f'工作流 {workflow_id} 不存在或已过期'}), 404
+    return jsonify(plan.describe())
+
+@app.route('/api/workflows/<workflow_id>', methods=['DELETE'])
+def delete_workflow(workflow_id):
+    """删除已注册的执行计划"""
+    removed = PLAN_REGISTRY.remove(workflow_id)
+    filepath = _workflow_path(workflow_id)
+    if filepath is not None and os.path.isfile(filepath):
+        os.remove(filepath)
+        removed = True
+    if not removed:
+        return jsonify({'error': f'工作流 {workflow_id} 不存在或已过期'}), 404
+    return jsonify({'success': True})
+
+@app.route('/api/cache', methods=['GET'])
+def get_cache_stats():
+    """获取节点输出缓存、图像解码缓存和缓冲池的统计（命中/未命中次数、占用字节数等）"""
+    return jsonify({'nodeOutputs': NODE_CACHE.stats(), 'decodedImages': IMAGE_CACHE.stats(),
+                    'buffers': BUFFER_POOL.stats()})
+
+@app.route('/api/cache', methods=['DELETE'])
+def clear_cache():
+    """清空节点输出缓存、图像解码缓存和缓冲池"""
+    NODE_CACHE.clear()
+    IMAGE_CACHE.clear()
+    BUFFER_POOL.clear()
+    return jsonify({'success': True})
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """以 Prometheus 文本格式导出运行指标（请求/阶段/节点耗时直方图，缓存和队列状态）"""
+    return Response(METRICS.render(), mimetype='text/plain; version=0.0.4')
+
+@app.after_request
+def count_api_request(response):
+    """统计API请求数（按路由和状态码）"""
+    if request.endpoint and request.path.startswith('/api/'):
+        HTTP_REQUESTS.inc(request.endpoint, str(response.status_code))
+    return response
+
+def _stage(timings: Optional[Dict[str, Any]], stage: str, start: float):
+    """记录执行阶段（decode/execute/encode）的耗时，计入阶段耗时直方图"""
+    elapsed = time.perf_counter() - start
+    STAGE_DURATION.observe(elapsed, stage)
+    if timings is not None:
+        timings[f'{stage}Ms'] = round(elapsed * 1000, 3)
+
+def run_plan(plan, image_array: np.ndarray, options: Dict[str, Any], timings: Dict[str, Any],
+             on_event=None) -> Dict[str, Any]:
+    """
+    执行工作流并记录执行阶段和各节点的耗时
+
+    timings 中写入 executeMs、nodes（各节点耗时）和 memory（内存统计）
+    """
+    run_stats = {}
+    ACTIVE_EXECUTIONS.inc()
+    start = time.perf_counter()
+    try:
+        return execute_plan(plan, image_array, on_event=on_event, stats=run_stats, **options)
+    finally:
+        ACTIVE_EXECUTIONS.dec()
+        _stage(timings, 'execute', start)
+        for node in run_stats.get('nodes', []):
+            NODE_EXECUTIONS.inc(node['algorithm'], 'true' if node['cached'] else 'false')
+            if not node['cached']:
+                NODE_DURATION.observe(node['durationMs'] / 1000, node['algorithm'])
+        timings['nodes'] = run_stats.get('nodes', [])
+        timings['memory'] = {key: run_stats.get(key)
+                             for key in ('peakOutputBytes', 'peakRssBytes', 'releasedOutputs')}
+
+def _timing_report(timings: Dict[str, Any], start: float) -> Dict[str, Any]:
+    """整理返回给客户端的耗时明细（毫秒）"""
+    report = {key: value for key, value in timings.items() if key != 'memory'}
+    report['totalMs'] = round((time.perf_counter() - start) * 1000, 3)
+    return report
+
+def _server_timing(report: Dict[str, Any]) -> str:
+    """生成 Server-Timing 响应头（浏览器开发者工具可直接显示）"""
+    entries = [f'{stage};dur={report[stage + "Ms"]}' for stage in ('decode', 'execute', 'encode', 'total')
+               if stage + 'Ms' in report]
+    for index, node in enumerate(report.get('nodes', [])):
+        desc = f'{node["node"]} ({node["algorithm"]}{", cached" if node["cached"] else ""})'
+        entries.append(f'node{index};desc={json.dumps(desc, ensure_ascii=True)};dur={node["durationMs"]}')
+    return ', '.join(entries)
+
+def load_uploaded_image(filename: str):
+    """
+    按上传文件名加载已解码的图像（带LRU缓存，文件被覆盖后自动失效）
+
+    启用解码存储时数组是解码文件的只读内存映射，像素位于页缓存中，多个工作进程共享；
+    缓存的字节预算按映射大小计算。
+
+    Returns:
+        ((image_array, digest), error_response)，缓存中的数组为只读
+    """
+    filepath = os.path.join(UPLOAD_FOLDER, secure_filename(filename))
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None, (jsonify({'error': f'上传文件不存在: {filename}'}), 404)
+    key = (filepath, stat.st_mtime_ns, stat.st_size)
+    entry = IMAGE_CACHE.get(key)
+    if entry is None:
         try:
-            if ',' in input_image:
-                image_data = base64.b64decode(input_image.split(',')[1])
+            if app.config['DECODED_STORE_ENABLED']:
+                image_array = load_decoded(filepath, decode_image)
             else:
-                image_data = base64.b64decode(input_image)
-            image = Image.open(io.BytesIO(image_data))
-            image_array = np.array(image)
-            print(f"  输入图像形状: {image_array.shape}")
+                with open(filepath, 'rb') as f:
+                    image_array = decode_image(f.read())
+                image_array.flags.writeable = False
         except Exception as e:
-            print(f"  解码输入图像失败: {e}")
-            return jsonify({'error': f'解码输入图像失败: {str(e)}'}), 400
-        
-        # 构建节点执行顺序（拓扑排序）
-        execution_order = topological_sort(nodes, edges)
-        print(f"  执行顺序: {execution_order}")
-        
-        # 存储每个节点的输出
-        node_outputs = {}
-        
-        # 按顺序执行节点
-        for node_id in execution_order:
-            print(f"\n执行节点: {node_id}")
-            node = next((n for n in nodes if n['id'] == node_id), None)
-            if not node:
-                continue
-            
-            algorithm_name = node.get('type')
-            if algorithm_name not in ALGORITHM_MODULES:
-                return jsonify({'error': f'算法 {algorithm_name} 不存在'}), 400
-            
-            module = ALGORITHM_MODULES[algorithm_name]
-            
-            # 收集输入
-            inputs = {}
-            connected_sources = []
-            for edge in edges:
-                if edge['target'] == node_id:
-                    source_node_id = edge['source']
-                    connected_sources.append(source_node_id)
-                    if source_node_id in node_outputs:
-                        source_output = node_outputs[source_node_id]
-                        # 从源节点输出中提取图像
-                        if isinstance(source_output, dict):
-                            # 如果是字典，尝试获取 'image' 或 'output' 键
-                            source_image = source_output.get('image')
-                            if source_image is None:
-                                source_image = source_output.get('output')
-                        elif isinstance(source_output, np.ndarray):
-                            # 如果直接是数组，直接使用
-                            source_image = source_output
-                        else:
-                            source_image = None
-                        
-                        if source_image is not None:
-                            target_handle = edge.get('targetHandle', 'input')
-                            # 统一使用 'image' 作为输入键
-                            inputs['image'] = source_image
-                            print(f"    从节点 {source_node_id} 获取输入图像，形状: {source_image.shape if isinstance(source_image, np.ndarray) else 'N/A'}")
-                    else:
-                        print(f"    警告: 源节点 {source_node_id} 的输出不存在")
-            
-            # 如果没有输入，使用原始图像
-            if 'image' not in inputs or inputs['image'] is None:
-                inputs['image'] = image_array
-                print(f"    使用原始输入图像，形状: {image_array.shape}")
-            
-            print(f"    最终输入图像形状: {inputs['image'].shape if isinstance(inputs['image'], np.ndarray) else 'N/A'}")
-            
-            # 验证输入图像是否存在
-            if 'image' not in inputs or inputs['image'] is None:
-                return jsonify({'error': f'节点 {node_id} 缺少输入图像。节点类型: {algorithm_name}'}), 500
-            
-            # 获取节点参数
-            parameters = node.get('data', {}).get('parameters', {})
-            
-            # 执行算法
+            return None, (jsonify({'error': f'解码输入图像失败: {str(e)}'}), 400)
+        entry = (image_array, hash_array(image_array))
+        IMAGE_CACHE.put(key, entry)
+    return entry, None
+
+def resolve_plan(data: Dict[str, Any]):
+    """
+    根据请求获取执行计划：优先使用 workflowId，否则编译请求中的 nodes/edges
+
+    Returns:
+        (plan, error_response)，二者有且只有一个不为 None
+    """
+    plan_id = data.get('workflowId')
+    if plan_id:
+        plan = lookup_plan(plan_id)
+        if plan is None:
+            return None, (jsonify({'error': f'工作流 {plan_id} 不存在或已过期，请重新注册'}), 404)
+        return plan, None
+    try:
+        return PLAN_REGISTRY.get_or_compile(data.get('nodes', []), data.get('edges', []),
+                                            ALGORITHM_MODULES), None
+    except WorkflowError as e:
+        return None, (jsonify({'error': str(e)}), 400)
+
+def _flag(value: Any, default: bool) -> bool:
+    """解析布尔选项（兼容JSON布尔值和表单/查询参数字符串）"""
+    if value is None:
+        return default
+    if isinstance(value, str):
+        return value.strip().lower() not in ('', '0', 'false', 'no', 'off')
+    return bool(value)
+
+def read_execution_request():
+    """
+    读取执行请求，支持三种形式：
+      - application/json：inputImage 为 base64 编码的图像，或 filename 引用已上传的文件
+      - multipart/form-data：image 字段为图像文件，workflow 字段为 JSON 字符串
+      - image/* 或 application/octet-stream：请求体即图像文件，选项放在查询参数中
+    查询参数（如 format、quality）对所有形式都有效。
+
+    Returns:
+        (data, image_bytes, error_response)
+    """
+    mimetype = request.mimetype or ''
+    if mimetype == 'multipart/form-data':
+        try:
+            data = json.loads(request.form.get('workflow') or '{}')
+        except json.JSONDecodeError as e:
+            return None, None, (jsonify({'error': f'workflow 字段不是有效的JSON: {str(e)}'}), 400)
+        file = request.files.get('image')
+        image_bytes = file.read() if file else None
+    elif mimetype.startswith('image/') or mimetype == 'application/octet-stream':
+        data = {}
+        image_bytes = request.get_data() or None
+    else:
+        data = request.get_json(silent=True) or {}
+        image_bytes = None
+        input_image = data.get('inputImage')
+        if input_image:
             try:
-                result = module.execute(inputs, parameters)
-                # 确保结果格式正确
-                if result is None:
-                    return jsonify({'error': f'节点 {node_id} 执行后未返回结果'}), 500
-                node_outputs[node_id] = result
+                image_bytes = base64.b64decode(input_image.split(',', 1)[1] if ',' in input_image else input_image)
             except Exception as e:
-                import traceback
-                error_detail = traceback.format_exc()
-                print(f"执行节点 {node_id} 时出错:")
-                print(f"  算法: {algorithm_name}")
-                print(f"  输入键: {list(inputs.keys())}")
-                print(f"  输入图像类型: {type(inputs.get('image'))}")
-                if isinstance(inputs.get('image'), np.ndarray):
-                    print(f"  输入图像形状: {inputs['image'].shape}")
-                print(f"  错误: {str(e)}")
-                print(f"  堆栈: {error_detail}")
-                return jsonify({'error': f'执行节点 {node_id} 时出错: {str(e)}'}), 500
-        
-        # 获取最终输出（最后一个节点或指定输出节点）
-        final_output = None
-        if node_outputs:
-            # 找到没有输出的节点作为最终输出
-            output_nodes = [n['id'] for n in nodes if not any(e['source'] == n['id'] for e in edges)]
-            if output_nodes:
-                final_output = node_outputs[output_nodes[0]]
-            else:
-                # 使用最后一个执行的节点
-                final_output = node_outputs[execution_order[-1]]
-        
-        if final_output is None:
-            return jsonify({'error': '没有输出结果'}), 400
-        
-        # 提取输出图像和文本
-        output_image = None
-        output_text = None
-        
-        if isinstance(final_output, dict):
-            output_image = final_output.get('image')
-            if output_image is None:
-                output_image = final_output.get('output')
-            output_text = final_output.get('text')
-        else:
-            output_image = final_output
-        
-        result_data = {'success': True}
-        
-        # 处理图像输出
-        if output_image is not None:
-            if isinstance(output_image, np.ndarray):
-                # 转换为PIL Image
-                if len(output_image.shape) == 3:
-                    output_image = Image.fromarray(output_image.astype(np.uint8))
-                else:
-                    output_image = Image.fromarray(output_image.astype(np.uint8), mode='L')
-            
-            # 编码为base64
-            buffer = io.BytesIO()
-            output_image.save(buffer, format='PNG')
-            img_base64 = base64.b64encode(buffer.getvalue()).decode()
-            result_data['result'] = f'data:image/png;base64,{img_base64}'
-        
-        # 处理文本输出（如OCR识别结果）
-        if output_text:
-            result_data['text'] = output_text
-        
-        if 'result' in result_data:
-            return jsonify(result_data)
-        else:
-            return jsonify({'error': '算法未返回图像结果'}), 400
-            
-    except Exception as e:
-        return jsonify({'error': f'执行工作流时出错: {str(e)}'}), 500
+                return None, None, (jsonify({'error': f'解码输入图像失败: {str(e)}'}), 400)
+    for key, value in request.args.items():
+        data.setdefault(key, value)
+    return data, image_bytes, None
 
-def topological_sort(nodes: List[Dict], edges: List[Dict]) -> List[str]:
-    """拓扑排序，确定节点执行顺序"""
-    # 构建图
-    graph = {node['id']: [] for node in nodes}
-    in_degree = {node['id']: 0 for node in nodes}
+def prepare_execution(data: Dict[str, Any], image_bytes: Optional[bytes],
+                      timings: Optional[Dict[str, Any]] = None):
+    """
+    解析执行请求：执行计划、输入图像和执行选项（输入图像的解码耗时写入 timings）
+
+    Returns:
+        (execution, error_response)，execution 为 (plan, image_array, options)
+    """
+    if not image_bytes and not data.get('filename'):
+        return None, (jsonify({'error': '未提供输入图像'}), 400)
     
-    for edge in edges:
-        source = edge['source']
-        target = edge['target']
-        graph[source].append(target)
-        in_degree[target] += 1
+    plan, error_response = resolve_plan(data)
+    if error_response is not None:
+        return None, error_response
     
-    # 找到所有入度为0的节点
-    queue = [node_id for node_id, degree in in_degree.items() if degree == 0]
-    result = []
+    # 解码输入图像：优先使用请求中的图像，否则按上传文件名引用
+    image_digest = None
+    decode_start = time.perf_counter()
+    if image_bytes:
+        try:
+            image_array = decode_image(image_bytes)
+        except Exception as e:
+            logger.warning("解码输入图像失败: %s", e)
+            return None, (jsonify({'error': f'解码输入图像失败: {str(e)}'}), 400)
+    else:
+        entry, error_response = load_uploaded_image(data['filename'])
+        if error_response is not None:
+            return None, error_response
+        image_array, image_digest = entry
+    _stage(timings, 'decode', decode_start)
     
-    while queue:
-        node_id = queue.pop(0)
-        result.append(node_id)
-        
-        for neighbor in graph[node_id]:
-            in_degree[neighbor] -= 1
-            if in_degree[neighbor] == 0:
-                queue.append(neighbor)
+    try:
+        max_parallel = int(data.get('maxParallel') or app.config['WORKFLOW_MAX_WORKERS'])
+    except (TypeError, ValueError):
+        return None, (jsonify({'error': 'maxParallel 必须是整数'}), 400)
+    options = {
+        'pool': NODE_POOL,
+        'max_parallel': max(1, min(max_parallel, app.config['WORKFLOW_MAX_WORKERS'])),
+        'cache': NODE_CACHE if _flag(data.get('useCache'), True) else None,
+        'image_digest': image_digest,
+        'tiling': TILING if _flag(data.get('tiling'), True) else None,
+        'pushdown': _flag(data.get('pushdown'), True),
+        'buffers': BUFFER_POOL
+    }
+    return (plan, image_array, options), None
+
+def parse_output_options(data: Dict[str, Any]):
+    """
+    解析结果图像的输出选项：格式（format 参数或 Accept 头）、质量/压缩级别、是否返回二进制
+
+    Returns:
+        (output_options, error_response)
+    """
+    accepted = request.accept_mimetypes.best_match(['application/json'] + list(MIME_TO_FORMAT))
+    binary = data.get('response') == 'binary' or (data.get('response') != 'json' and accepted in MIME_TO_FORMAT)
+    fmt = normalize_format(data.get('format')) if data.get('format') else MIME_TO_FORMAT.get(accepted, 'png')
+    if fmt is None:
+        return None, (jsonify({'error': f'不支持的输出格式: {data.get("format")}，可选 png/jpeg/webp'}), 400)
+    try:
+        quality = int(data['quality']) if data.get('quality') not in (None, '') else None
+        compression = int(data['compression']) if data.get('compression') not in (None, '') \
+            else app.config['PNG_COMPRESSION_LEVEL']
+    except (TypeError, ValueError):
+        return None, (jsonify({'error': 'quality 和 compression 必须是整数'}), 400)
+    if quality is not None and not 1 <= quality <= 100:
+        return None, (jsonify({'error': 'quality 取值范围为 1-100'}), 400)
+    if compression is not None and not 0 <= compression <= 9:
+        return None, (jsonify({'error': 'compression 取值范围为 0-9'}), 400)
+    return {'format': fmt, 'quality': quality, 'compression': compression, 'binary': binary}, None
+
+def encode_result(plan, node_outputs: Dict[str, Any], output_options: Dict[str, Any],
+                  timings: Optional[Dict[str, Any]] = None):
+    """
+    提取输出节点的图像和文本，并将图像编码为指定格式（编码耗时写入 timings）
+
+    Returns:
+        (encoded, error)：encoded 包含 data、mimetype、text、shape；error 为 (错误信息, 状态码)
+    """
+    final_output = node_outputs.get(plan.sink)
+    if final_output is None:
+        return None, ('没有输出结果', 400)
+    
+    # 提取输出图像和文本（如OCR识别结果）
+    output_image = extract_image(final_output)
+    output_text = final_output.get('text') if isinstance(final_output, dict) else None
+    if not isinstance(output_image, np.ndarray):
+        return None, ('算法未返回图像结果', 400)
+    
+    encode_start = time.perf_counter()
+    image_bytes, mimetype = encode_image(output_image, output_options['format'],
+                                         quality=output_options['quality'],
+                                         compression=output_options['compression'])
+    _stage(timings, 'encode', encode_start)
+    return {'data': image_bytes, 'mimetype': mimetype, 'text': output_text,
+            'shape': output_image.shape}, None
+
+def build_result(plan, node_outputs: Dict[str, Any], output_options: Dict[str, Any],
+                 timings: Optional[Dict[str, Any]] = None):
+    """
+    将执行结果编码为JSON响应数据（图像为 base64 data URL）
+
+    Returns:
+        (result_data, status_code)
+    """
+    encoded, error = encode_result(plan, node_outputs, output_options, timings)
+    if error is not None:
+        return {'error': error[0]}, error[1]
+    result_data = {'success': True, 'workflowId': plan.plan_id}
+    img_base64 = base64.b64encode(encoded['data']).decode()
+    result_data['result'] = f'data:{encoded["mimetype"]};base64,{img_base64}'
+    if encoded['text']:
+        result_data['text'] = encoded['text']
+    return result_data, 200
+
+def binary_result(plan, node_outputs: Dict[str, Any], output_options: Dict[str, Any],
+                  timings: Optional[Dict[str, Any]] = None):
+    """将执行结果作为原始图像字节返回，元数据放在响应头中（文本按UTF-8百分号编码）"""
+    encoded, error = encode_result(plan, node_outputs, output_options, timings)
+    if error is not None:
+        return jsonify({'error': error[0]}), error[1]
+    shape = encoded['shape']
+    headers = {
+        'X-Workflow-Id': plan.plan_id,
+        'X-Image-Shape': ','.join(str(dim) for dim in shape),
+    }
+    if encoded['text']:
+        headers['X-Result-Text'] = quote(encoded['text'])
+    headers['Access-Control-Expose-Headers'] = ', '.join(headers)
+    return Response(encoded['data'], mimetype=encoded['mimetype'], headers=headers)
+
+def run_execution(data: Dict[str, Any], image_bytes: Optional[bytes], start: float):
+    """执行一次工作流请求并生成响应（JSON或二进制图像）"""
+    output_options, error_response = parse_output_options(data)
+    if error_response is not None:
+        return error_response
+    timings = {}
+    execution, error_response = prepare_execution(data, image_bytes, timings)
+    if error_response is not None:
+        return error_response
+    plan, image_array, options = execution
     
-    return result
+    # 按执行计划运行（独立分支并行执行，中间结果用完即释放）
+    try:
+        node_outputs = run_plan(plan, image_array, options, timings)
+    except NodeExecutionError as e:
+        logger.error("执行节点 %s 时出错", e.node_id, exc_info=e.__cause__ or e)
+        return jsonify({'error': str(e)}), 500
+    memory_stats = timings['memory']
+    with_timings = _flag(data.get('timings'), False)
+    
+    if output_options['binary']:
+        response = binary_result(plan, node_outputs, output_options, timings)
+        if isinstance(response, Response):
+            response.headers['X-Peak-Rss-Bytes'] = str(memory_stats['peakRssBytes'] or '')
+            response.headers['X-Peak-Output-Bytes'] = str(memory_stats['peakOutputBytes'])
+            response.headers['Access-Control-Expose-Headers'] += ', X-Peak-Rss-Bytes, X-Peak-Output-Bytes'
+            if with_timings:
+                response.headers['Server-Timing'] = _server_timing(_timing_report(timings, start))
+                response.headers['Access-Control-Expose-Headers'] += ', Server-Timing'
+        return response
+    result_data, status = build_result(plan, node_outputs, output_options, timings)
+    if status == 200:
+        result_data['memory'] = memory_stats
+        if with_timings:
+            result_data['timings'] = _timing_report(timings, start)
+    return jsonify(result_data), status
+
+def profile_execution(data: Dict[str, Any], image_bytes: Optional[bytes], start: float):
+    """
+    在 cProfile 下执行一次工作流请求
+
+    cProfile 只记录当前线程，为使分析覆盖全部节点，本次请求在当前线程中串行执行：不分块、
+    不使用节点输出缓存，OCR识别也不经过微批调度器的工作线程（见 ocr_providers.run_inline）。
+    profileFormat=json（默认）时在JSON响应中附加 profile（按 profileSort 排序的前 profileTop 个函数），
+    profileFormat=prof 时返回可下载的 pstats 分析文件。
+    """
+    if not app.config['ENABLE_PROFILING']:
+        return jsonify({'error': '未启用性能分析，请设置环境变量 ENABLE_PROFILING=1'}), 403
+    # 分析器只在开启后才需要，不在启动时导入
+    from profiling import SORT_KEYS, ProfilerBusyError, RequestProfiler
+    from algorithms.ocr_providers import run_inline
+    profile_format = data.get('profileFormat') or 'json'
+    sort = data.get('profileSort') or 'cumulative'
+    if profile_format not in ('json', 'prof'):
+        return jsonify({'error': f'不支持的分析结果格式: {profile_format}，可选 json/prof'}), 400
+    if sort not in SORT_KEYS:
+        return jsonify({'error': f'不支持的排序字段: {sort}，可选 {"/".join(SORT_KEYS)}'}), 400
+    try:
+        limit = int(data.get('profileTop') or 30)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'profileTop 必须是整数'}), 400
+
+    data.update({'maxParallel': 1, 'useCache': False, 'tiling': False, 'response': 'json'})
+    profiler = RequestProfiler()
+    try:
+        with profiler, run_inline():
+            body, status = run_execution(data, image_bytes, start)
+    except ProfilerBusyError as e:
+        return jsonify({'error': str(e)}), 409
+    if status != 200:
+        return body, status
+
+    result_data = body.get_json()
+    if profile_format == 'prof':
+        filename = f'workflow_{result_data["workflowId"]}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.prof'
+        return Response(profiler.dump(), mimetype='application/octet-stream',
+                        headers={'Content-Disposition': f'attachment; filename={filename}',
+                                 'X-Workflow-Id': result_data['workflowId']})
+    result_data['profile'] = profiler.top_functions(limit, sort)
+    return jsonify(result_data), status
+
+@app.route('/api/execute', methods=['POST'])
+def execute_workflow():
+    """
+    执行工作流
+
+    输入图像可以是JSON中的base64、multipart上传或原始图像请求体（见 read_execution_request）；
+    默认返回JSON，请求 response=binary 或 Accept: image/* 时直接返回图像字节。
+    请求 timings=1 时返回解码、各节点和编码的耗时明细（二进制响应放在 Server-Timing 头中）；
+    启用 ENABLE_PROFILING 时，请求 profile=1 在性能分析器下执行（见 profile_execution）。
+    """
+    start = time.perf_counter()
+    try:
+        data, image_bytes, error_response = read_execution_request()
+        if error_response is not None:
+            return error_response
+        if _flag(data.get('profile'), False):
+            return profile_execution(data, image_bytes, start)
+        return run_execution(data, image_bytes, start)
+    except Exception as e:
+        logger.exception("执行工作流时出错")
+        return jsonify({'error': f'执行工作流时出错: {str(e)}'}), 500
+    finally:
+        REQUEST_DURATION.observe(time.perf_counter() - start, 'execute')
+
+def _encode_preview(image: np.ndarray, max_size: int) -> str:
+    """将节点输出缩小后编码为JPEG data URL，用于执行过程中的预览"""
+    height, width = image.shape[:2]
+    scale = min(1.0, max_size / max(height, width))
+    if scale < 1.0:
+        image = cv2.resize(image, (max(1, int(width * scale)), max(1, int(height * scale))),
+                           interpolation=cv2.INTER_AREA)
+    image_bytes, mimetype = encode_image(image, 'jpeg', quality=80)
+    return f'data:{mimetype};base64,' + base64.b64encode(image_bytes).decode()
+
+def _sse_event(event: str, payload: Dict[str, Any]) -> str:
+    return f'event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n'
+
+@app.route('/api/execute/stream', methods=['POST'])
+def execute_workflow_stream():
+    """
+    以 Server-Sent Events 流式执行工作流
+
+    事件依次为 plan、每个节点的 node_start / node_end（含耗时和可选的缩略预览），
+    最后为 result（与 /api/execute 的响应相同）或 error。
+    """
+    start = time.perf_counter()
+    data, image_bytes, error_response = read_execution_request()
+    if error_response is not None:
+        return error_response
+    output_options, error_response = parse_output_options(data)
+    if error_response is not None:
+        return error_response
+    timings = {}
+    execution, error_response = prepare_execution(data, image_bytes, timings)
+    if error_response is not None:
+        return error_response
+    plan, image_array, options = execution
+    with_preview = _flag(data.get('preview'), True)
+    with_timings = _flag(data.get('timings'), False)
+    preview_size = int(data.get('previewSize') or 256)
+    events = queue.Queue()
+
+    def on_event(event: str, node_id: str, payload: Dict[str, Any]):
+        message = {'node': node_id, 'type': plan.nodes[node_id].algorithm}
+        if event == 'node_end':
+            message['durationMs'] = round(payload['duration'] * 1000, 2)
+            message['cached'] = payload['cached']
+            image = extract_image(payload['output'])
+            if isinstance(image, np.ndarray):
+                message['shape'] = list(image.shape)
+                if with_preview:
+                    message['preview'] = _encode_preview(image, preview_size)
+        events.put(_sse_event(event, message))
+
+    def run():
+        try:
+            node_outputs = run_plan(plan, image_array, options, timings, on_event=on_event)
+            result_data, status = build_result(plan, node_outputs, output_options, timings)
+            if status == 200:
+                result_data['memory'] = timings['memory']
+                if with_timings:
+                    result_data['timings'] = _timing_report(timings, start)
+            events.put(_sse_event('result' if status == 200 else 'error', result_data))
+        except NodeExecutionError as e:
+            events.put(_sse_event('error', {'error': str(e), 'node': e.node_id}))
+        except Exception as e:
+            logger.exception("执行工作流时出错")
+            events.put(_sse_event('error', {'error': f'执行工作流时出错: {str(e)}'}))
+        REQUEST_DURATION.observe(time.perf_counter() - start, 'stream')
+        events.put(None)
+
+    def generate():
+        yield _sse_event('plan', {'workflowId': plan.plan_id, 'order': list(plan.order),
+                                  'sink': plan.sink})
+        threading.Thread(target=run, name='workflow-stream', daemon=True).start()
+        while True:
+            message = events.get()
+            if message is None:
+                break
+            yield message
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def run_sweep(data: Dict[str, Any], image_bytes: Optional[bytes], start: float):
+    """执行一次参数扫描请求，返回缩略图条带和每个取值的统计量（JSON）"""
+    target = data.get('target')
+    parameter = data.get('parameter')
+    if not target or not parameter:
+        return jsonify({'error': '需要指定 target（节点ID）和 parameter（参数名）'}), 400
+    spec = data.get('values')
+    if isinstance(spec, str):
+        try:
+            spec = json.loads(spec)
+        except json.JSONDecodeError as e:
+            return jsonify({'error': f'values 不是有效的JSON: {str(e)}'}), 400
+    try:
+        values = parse_sweep_values(spec, app.config['SWEEP_MAX_VALUES'])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        thumbnail_height = int(data.get('thumbnailHeight') or app.config['SWEEP_THUMBNAIL_HEIGHT'])
+    except (TypeError, ValueError):
+        return jsonify({'error': 'thumbnailHeight 必须是整数'}), 400
+    if not 16 <= thumbnail_height <= 1024:
+        return jsonify({'error': 'thumbnailHeight 取值范围为 16-1024'}), 400
+    output_options, error_response = parse_output_options(data)
+    if error_response is not None:
+        return error_response
+    timings = {}
+    execution, error_response = prepare_execution(data, image_bytes, timings)
+    if error_response is not None:
+        return error_response
+    plan, image_array, options = execution
+    if target not in plan.nodes:
+        return jsonify({'error': f'节点 {target} 不存在'}), 400
+    target_node = plan.nodes[target]
+    declared = target_node.module.get_info().get('parameters', {}) if hasattr(target_node.module, 'get_info') else {}
+    if parameter not in declared:
+        return jsonify({'error': f'算法 {target_node.algorithm} 没有参数 {parameter}'}), 400
+
+    # 上游节点只执行一次，每个取值的全尺寸结果压缩为缩略图和统计量后即丢弃
+    summary = SweepSummary(thumbnail_height)
+    run_stats = {}
+    ACTIVE_EXECUTIONS.inc()
+    execute_start = time.perf_counter()
+    try:
+        for value, output, compact in execute_sweep(plan, image_array, target, parameter, values,
+                                                    stats=run_stats, **options):
+            summary.add(value, output, compact, run_stats['valueMs'][-1])
+            output = None
+    except WorkflowError as e:
+        return jsonify({'error': str(e)}), 400
+    except NodeExecutionError as e:
+        logger.error("参数扫描时执行节点 %s 出错", e.node_id, exc_info=e.__cause__ or e)
+        return jsonify({'error': str(e)}), 500
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    finally:
+        ACTIVE_EXECUTIONS.dec()
+        _stage(timings, 'execute', execute_start)
+        for node in run_stats.get('nodes', []):
+            NODE_EXECUTIONS.inc(node['algorithm'], 'true' if node['cached'] else 'false')
+            if not node['cached']:
+                NODE_DURATION.observe(node['durationMs'] / 1000, node['algorithm'])
+        timings['nodes'] = run_stats.get('nodes', [])
+
+    encode_start = time.perf_counter()
+    strip_bytes, mimetype = encode_image(summary.strip(), output_options['format'],
+                                         quality=output_options['quality'],
+                                         compression=output_options['compression'])
+    _stage(timings, 'encode', encode_start)
+    result_data = {
+        'success': True,
+        'workflowId': plan.plan_id,
+        'target': target,
+        'parameter': parameter,
+        'strip': f'data:{mimetype};base64,{base64.b64encode(strip_bytes).decode()}',
+        'results': summary.results,
+        'upstreamMs': run_stats.get('upstreamMs')
+    }
+    if _flag(data.get('timings'), False):
+        result_data['timings'] = _timing_report(timings, start)
+    return jsonify(result_data), 200
+
+@app.route('/api/sweep', methods=['POST'])
+def sweep_parameter():
+    """
+    参数扫描：目标节点的一个参数按取值网格依次执行，上游节点只执行一次
+
+    请求与 /api/execute 相同（工作流和输入图像），另加 target（节点ID）、parameter（参数名）、
+    values（取值列表或 {"start", "stop", "step"} 网格）和可选的 thumbnailHeight；
+    返回按取值顺序拼接的缩略图条带 strip（format 指定格式）和每个取值在条带中的位置及统计量。
+    """
+    start = time.perf_counter()
+    try:
+        data, image_bytes, error_response = read_execution_request()
+        if error_response is not None:
+            return error_response
+        return run_sweep(data, image_bytes, start)
+    except Exception as e:
+        logger.exception("参数扫描时出错")
+        return jsonify({'error': f'参数扫描时出错: {str(e)}'}), 500
+    finally:
+        REQUEST_DURATION.observe(time.perf_counter() - start, 'sweep')
+
+def _batch_directory_allowed(directory: str) -> bool:
+    """检查目录是否位于允许批量读取的目录之下"""
+    real_dir = os.path.realpath(directory)
+    for allowed in app.config['BATCH_INPUT_DIRS']:
+        allowed_dir = os.path.realpath(allowed)
+        if real_dir == allowed_dir or real_dir.startswith(allowed_dir + os.sep):
+            return True
+    return False
+
+@app.route('/api/execute/batch', methods=['POST'])
+def execute_batch():
+    """
+    批量执行工作流，结果以 NDJSON 流式返回（每处理完一张图像输出一行）
+
+    图像来源（三选一）：
+      - JSON 中的 directory：服务器目录（需位于 BATCH_INPUT_DIRS 之下）
+      - JSON 中的 filenames：已通过 /api/upload 上传的文件名列表
+      - multipart/form-data：files 字段上传多张图像，workflow 字段为 JSON 字符串
+    """
+    # 进程池相关模块只有批量执行才需要，不在启动时导入
+    from batch_runner import list_images, run_batch
+
+    batch_id = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+    if request.files:
+        try:
+            data = json.loads(request.form.get('workflow', '{}'))
+        except json.JSONDecodeError as e:
+            return jsonify({'error': f'workflow 字段不是有效的JSON: {str(e)}'}), 400
+    else:
+        data = request.json or {}
+
+    plan, error_response = resolve_plan(data)
+    if error_response is not None:
+        return error_response
+
+    image_paths = []
+    if request.files:
+        bundle_dir = os.path.join(UPLOAD_FOLDER, f'batch_{batch_id}')
+        os.makedirs(bundle_dir, exist_ok=True)
+        for file in request.files.getlist('files'):
+            if file.filename and allowed_file(file.filename):
+                filepath = os.path.join(bundle_dir, f'{len(image_paths):05d}_{secure_filename(file.filename)}')
+                file.save(filepath)
+                image_paths.append(filepath)
+    elif data.get('directory'):
+        directory = data['directory']
+        if not os.path.isdir(directory):
+            return jsonify({'error': f'目录不存在: {directory}'}), 400
+        if not _batch_directory_allowed(directory):
+            return jsonify({'error': f'不允许读取该目录: {directory}，请配置 BATCH_INPUT_DIRS'}), 403
+        image_paths = list_images(directory, ALLOWED_EXTENSIONS)
+    elif data.get('filenames'):
+        for filename in data['filenames']:
+            filepath = os.path.join(UPLOAD_FOLDER, secure_filename(filename))
+            if not os.path.isfile(filepath):
+                return jsonify({'error': f'上传文件不存在: {filename}'}), 400
+            image_paths.append(filepath)
+
+    if not image_paths:
+        return jsonify({'error': '没有待处理的图像'}), 400
+
+    try:
+        workers = int(data.get('workers') or app.config['BATCH_WORKERS'])
+    except (TypeError, ValueError):
+        return jsonify({'error': 'workers 必须是整数'}), 400
+    workers = max(1, min(workers, app.config['BATCH_WORKERS'], len(image_paths)))
+    output_dir = os.path.join(app.config['OUTPUT_FOLDER'], f'batch_{batch_id}')
+
+    def generate():
+        start = datetime.now()
+        succeeded = failed = 0
+        yield json.dumps({'type': 'start', 'workflowId': plan.plan_id, 'total': len(image_paths),
+                          'workers': workers, 'outputDir': os.path.abspath(output_dir)},
+                         ensure_ascii=False) + '\n'
+        try:
+            for item in run_batch(plan.workflow, image_paths, output_dir, workers):
+                if item['success']:
+                    succeeded += 1
+                else:
+                    failed += 1
+                item['type'] = 'result'
+                yield json.dumps(item, ensure_ascii=False) + '\n'
+        except Exception as e:
+            yield json.dumps({'type': 'error', 'error': f'批量执行中断: {str(e)}'}, ensure_ascii=False) + '\n'
+        yield json.dumps({'type': 'summary', 'total': len(image_paths), 'succeeded': succeeded,
+                          'failed': failed,
+                          'durationMs': round((datetime.now() - start).total_seconds() * 1000, 2)},
+                         ensure_ascii=False) + '\n'
+
+    return Response(generate(), mimetype='application/x-ndjson')
 
 if __name__ == '__main__':
     # 确保目录存在
     os.makedirs('static', exist_ok=True)
     os.makedirs('algorithms', exist_ok=True)
     os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-    print("=" * 50)
-    print("工业质检算法组合平台")
-    print("=" * 50)
-    print(f"已加载 {len(ALGORITHM_MODULES)} 个算法模块:")
-    for name in ALGORITHM_MODULES.keys():
-        print(f"  - {name}")
-    print("=" * 50)
-    print("服务启动在: http://localhost:5000")
-    print("=" * 50)
+    logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO'),
+                        format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    logger.info("工业质检算法组合平台")
+    logger.info("已加载 %d 个算法模块: %s", len(ALGORITHM_MODULES), ', '.join(ALGORITHM_MODULES))
+    logger.info("服务启动在: http://localhost:5000")
     app.run(debug=True, port=5000)
 
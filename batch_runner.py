@@ -0,0 +1,96 @@
+"""
+批量执行
+在进程池中对多张图像运行同一工作流，结果按完成顺序逐条返回
+"""
+import importlib
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, List
+
+from image_codec import decode_image, encode_image
+from workflow_engine import compile_workflow, execute_plan, extract_image
+
+# 子进程中编译好的执行计划（由进程池初始化函数设置）
+_worker_plan = None
+_worker_output_dir = None
+
+def _init_worker(workflow: Dict[str, Any], output_dir: str):
+    """子进程初始化：加载工作流用到的算法模块并编译执行计划"""
+    global _worker_plan, _worker_output_dir
+    modules = {}
+    for node in workflow['nodes']:
+        name = node['type']
+        if name not in modules:
+            modules[name] = importlib.import_module(f'algorithms.{name}')
+    _worker_plan = compile_workflow(workflow['nodes'], workflow['edges'], modules)
+    _worker_output_dir = output_dir
+
+def _process_image(index: int, image_path: str) -> Dict[str, Any]:
+    """在子进程中处理单张图像，结果图像保存到输出目录"""
+    start = time.perf_counter()
+    result = {'index': index, 'file': image_path}
+    try:
+        with open(image_path, 'rb') as f:
+            image_array = decode_image(f.read())
+        node_outputs = execute_plan(_worker_plan, image_array)
+        final_output = node_outputs[_worker_plan.sink]
+
+        output_image = extract_image(final_output)
+        if isinstance(final_output, dict) and final_output.get('text'):
+            result['text'] = final_output['text']
+        if output_image is not None:
+            stem = os.path.splitext(os.path.basename(image_path))[0]
+            output_path = os.path.join(_worker_output_dir, f'{index:05d}_{stem}.png')
+            image_bytes, _ = encode_image(output_image, 'png')
+            with open(output_path, 'wb') as f:
+                f.write(image_bytes)
+            result['output'] = os.path.abspath(output_path)
+        result['success'] = True
+    except Exception as e:
+        result['success'] = False
+        result['error'] = str(e)
+    result['durationMs'] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+def list_images(directory: str, allowed_extensions) -> List[str]:
+    """列出目录中扩展名允许的图像文件（按文件名排序，不递归）"""
+    paths = []
+    for filename in sorted(os.listdir(directory)):
+        path = os.path.join(directory, filename)
+        if os.path.isfile(path) and '.' in filename and \
+                filename.rsplit('.', 1)[1].lower() in allowed_extensions:
+            paths.append(path)
+    return paths
+
+def run_batch(workflow: Dict[str, Any], image_paths: List[str], output_dir: str,
+              workers: int) -> Iterator[Dict[str, Any]]:
+    """
+    在进程池中批量执行工作流
+
+    Args:
+        workflow: 规范化的工作流定义（ExecutionPlan.workflow）
+        image_paths: 待处理的图像路径
+        output_dir: 结果图像输出目录
+        workers: 进程数
+
+    Yields:
+        每张图像的处理结果（按完成顺序）
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    # 限制同时提交的任务数，避免一次性为大批量创建全部任务
+    max_in_flight = workers * 2
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(workflow, output_dir)) as pool:
+        paths = iter(enumerate(image_paths))
+        running = set()
+        while True:
+            for index, path in paths:
+                running.add(pool.submit(_process_image, index, path))
+                if len(running) >= max_in_flight:
+                    break
+            if not running:
+                break
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
@@ -0,0 +1,71 @@
+"""
+OCR结果标注基准测试：比较逐框 put_text_safe（每段中文都整图转换颜色空间、重新加载字体）
+与 cv2_utils.draw_annotations（一次绘制全部框和文字）
+
+用法：
+    python -m benchmarks.annotation [--sizes 5 20] [--lines 50 200] [--repeat 3]
+"""
+import argparse
+import json
+
+import cv2
+import numpy as np
+
+from benchmarks.common import measure, synthetic_image
+from algorithms import cv2_utils
+from algorithms.cv2_utils import draw_annotations, put_text_safe
+
+def make_boxes(image: np.ndarray, lines: int):
+    """在图像上均匀排布 lines 行文本框，中英文各半"""
+    height, width = image.shape[:2]
+    step = max(1, height // (lines + 1))
+    boxes = []
+    for i in range(lines):
+        y = (i + 1) * step
+        box = np.array([[20, y], [width // 2, y], [width // 2, y + 16], [20, y + 16]], dtype=np.int32)
+        text = f'批号 {i:04d} 合格' if i % 2 == 0 else f'LOT-{i:04d} PASS'
+        boxes.append((box, text))
+    return boxes
+
+def legacy_annotate(image: np.ndarray, boxes) -> np.ndarray:
+    """原 ocr_recognition 的绘制方式：每个框单独绘制，中文每次都加载字体"""
+    result = image.copy()
+    for box, text in boxes:
+        cv2.polylines(result, [box], True, (0, 255, 0), 2)
+        cv2_utils.load_font.cache_clear()
+        result = put_text_safe(result, text, tuple(box[0]), font_size=18, color=(0, 255, 0))
+    return result
+
+def batch_annotate(image: np.ndarray, boxes) -> np.ndarray:
+    return draw_annotations(image.copy(), [box for box, _ in boxes],
+                            [(text, tuple(int(v) for v in box[0])) for box, text in boxes],
+                            color=(0, 255, 0), thickness=2, font_size=18)
+
+def run(sizes, line_counts, repeat):
+    results = []
+    for megapixels in sizes:
+        image = synthetic_image(megapixels)
+        for lines in line_counts:
+            boxes = make_boxes(image, lines)
+            for name, call in (('legacy_per_box', lambda: legacy_annotate(image, boxes)),
+                               ('batch', lambda: batch_annotate(image, boxes))):
+                stats = measure(call, repeat=repeat)
+                stats.update({'case': name, 'megapixels': megapixels, 'lines': lines})
+                results.append(stats)
+                print(f"{megapixels:>4} MP  {lines:>4} 行  {name:<16} 中位耗时 {stats['medianMs']:9.1f} ms")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='OCR结果标注基准测试')
+    parser.add_argument('--sizes', type=float, nargs='+', default=[5, 20], help='图像尺寸（百万像素）')
+    parser.add_argument('--lines', type=int, nargs='+', default=[50, 200], help='文本行数')
+    parser.add_argument('--repeat', type=int, default=3, help='每种情况的重复次数')
+    parser.add_argument('--output', help='将结果写入JSON文件')
+    args = parser.parse_args()
+    results = run(args.sizes, args.lines, args.repeat)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+缓冲池与 float32 路径基准测试
+
+1. 单个运算：原 float64 Sobel/Laplacian 实现与当前 float32/CV_16S 实现的耗时和临时内存峰值
+2. 滤波 → Sobel → 阈值分割 链路连续执行多次：不复用与复用数组的耗时、新分配的数组数和缺页次数
+   （不复用时使用字节预算为0的缓冲池，只统计分配数，不保留任何数组）
+
+缺页次数（minor page faults）反映新分配并首次写入的内存页：复用的数组不会再产生缺页。
+内存峰值用 tracemalloc 统计（numpy 和 OpenCV 返回的数组都会计入）。
+
+用法：
+    python -m benchmarks.buffers [--megapixels 20] [--runs 5]
+"""
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from benchmarks.common import synthetic_image
+from algorithms import edge_detection, image_filter, image_segmentation
+from buffer_pool import BufferPool
+from workflow_engine import compile_workflow, execute_plan, extract_image
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+NODES = [
+    {'id': 'filter', 'type': 'image_filter', 'data': {'parameters': {'filter_type': 'gaussian', 'kernel_size': 5}}},
+    {'id': 'edge', 'type': 'edge_detection', 'data': {'parameters': {'method': 'sobel'}}},
+    {'id': 'segment', 'type': 'image_segmentation', 'data': {'parameters': {'method': 'threshold',
+                                                                            'threshold_value': 60}}},
+]
+EDGES = [{'source': 'filter', 'target': 'edge'}, {'source': 'edge', 'target': 'segment'}]
+MODULES = {'image_filter': image_filter, 'edge_detection': edge_detection, 'image_segmentation': image_segmentation}
+
+def legacy_sobel(gray: np.ndarray) -> np.ndarray:
+    """原 edge_detection 的 Sobel 实现（float64 梯度）"""
+    sobelx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
+    sobely = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
+    edges = np.sqrt(sobelx**2 + sobely**2)
+    return np.uint8(np.absolute(edges))
+
+def legacy_laplacian(gray: np.ndarray) -> np.ndarray:
+    """原 edge_detection 的 Laplacian 实现（float64）"""
+    return np.uint8(np.absolute(cv2.Laplacian(gray, cv2.CV_64F)))
+
+def _page_faults() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_minflt if resource is not None else 0
+
+def _run(func, repeat: int):
+    samples = []
+    tracemalloc.start()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return round(statistics.median(samples), 1), peak
+
+def bench_operators(gray: np.ndarray, repeat: int):
+    results = []
+    cases = [
+        ('sobel', lambda: legacy_sobel(gray), lambda: edge_detection.execute({'image': gray}, {'method': 'sobel'})),
+        ('laplacian', lambda: legacy_laplacian(gray),
+         lambda: edge_detection.execute({'image': gray}, {'method': 'laplacian'})),
+    ]
+    print(f"{'运算':<10} {'float64(ms)':>12} {'当前(ms)':>10} {'float64峰值(MB)':>16} {'当前峰值(MB)':>13}")
+    for name, legacy, current in cases:
+        legacy_ms, legacy_peak = _run(legacy, repeat)
+        current_ms, current_peak = _run(current, repeat)
+        results.append({'case': name, 'legacyMs': legacy_ms, 'currentMs': current_ms,
+                        'legacyPeakBytes': legacy_peak, 'currentPeakBytes': current_peak})
+        print(f"{name:<10} {legacy_ms:>12.1f} {current_ms:>10.1f} {legacy_peak / 1e6:>16.1f} {current_peak / 1e6:>13.1f}")
+    return results
+
+def bench_chain(image: np.ndarray, runs: int):
+    plan = compile_workflow(NODES, EDGES, MODULES)
+    results = {}
+    outputs = {}
+    print(f"{'链路':<10} {'中位耗时(ms)':>12} {'新分配数组':>10} {'缺页次数/次':>12}")
+    for name, pool in (('no_reuse', BufferPool(max_bytes=0)), ('pool', BufferPool(max_bytes=512 * 1024 * 1024))):
+        samples = []
+        faults = _page_faults()
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = execute_plan(plan, image, buffers=pool)
+            samples.append((time.perf_counter() - start) * 1000)
+            outputs[name] = extract_image(result[plan.sink])
+            del result
+        faults = (_page_faults() - faults) / runs
+        allocations = pool.stats()['misses']
+        results[name] = {'medianMs': round(statistics.median(samples), 1), 'allocations': allocations,
+                         'pageFaultsPerRun': round(faults)}
+        print(f"{name:<10} {results[name]['medianMs']:>12.1f} {allocations:>10} {round(faults):>12}")
+    results['identical'] = bool(np.array_equal(outputs['no_reuse'], outputs['pool']))
+    print(f"结果一致: {'是' if results['identical'] else '否'}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='缓冲池与 float32 路径基准测试')
+    parser.add_argument('--megapixels', type=float, default=20, help='图像尺寸（百万像素）')
+    parser.add_argument('--runs', type=int, default=5, help='链路连续执行次数')
+    parser.add_argument('--repeat', type=int, default=3, help='单个运算的重复次数')
+    parser.add_argument('--output', help='结果JSON文件')
+    args = parser.parse_args()
+
+    image = synthetic_image(args.megapixels)
+    gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    report = {'megapixels': args.megapixels,
+              'operators': bench_operators(gray, args.repeat),
+              'chain': bench_chain(image, args.runs)}
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+if __name__ == '__main__':
+    main()
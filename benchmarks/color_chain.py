@@ -0,0 +1,90 @@
+"""
+颜色空间传递基准测试：滤波 → 边缘检测 → 分割 链路上，比较每个节点都输出三通道RGB
+（灰度结果先扩展为RGB，下游再转回灰度）与声明颜色空间后以单通道传递的各节点耗时和输出大小
+
+用法：
+    python -m benchmarks.color_chain [--sizes 5 20] [--repeat 5]
+"""
+import argparse
+import json
+import statistics
+import time
+from typing import Any, Dict
+
+import numpy as np
+
+from benchmarks.common import synthetic_image
+from algorithms import edge_detection, image_filter, image_segmentation
+from caching import value_nbytes
+from workflow_engine import compile_workflow, execute_plan, expand_gray, extract_image
+
+class RGBOutputModule:
+    """模拟声明颜色空间之前的模块：单通道结果扩展为RGB后输出"""
+
+    def __init__(self, module):
+        self.module = module
+
+    def execute(self, inputs: Dict[str, Any], parameters: Dict[str, Any]) -> Dict[str, Any]:
+        return expand_gray(self.module.execute(inputs, parameters))
+
+NODES = [
+    {'id': 'filter', 'type': 'image_filter', 'data': {'parameters': {'filter_type': 'gaussian', 'kernel_size': 5}}},
+    {'id': 'edge', 'type': 'edge_detection', 'data': {'parameters': {'method': 'sobel'}}},
+    {'id': 'segment', 'type': 'image_segmentation', 'data': {'parameters': {'method': 'threshold',
+                                                                            'threshold_value': 60}}},
+]
+EDGES = [{'source': 'filter', 'target': 'edge'}, {'source': 'edge', 'target': 'segment'}]
+
+def run_chain(modules, image: np.ndarray, repeat: int) -> Dict[str, Any]:
+    plan = compile_workflow(NODES, EDGES, modules)
+    samples = {node['id']: [] for node in NODES}
+    output_bytes = {}
+    totals = []
+
+    def on_event(event: str, node_id: str, payload: Dict[str, Any]):
+        if event == 'node_end':
+            output_bytes[node_id] = value_nbytes(payload['output'])
+
+    for _ in range(repeat):
+        stats = {}
+        start = time.perf_counter()
+        outputs = execute_plan(plan, image, stats=stats, on_event=on_event)
+        totals.append((time.perf_counter() - start) * 1000)
+        for node in stats['nodes']:
+            samples[node['node']].append(node['durationMs'])
+    return {'nodesMs': {node_id: round(statistics.median(values), 2) for node_id, values in samples.items()},
+            'totalMs': round(statistics.median(totals), 2), 'outputBytes': output_bytes,
+            'result': extract_image(outputs[plan.sink])}
+
+def main():
+    parser = argparse.ArgumentParser(description='颜色空间传递基准测试')
+    parser.add_argument('--sizes', type=float, nargs='+', default=[5, 20], help='图像尺寸（百万像素）')
+    parser.add_argument('--repeat', type=int, default=5, help='重复次数（取中位数）')
+    parser.add_argument('--output', help='结果JSON文件')
+    args = parser.parse_args()
+
+    native = {'image_filter': image_filter, 'edge_detection': edge_detection,
+              'image_segmentation': image_segmentation}
+    rgb_output = {name: RGBOutputModule(module) for name, module in native.items()}
+    results = []
+    for megapixels in args.sizes:
+        image = synthetic_image(megapixels)
+        baseline = run_chain(rgb_output, image, args.repeat)
+        compact = run_chain(native, image, args.repeat)
+        identical = bool(np.array_equal(baseline.pop('result'), compact.pop('result')))
+        results.append({'megapixels': megapixels, 'rgb': baseline, 'gray': compact, 'identical': identical})
+        print(f"{megapixels:>5} MP  结果一致: {'是' if identical else '否'}")
+        for node_id in baseline['nodesMs']:
+            before, after = baseline['nodesMs'][node_id], compact['nodesMs'][node_id]
+            print(f"    {node_id:<8} RGB传递 {before:9.2f} ms   单通道传递 {after:9.2f} ms   节省 {before - after:8.2f} ms"
+                  f"   输出 {baseline['outputBytes'][node_id] / 1e6:6.1f} MB -> "
+                  f"{compact['outputBytes'][node_id] / 1e6:6.1f} MB")
+        print(f"    {'总计':<6} RGB传递 {baseline['totalMs']:9.2f} ms   单通道传递 {compact['totalMs']:9.2f} ms"
+              f"（含输出时扩展为RGB）")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+if __name__ == '__main__':
+    main()
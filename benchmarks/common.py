@@ -0,0 +1,52 @@
+"""
+基准测试公共工具
+"""
+import os
+import statistics
+import sys
+import time
+from typing import Callable, Dict
+
+import cv2
+import numpy as np
+
+# 保证从仓库根目录导入 app 和 algorithms
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+def synthetic_image(megapixels: float, channels: int = 3, seed: int = 0) -> np.ndarray:
+    """
+    生成接近真实质检图像的合成图像（平滑渐变 + 几何图形 + 轻微噪声），
+    压缩率与实际照片相近，避免纯随机噪声导致编解码耗时失真
+    """
+    width = int(round((megapixels * 1e6 * 4 / 3) ** 0.5))
+    height = int(round(megapixels * 1e6 / width))
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)
+    base = (x[None, :] * 0.6 + y[:, None] * 0.4).astype(np.uint8)
+    image = np.dstack([base, np.flipud(base), np.fliplr(base)]) if channels == 3 else base.copy()
+    for _ in range(40):
+        center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+        color = tuple(int(c) for c in rng.integers(0, 255, 3)) if channels == 3 else int(rng.integers(0, 255))
+        cv2.circle(image, center, int(rng.integers(10, max(11, width // 10))), color, -1)
+        cv2.putText(image, 'QC-2024', center, cv2.FONT_HERSHEY_SIMPLEX, 2.0, color, 3)
+    noise = rng.integers(-4, 5, image.shape, dtype=np.int16)
+    return np.clip(image.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+def measure(func: Callable[[], object], repeat: int = 5, warmup: int = 1) -> Dict[str, float]:
+    """多次运行函数，返回耗时统计（毫秒）"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'medianMs': round(statistics.median(samples), 3),
+        'minMs': round(min(samples), 3),
+        'maxMs': round(max(samples), 3),
+        'repeat': repeat
+    }
@@ -0,0 +1,97 @@
+"""
+解码存储基准测试：多个工作进程读取同一张已上传图像时，比较各进程自行解码与映射解码文件的
+加载耗时和内存占用
+
+每个进程加载图像后截取ROI并求和（只读访问全部像素），然后读取 /proc/self/smaps_rollup：
+RSS 把共享页计入每个进程，PSS 把共享页按进程数均摊，所有进程的 PSS 之和即实际占用的物理内存。
+仅支持 Linux。
+
+用法：
+    python -m benchmarks.decoded_store [--megapixels 50] [--processes 4]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.common import synthetic_image
+from image_codec import decode_image, encode_image
+from image_store import load_decoded, store_decoded
+
+def _memory() -> dict:
+    values = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ('Rss:', 'Pss:'):
+                values[parts[0][:-1].lower()] = int(parts[1]) * 1024
+    return values
+
+def _worker(mode: str, filepath: str, barrier, results):
+    start = time.perf_counter()
+    if mode == 'decode':
+        with open(filepath, 'rb') as f:
+            image = decode_image(f.read())
+    else:
+        image = load_decoded(filepath, decode_image)
+    load_time = time.perf_counter() - start
+    height, width = image.shape[:2]
+    roi = image[height // 4:height * 3 // 4, width // 4:width * 3 // 4]
+    checksum = int(image.sum(dtype=np.uint64)) + int(roi.sum(dtype=np.uint64))
+    # 所有进程都持有图像时再采样，共享页才会按进程数均摊
+    barrier.wait()
+    results.put({'loadMs': round(load_time * 1000, 1), 'checksum': checksum, **_memory()})
+    barrier.wait()
+
+def run_mode(mode: str, filepath: str, processes: int):
+    context = multiprocessing.get_context('fork')
+    barrier = context.Barrier(processes)
+    results = context.Queue()
+    workers = [context.Process(target=_worker, args=(mode, filepath, barrier, results)) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    samples = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description='解码存储基准测试')
+    parser.add_argument('--megapixels', type=float, default=50, help='图像尺寸（百万像素）')
+    parser.add_argument('--processes', type=int, default=4, help='工作进程数')
+    parser.add_argument('--output', help='结果JSON文件')
+    args = parser.parse_args()
+
+    image = synthetic_image(args.megapixels)
+    report = {'megapixels': args.megapixels, 'processes': args.processes, 'imageBytes': image.nbytes}
+    with tempfile.TemporaryDirectory() as directory:
+        filepath = os.path.join(directory, 'upload.png')
+        with open(filepath, 'wb') as f:
+            f.write(encode_image(image, 'png')[0])
+        start = time.perf_counter()
+        with open(filepath, 'rb') as f:
+            store_decoded(filepath, decode_image(f.read()))
+        report['storeMs'] = round((time.perf_counter() - start) * 1000, 1)
+        del image
+        print(f"图像 {args.megapixels} MP（{report['imageBytes'] / 1e6:.0f} MB），{args.processes} 个进程，"
+              f"上传时解码并保存 {report['storeMs']:.0f}ms")
+        print(f"{'方式':<8} {'平均加载(ms)':>12} {'RSS合计(MB)':>12} {'PSS合计(MB)':>12}")
+        for mode in ('decode', 'mmap'):
+            samples = run_mode(mode, filepath, args.processes)
+            assert len({sample['checksum'] for sample in samples}) == 1
+            summary = {'loadMs': round(sum(s['loadMs'] for s in samples) / len(samples), 1),
+                       'rssBytes': sum(s['rss'] for s in samples), 'pssBytes': sum(s['pss'] for s in samples)}
+            report[mode] = summary
+            print(f"{mode:<8} {summary['loadMs']:>12.1f} {summary['rssBytes'] / 1e6:>12.0f} "
+                  f"{summary['pssBytes'] / 1e6:>12.0f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+if __name__ == '__main__':
+    main()
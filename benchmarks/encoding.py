@@ -0,0 +1,63 @@
+"""
+结果图像编码基准测试：比较原来的 PIL 编码路径与 image_codec.encode_image
+
+用法：
+    python -m benchmarks.encoding [--sizes 5 20] [--repeat 3]
+"""
+import argparse
+import io
+import json
+
+import numpy as np
+from PIL import Image
+
+from benchmarks.common import measure, synthetic_image
+from image_codec import encode_image
+
+def legacy_png(image: np.ndarray) -> bytes:
+    """原 /api/execute 的编码方式：astype 复制 + PIL 默认压缩级别"""
+    if len(image.shape) == 3:
+        pil_image = Image.fromarray(image.astype(np.uint8))
+    else:
+        pil_image = Image.fromarray(image.astype(np.uint8), mode='L')
+    buffer = io.BytesIO()
+    pil_image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def run(sizes, repeat):
+    results = []
+    for megapixels in sizes:
+        for channels in (1, 3):
+            image = synthetic_image(megapixels, channels)
+            cases = {
+                'legacy_pil_png': lambda: legacy_png(image),
+                'png_level1': lambda: encode_image(image, 'png', compression=1),
+                'png_level3': lambda: encode_image(image, 'png', compression=3),
+                'png_level6': lambda: encode_image(image, 'png', compression=6),
+                'jpeg_q90': lambda: encode_image(image, 'jpeg', quality=90),
+                'webp_q80': lambda: encode_image(image, 'webp', quality=80),
+            }
+            for name, call in cases.items():
+                output = call()
+                size = len(output if isinstance(output, bytes) else output[0])
+                stats = measure(call, repeat=repeat)
+                stats.update({'case': name, 'megapixels': megapixels, 'channels': channels,
+                              'outputBytes': size})
+                results.append(stats)
+                print(f"{megapixels:>4} MP  {channels}通道  {name:<16} {size / 1e6:8.2f} MB  "
+                      f"中位耗时 {stats['medianMs']:9.1f} ms")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='结果图像编码基准测试')
+    parser.add_argument('--sizes', type=float, nargs='+', default=[5, 20], help='图像尺寸（百万像素）')
+    parser.add_argument('--repeat', type=int, default=3, help='每种情况的重复次数')
+    parser.add_argument('--output', help='将结果写入JSON文件')
+    args = parser.parse_args()
+    results = run(args.sizes, args.repeat)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+if __name__ == '__main__':
+    main()
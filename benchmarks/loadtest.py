@@ -0,0 +1,110 @@
+"""
+/api/execute 负载测试
+
+按不同并发数持续向运行中的服务发送执行请求（二进制输入/输出，关闭节点缓存），
+统计吞吐量和延迟分位数，用于验证多进程部署的吞吐是否随核数线性增长。
+
+用法：
+    python serve.py --workers 4 &
+    python -m benchmarks.loadtest --url http://localhost:5000 --concurrency 1 2 4 8 --duration 10
+"""
+import argparse
+import io
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+import requests
+from PIL import Image
+
+from benchmarks.common import synthetic_image
+
+WORKFLOW = {
+    'nodes': [
+        {'id': 'filter', 'type': 'image_filter', 'data': {'parameters': {'filter_type': 'gaussian'}}},
+        {'id': 'edge', 'type': 'edge_detection', 'data': {'parameters': {'method': 'canny'}}},
+        {'id': 'segment', 'type': 'image_segmentation', 'data': {'parameters': {'method': 'threshold'}}},
+    ],
+    'edges': [{'source': 'filter', 'target': 'edge'}, {'source': 'edge', 'target': 'segment'}]
+}
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def run_level(url: str, workflow_id: str, body: bytes, concurrency: int, duration: float) -> Dict[str, Any]:
+    """以固定并发数持续发送请求 duration 秒"""
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    endpoint = f'{url}/api/execute?workflowId={workflow_id}&useCache=0&response=binary'
+
+    def client():
+        session = requests.Session()
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = session.post(endpoint, data=body, headers={'Content-Type': 'image/png'})
+                ok = response.status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors[0] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(client)
+    wall = time.perf_counter() - start
+    result = {'concurrency': concurrency, 'requests': len(latencies), 'errors': errors[0],
+              'throughput': round(len(latencies) / wall, 2)}
+    if latencies:
+        result.update({
+            'p50Ms': round(statistics.median(latencies) * 1000, 2),
+            'p95Ms': round(_percentile(latencies, 0.95) * 1000, 2),
+            'maxMs': round(max(latencies) * 1000, 2),
+        })
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description='/api/execute 负载测试')
+    parser.add_argument('--url', default='http://localhost:5000', help='服务地址')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8], help='并发客户端数')
+    parser.add_argument('--duration', type=float, default=10, help='每个并发级别的持续时间（秒）')
+    parser.add_argument('--megapixels', type=float, default=1, help='输入图像尺寸（百万像素）')
+    parser.add_argument('--output', help='结果JSON文件')
+    args = parser.parse_args()
+
+    url = args.url.rstrip('/')
+    buffer = io.BytesIO()
+    Image.fromarray(synthetic_image(args.megapixels)).save(buffer, format='PNG')
+    response = requests.post(f'{url}/api/workflows', json=WORKFLOW)
+    response.raise_for_status()
+    workflow_id = response.json()['workflowId']
+
+    results = []
+    baseline = None
+    print(f"{'并发':>6} {'请求数':>8} {'错误':>6} {'吞吐(req/s)':>12} {'加速比':>8} {'p50(ms)':>10} {'p95(ms)':>10}")
+    for concurrency in args.concurrency:
+        result = run_level(url, workflow_id, buffer.getvalue(), concurrency, args.duration)
+        baseline = baseline or result['throughput']
+        result['speedup'] = round(result['throughput'] / baseline, 2) if baseline else None
+        results.append(result)
+        print(f"{concurrency:>6} {result['requests']:>8} {result['errors']:>6} {result['throughput']:>12.2f} "
+              f"{result['speedup'] or 0:>8.2f} {result.get('p50Ms', 0):>10.2f} {result.get('p95Ms', 0):>10.2f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'url': url, 'megapixels': args.megapixels, 'results': results}, f,
+                      ensure_ascii=False, indent=2)
+
+if __name__ == '__main__':
+    main()
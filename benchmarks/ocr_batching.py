@@ -0,0 +1,129 @@
+"""
+OCR微批调度基准测试
+
+多个客户端线程持续提交小尺寸标签裁剪图，比较不同批大小/凑批等待时间下的吞吐量（张/秒）
+和单张延迟。默认使用模拟提供者：每次调用有固定开销（模型调度、预处理），每张图像再
+增加少量耗时，等待期间释放GIL，与推理引擎的行为一致；安装了 PaddleOCR 时可用
+--provider paddleocr 测量真实引擎。
+
+用法：
+    python -m benchmarks.ocr_batching --clients 16 --batch-sizes 1 2 4 8 16 --wait-ms 2 5 10
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmarks.common import synthetic_image
+from algorithms.ocr_providers import (OCRBatcher, OCRProvider, OCRProviderPool, OCRResult,
+                                      PaddleOCRProvider)
+
+class SimulatedOCRProvider(OCRProvider):
+    """模拟OCR提供者：一次调用耗时 overhead_ms + 每张 per_image_ms"""
+
+    def __init__(self, overhead_ms: float, per_image_ms: float):
+        self.overhead = overhead_ms / 1000.0
+        self.per_image = per_image_ms / 1000.0
+
+    def is_available(self) -> bool:
+        return True
+
+    def get_name(self) -> str:
+        return "SimulatedOCR"
+
+    def recognize(self, image: np.ndarray, **kwargs) -> OCRResult:
+        return self.recognize_batch([image])[0]
+
+    def recognize_batch(self, images: List[np.ndarray], **kwargs) -> List[OCRResult]:
+        time.sleep(self.overhead + self.per_image * len(images))
+        return [OCRResult(['QC-2024'], [0.99], [[(0, 0), (1, 0), (1, 1), (0, 1)]]) for _ in images]
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def run_level(provider: OCRProvider, crops: List[np.ndarray], clients: int, duration: float) -> Dict[str, Any]:
+    """clients 个线程持续调用 provider.recognize duration 秒"""
+    latencies: List[float] = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(index: int):
+        crop = crops[index % len(crops)]
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            provider.recognize(crop)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i, )) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    return {
+        'images': len(latencies),
+        'throughput': round(len(latencies) / wall, 1),
+        'p50Ms': round(statistics.median(latencies) * 1000, 2),
+        'p95Ms': round(_percentile(latencies, 0.95) * 1000, 2),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='OCR微批调度基准测试')
+    parser.add_argument('--provider', choices=('simulated', 'paddleocr'), default='simulated')
+    parser.add_argument('--clients', type=int, default=16, help='并发提交的客户端线程数')
+    parser.add_argument('--pool-size', type=int, default=1, help='下层实例池大小')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--wait-ms', type=float, nargs='+', default=[2, 5, 10], help='凑批等待时间（毫秒）')
+    parser.add_argument('--overhead-ms', type=float, default=20, help='模拟提供者每次调用的固定开销')
+    parser.add_argument('--per-image-ms', type=float, default=2, help='模拟提供者每张图像的耗时')
+    parser.add_argument('--duration', type=float, default=3, help='每组配置的持续时间（秒）')
+    parser.add_argument('--output', help='结果JSON文件')
+    args = parser.parse_args()
+
+    if args.provider == 'simulated':
+        def factory():
+            return SimulatedOCRProvider(args.overhead_ms, args.per_image_ms)
+    else:
+        def factory():
+            return PaddleOCRProvider(use_angle_cls=False, lang='ch')
+    pool = OCRProviderPool(factory, size=args.pool_size, max_waiting=args.clients)
+    pool.load()
+    # 标签裁剪图：从合成图像中截取的小块
+    image = synthetic_image(0.5)
+    crops = [np.ascontiguousarray(image[y:y + 48, x:x + 160]) for y in range(0, 480, 96) for x in range(0, 640, 160)]
+
+    results = []
+    print(f"{'批大小':>6} {'等待(ms)':>9} {'吞吐(张/s)':>11} {'加速比':>8} {'p50(ms)':>10} {'p95(ms)':>10} {'平均批':>8}")
+    baseline = run_level(pool, crops, args.clients, args.duration)
+    baseline.update({'batchSize': 1, 'waitMs': 0, 'speedup': 1.0, 'avgBatchSize': 1.0})
+    results.append(baseline)
+    print(f"{'不合批':>6} {'-':>9} {baseline['throughput']:>11.1f} {1.0:>8.2f} "
+          f"{baseline['p50Ms']:>10.2f} {baseline['p95Ms']:>10.2f} {1.0:>8.1f}")
+    for batch_size in args.batch_sizes:
+        for wait_ms in args.wait_ms:
+            batcher = OCRBatcher(pool, max_batch_size=batch_size, max_wait_ms=wait_ms,
+                                 concurrency=args.pool_size)
+            result = run_level(batcher, crops, args.clients, args.duration)
+            stats = batcher.stats()
+            result.update({'batchSize': batch_size, 'waitMs': wait_ms,
+                           'speedup': round(result['throughput'] / baseline['throughput'], 2),
+                           'avgBatchSize': round(stats['avgBatchSize'], 2)})
+            results.append(result)
+            print(f"{batch_size:>6} {wait_ms:>9g} {result['throughput']:>11.1f} {result['speedup']:>8.2f} "
+                  f"{result['p50Ms']:>10.2f} {result['p95Ms']:>10.2f} {result['avgBatchSize']:>8.1f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'provider': args.provider, 'clients': args.clients, 'poolSize': args.pool_size,
+                       'results': results}, f, ensure_ascii=False, indent=2)
+
+if __name__ == '__main__':
+    main()
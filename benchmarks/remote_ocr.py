@@ -0,0 +1,216 @@
+"""
+远程OCR提供者（DeepSeekOCR）客户端测试
+
+在本机启动一个模拟 DeepSeek 接口的 HTTP 服务（可设置响应延迟、5xx/429 比例、断开连接比例），
+依次验证：连接复用、并发识别、失败重试、熔断快速失败和异步 recognize_many。
+
+用法：
+    python -m benchmarks.remote_ocr                      # 运行全部场景
+    python -m benchmarks.remote_ocr --serve --port 8089  # 只启动模拟服务，可配合 api_base 手动测试
+"""
+import argparse
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+
+import requests
+
+from benchmarks.common import synthetic_image
+from algorithms.ocr_providers import CircuitOpenError, DeepSeekOCRProvider
+
+RESPONSE_CONTENT = json.dumps({'texts': ['QC-2024'], 'scores': [0.97],
+                               'boxes': [[[0, 0], [120, 0], [120, 40], [0, 40]]]})
+
+class StubOCRServer(ThreadingHTTPServer):
+    """模拟的 chat/completions 接口"""
+
+    daemon_threads = True
+
+    def __init__(self, address, latency_ms: float = 50, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, drop_rate: float = 0.0):
+        super().__init__(address, StubHandler)
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.drop_rate = drop_rate
+        self.down = False
+        self.connections = 0
+        self.requests = 0
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def configure(self, **settings):
+        for key, value in settings.items():
+            setattr(self, key, value)
+        with self.lock:
+            self.connections = self.requests = self.max_active = 0
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        # 响应头和响应体分两次写出，关闭Nagle算法避免长连接上的延迟确认等待
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, body: Dict[str, Any], headers: Dict[str, str] = None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        server = self.server
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        with server.lock:
+            server.requests += 1
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            if server.down:
+                self._reply(503, {'error': 'service unavailable'})
+                return
+            time.sleep(server.latency_ms / 1000.0)
+            roll = random.random()
+            if roll < server.drop_rate:
+                self.close_connection = True
+                self.connection.shutdown(2)
+                return
+            roll -= server.drop_rate
+            if roll < server.rate_limit_rate:
+                self._reply(429, {'error': 'rate limited'}, {'Retry-After': '0.05'})
+                return
+            roll -= server.rate_limit_rate
+            if roll < server.error_rate:
+                self._reply(500, {'error': 'internal error'})
+                return
+            self._reply(200, {'choices': [{'message': {'content': RESPONSE_CONTENT}}]})
+        finally:
+            with server.lock:
+                server.active -= 1
+
+def start_server(port: int = 0, **settings) -> StubOCRServer:
+    server = StubOCRServer(('127.0.0.1', port), **settings)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def _provider(server: StubOCRServer, **kwargs) -> DeepSeekOCRProvider:
+    return DeepSeekOCRProvider(api_key='stub', api_base=f'http://127.0.0.1:{server.server_address[1]}/v1',
+                               **kwargs)
+
+def scenario_connection_reuse(server, image, count: int):
+    """逐个发送请求：每次新建连接 vs 共享连接池"""
+    server.configure(latency_ms=5, error_rate=0, rate_limit_rate=0, drop_rate=0, down=False)
+    provider = _provider(server)
+    payload = provider._build_payload(image)
+    url = provider.api_base
+    start = time.perf_counter()
+    for _ in range(count):
+        requests.post(url, json=payload, headers={'Authorization': 'Bearer stub'}, timeout=30).raise_for_status()
+    fresh = time.perf_counter() - start
+    fresh_connections = server.connections
+    server.configure()
+    # 两边发送同一个预先编码好的请求体，只比较连接开销
+    start = time.perf_counter()
+    for _ in range(count):
+        provider._call(lambda: payload)
+    pooled = time.perf_counter() - start
+    print(f"[连接复用] {count} 次请求：每次新建连接 {fresh * 1000:.0f}ms（{fresh_connections} 个连接），"
+          f"连接池 {pooled * 1000:.0f}ms（{server.connections} 个连接）")
+
+def scenario_concurrency(server, image, count: int):
+    """recognize_batch 的耗时随最大并发数下降，服务端并发不超过上限"""
+    for concurrency in (1, 4, 8):
+        server.configure(latency_ms=50, error_rate=0, rate_limit_rate=0, drop_rate=0, down=False)
+        provider = _provider(server, max_concurrency=concurrency)
+        start = time.perf_counter()
+        results = provider.recognize_batch([image] * count)
+        elapsed = time.perf_counter() - start
+        assert all(result.texts == ['QC-2024'] for result in results)
+        print(f"[并发] max_concurrency={concurrency}: {count} 张 {elapsed * 1000:.0f}ms，"
+              f"服务端最大并发 {server.max_active}，连接数 {server.connections}")
+
+def scenario_retries(server, image, count: int):
+    """30% 的请求返回 5xx/429/断开连接时，重试后的成功率"""
+    for retries in (0, 2, 4):
+        server.configure(latency_ms=5, error_rate=0.15, rate_limit_rate=0.1, drop_rate=0.05, down=False)
+        provider = _provider(server, max_retries=retries, backoff=0.02, breaker_threshold=1000)
+        ok = 0
+        for _ in range(count):
+            try:
+                provider.recognize(image)
+                ok += 1
+            except RuntimeError:
+                pass
+        stats = provider.stats()
+        print(f"[重试] max_retries={retries}: 成功 {ok}/{count}，请求 {stats['requests']} 次，重试 {stats['retries']} 次")
+
+def scenario_circuit_breaker(server, image):
+    """服务不可用时，熔断后调用立即失败；恢复后半开试探成功即关闭"""
+    server.configure(latency_ms=5, error_rate=0, rate_limit_rate=0, drop_rate=0, down=True)
+    provider = _provider(server, max_retries=1, backoff=0.05, breaker_threshold=3, breaker_reset=0.5)
+    for i in range(6):
+        start = time.perf_counter()
+        try:
+            provider.recognize(image)
+            outcome = '成功'
+        except CircuitOpenError:
+            outcome = '熔断'
+        except RuntimeError:
+            outcome = '失败'
+        print(f"[熔断] 第 {i + 1} 次调用: {outcome}，{(time.perf_counter() - start) * 1000:.1f}ms，"
+              f"状态 {provider.breaker.state}")
+    server.down = False
+    time.sleep(0.6)
+    provider.recognize(image)
+    print(f"[熔断] 服务恢复 {provider.breaker.reset_timeout}s 后试探调用成功，状态 {provider.breaker.state}，"
+          f"服务端共收到 {server.requests} 个请求")
+
+def scenario_async(server, image, count: int):
+    server.configure(latency_ms=50, error_rate=0, rate_limit_rate=0, drop_rate=0, down=False)
+    provider = _provider(server, max_concurrency=8)
+    start = time.perf_counter()
+    results = asyncio.run(provider.recognize_many([image] * count))
+    print(f"[异步] recognize_many {len(results)} 张: {(time.perf_counter() - start) * 1000:.0f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description='远程OCR提供者客户端测试')
+    parser.add_argument('--serve', action='store_true', help='只启动模拟服务')
+    parser.add_argument('--port', type=int, default=0, help='模拟服务端口（默认随机）')
+    parser.add_argument('--latency-ms', type=float, default=50, help='模拟服务的响应延迟')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='返回500的比例（仅 --serve）')
+    parser.add_argument('--count', type=int, default=32, help='每个场景的请求数')
+    args = parser.parse_args()
+
+    if args.serve:
+        server = StubOCRServer(('127.0.0.1', args.port), latency_ms=args.latency_ms, error_rate=args.error_rate)
+        print(f"模拟OCR服务: http://127.0.0.1:{server.server_address[1]}/v1")
+        server.serve_forever()
+        return
+
+    server = start_server(args.port)
+    image = synthetic_image(0.05)
+    scenario_connection_reuse(server, image, args.count)
+    scenario_concurrency(server, image, args.count)
+    scenario_retries(server, image, args.count * 4)
+    scenario_circuit_breaker(server, image)
+    scenario_async(server, image, args.count)
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+裁剪下推基准测试：滤波 → 边缘检测 → ROI 链路上，比较整图处理后再裁剪与提前裁剪（只处理ROI及重叠边）
+的耗时随ROI面积的变化，并校验结果逐位一致
+
+用法：
+    python -m benchmarks.roi_pushdown [--megapixels 20] [--roi-sizes 256 1024 2048] [--repeat 3]
+"""
+import argparse
+import json
+
+import numpy as np
+
+from benchmarks.common import measure, synthetic_image
+from algorithms import edge_detection, image_filter, roi_extraction
+from workflow_engine import compile_workflow, execute_plan, extract_image
+
+MODULES = {'image_filter': image_filter, 'edge_detection': edge_detection, 'roi_extraction': roi_extraction}
+
+def build_plan(x: int, y: int, size: int):
+    nodes = [
+        {'id': 'filter', 'type': 'image_filter', 'data': {'parameters': {'filter_type': 'gaussian', 'kernel_size': 5}}},
+        {'id': 'edge', 'type': 'edge_detection', 'data': {'parameters': {'method': 'sobel'}}},
+        {'id': 'roi', 'type': 'roi_extraction', 'data': {'parameters': {'x': x, 'y': y, 'width': size, 'height': size}}},
+    ]
+    edges = [{'source': 'filter', 'target': 'edge'}, {'source': 'edge', 'target': 'roi'}]
+    return compile_workflow(nodes, edges, MODULES)
+
+def main():
+    parser = argparse.ArgumentParser(description='裁剪下推基准测试')
+    parser.add_argument('--megapixels', type=float, default=20, help='图像尺寸（百万像素）')
+    parser.add_argument('--roi-sizes', type=int, nargs='+', default=[256, 1024, 2048], help='ROI边长')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数')
+    parser.add_argument('--output', help='结果JSON文件')
+    args = parser.parse_args()
+
+    image = synthetic_image(args.megapixels)
+    height, width = image.shape[:2]
+    results = []
+    print(f"图像 {width}x{height}")
+    print(f"{'ROI边长':>8} {'面积占比':>8} {'整图后裁剪(ms)':>15} {'提前裁剪(ms)':>13} {'一致':>4}")
+    for size in args.roi_sizes:
+        plan = build_plan(max(0, (width - size) // 2), max(0, (height - size) // 2), size)
+        full = extract_image(execute_plan(plan, image, pushdown=False)[plan.sink])
+        pushed = extract_image(execute_plan(plan, image)[plan.sink])
+        identical = bool(np.array_equal(full, pushed))
+        before = measure(lambda: execute_plan(plan, image, pushdown=False), repeat=args.repeat)
+        after = measure(lambda: execute_plan(plan, image), repeat=args.repeat)
+        ratio = full.shape[0] * full.shape[1] / (height * width)
+        results.append({'roiSize': size, 'areaRatio': round(ratio, 4), 'fullFrame': before, 'pushdown': after,
+                        'identical': identical})
+        print(f"{size:>8} {ratio:>8.2%} {before['medianMs']:>15.1f} {after['medianMs']:>13.1f} "
+              f"{'是' if identical else '否':>4}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'megapixels': args.megapixels, 'results': results}, f, ensure_ascii=False, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+服务启动耗时测试
+
+在独立的子进程中测量：导入应用（含加载全部算法模块）的耗时、首次和再次请求算法列表的耗时，
+多次运行取中位数。加 --importtime 时输出导入耗时最高的模块。
+
+用法：
+    python -m benchmarks.startup [--repeat 5] [--importtime]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+from benchmarks.common import ROOT_DIR
+
+PROBE = '''
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+client = app.app.test_client()
+client.get('/api/algorithms')
+first = time.perf_counter()
+client.get('/api/algorithms')
+second = time.perf_counter()
+print(json.dumps({'importMs': (imported - start) * 1000, 'firstCatalogMs': (first - imported) * 1000,
+                  'cachedCatalogMs': (second - first) * 1000, 'readyMs': (first - start) * 1000}))
+'''
+
+def measure_once() -> dict:
+    output = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT_DIR, capture_output=True,
+                            text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def top_imports(limit: int):
+    """用 -X importtime 统计自身导入耗时最高的模块"""
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=ROOT_DIR,
+                            capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    for cumulative_us, self_us, name in sorted(rows, reverse=True)[:limit]:
+        print(f'{cumulative_us / 1000:10.1f} ms {self_us / 1000:10.1f} ms  {name}')
+
+def main():
+    parser = argparse.ArgumentParser(description='服务启动耗时测试')
+    parser.add_argument('--repeat', type=int, default=5, help='重复次数')
+    parser.add_argument('--importtime', action='store_true', help='输出导入耗时最高的模块')
+    args = parser.parse_args()
+
+    runs = [measure_once() for _ in range(args.repeat)]
+    for key in ('importMs', 'firstCatalogMs', 'cachedCatalogMs', 'readyMs'):
+        values = [run[key] for run in runs]
+        print(f'{key:<16} 中位数 {statistics.median(values):8.1f} ms  最小 {min(values):8.1f} ms')
+    if args.importtime:
+        print(f'{"累计":>13} {"自身":>13}  模块')
+        top_imports(25)
+
+if __name__ == '__main__':
+    main()
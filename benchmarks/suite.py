@@ -0,0 +1,225 @@
+"""
+算法模块与工作流基准测试套件
+
+对 load_algorithm_modules 发现的每个算法模块，按每个下拉参数（如 filter_type、method）的
+每个选项计时 execute()，输入为 1/5/20/40 MP 的灰度和RGB合成图像；并通过 Flask 测试客户端
+计时典型工作流的端到端执行。结果写入JSON，compare 模式与基线对比并标记性能回退。
+
+用法：
+    python -m benchmarks.suite run --output bench.json [--sizes 1 5] [--baseline baseline.json]
+    python -m benchmarks.suite compare baseline.json bench.json [--threshold 0.1]
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from benchmarks.common import measure, synthetic_image
+
+# 依赖外部OCR引擎的模块默认不参与（需要时用 --modules 显式指定）
+DEFAULT_SKIP_MODULES = {'ocr_recognition'}
+
+# 典型工作流（节点类型与参数），用于端到端计时
+WORKFLOWS = {
+    'filter_edge_segment': {
+        'nodes': [
+            {'id': 'filter', 'type': 'image_filter', 'data': {'parameters': {'filter_type': 'gaussian'}}},
+            {'id': 'edge', 'type': 'edge_detection', 'data': {'parameters': {'method': 'sobel'}}},
+            {'id': 'segment', 'type': 'image_segmentation', 'data': {'parameters': {'method': 'threshold'}}},
+        ],
+        'edges': [{'source': 'filter', 'target': 'edge'}, {'source': 'edge', 'target': 'segment'}]
+    },
+    'fanout': {
+        'nodes': [
+            {'id': 'filter', 'type': 'image_filter', 'data': {'parameters': {'filter_type': 'median'}}},
+            {'id': 'edge', 'type': 'edge_detection', 'data': {'parameters': {'method': 'canny'}}},
+            {'id': 'segment', 'type': 'image_segmentation', 'data': {'parameters': {'method': 'watershed'}}},
+        ],
+        'edges': [{'source': 'filter', 'target': 'edge'}, {'source': 'filter', 'target': 'segment'}]
+    },
+    'register_edge_roi': {
+        'nodes': [
+            {'id': 'register', 'type': 'image_registration', 'data': {'parameters': {'angle': 5}}},
+            {'id': 'edge', 'type': 'edge_detection', 'data': {'parameters': {'method': 'canny'}}},
+            {'id': 'roi', 'type': 'roi_extraction',
+             'data': {'parameters': {'x': 100, 'y': 100, 'width': 800, 'height': 600}}},
+        ],
+        'edges': [{'source': 'register', 'target': 'edge'}, {'source': 'edge', 'target': 'roi'}]
+    },
+}
+
+def module_cases(name: str, module) -> List[Dict[str, Any]]:
+    """按模块的下拉参数生成测试参数组合（每次只改变一个参数，其余取默认值）"""
+    parameters = module.get_info().get('parameters', {}) if hasattr(module, 'get_info') else {}
+    defaults = {key: spec.get('default') for key, spec in parameters.items() if 'default' in spec}
+    cases = []
+    for key, spec in parameters.items():
+        if spec.get('type') == 'select':
+            for option in spec.get('options', []):
+                cases.append({**defaults, key: option})
+    return cases or [defaults]
+
+def _case_label(parameters: Dict[str, Any], module) -> str:
+    """用下拉参数的取值作为用例名称"""
+    specs = module.get_info().get('parameters', {}) if hasattr(module, 'get_info') else {}
+    selected = [f'{key}={value}' for key, value in parameters.items()
+                if specs.get(key, {}).get('type') == 'select']
+    return ','.join(selected) or 'default'
+
+def bench_modules(modules: Dict[str, Any], sizes: List[float], repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    for megapixels in sizes:
+        for channels in (1, 3):
+            image = synthetic_image(megapixels, channels)
+            color = 'gray' if channels == 1 else 'rgb'
+            for name, module in modules.items():
+                for parameters in module_cases(name, module):
+                    label = _case_label(parameters, module)
+                    case_id = f'module/{name}/{label}/{megapixels:g}MP/{color}'
+                    try:
+                        stats = measure(lambda: module.execute({'image': image}, parameters), repeat=repeat)
+                    except Exception as e:
+                        results.append({'id': case_id, 'error': str(e)})
+                        print(f'{case_id:<70} 失败: {e}')
+                        continue
+                    stats.update({'id': case_id, 'kind': 'module', 'module': name,
+                                  'parameters': parameters, 'megapixels': megapixels, 'color': color})
+                    results.append(stats)
+                    print(f"{case_id:<70} {stats['medianMs']:10.2f} ms")
+    return results
+
+def bench_workflows(client, sizes: List[float], repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    for megapixels in sizes:
+        buffer = io.BytesIO()
+        Image.fromarray(synthetic_image(megapixels)).save(buffer, format='PNG')
+        png_bytes = buffer.getvalue()
+        for name, workflow in WORKFLOWS.items():
+            case_id = f'workflow/{name}/{megapixels:g}MP/rgb'
+            workflow_id = client.post('/api/workflows', json=workflow).get_json()['workflowId']
+
+            def call():
+                response = client.post(f'/api/execute?workflowId={workflow_id}&useCache=0&response=binary',
+                                       data=png_bytes, content_type='image/png')
+                if response.status_code != 200:
+                    raise RuntimeError(response.get_data(as_text=True)[:200])
+                return response
+
+            try:
+                stats = measure(call, repeat=repeat)
+            except Exception as e:
+                results.append({'id': case_id, 'error': str(e)})
+                print(f'{case_id:<70} 失败: {e}')
+                continue
+            stats.update({'id': case_id, 'kind': 'workflow', 'workflow': name, 'megapixels': megapixels})
+            results.append(stats)
+            print(f"{case_id:<70} {stats['medianMs']:10.2f} ms")
+    return results
+
+def environment() -> Dict[str, Any]:
+    """记录运行环境，便于判断基线是否可比"""
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'platform': platform.platform(),
+        'cpuCount': os.cpu_count(),
+        'cv2Threads': cv2.getNumThreads(),
+    }
+
+def run(sizes: List[float], repeat: int, module_names: Optional[List[str]] = None,
+        skip_workflows: bool = False) -> Dict[str, Any]:
+    import app as app_module
+    app_module.app.config['MAX_CONTENT_LENGTH'] = None
+
+    modules = {name: module for name, module in sorted(app_module.ALGORITHM_MODULES.items())
+               if (name in module_names if module_names else name not in DEFAULT_SKIP_MODULES)}
+    results = bench_modules(modules, sizes, repeat)
+    if not skip_workflows:
+        results += bench_workflows(app_module.app.test_client(), sizes, repeat)
+    return {'environment': environment(), 'sizes': sizes, 'repeat': repeat, 'results': results}
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float,
+            min_delta_ms: float) -> List[Dict[str, Any]]:
+    """
+    与基线对比，中位耗时增加超过 threshold（比例）且超过 min_delta_ms 的用例视为回退
+
+    Returns:
+        每个共同用例的对比结果
+    """
+    baseline_results = {r['id']: r for r in baseline['results'] if 'medianMs' in r}
+    rows = []
+    for result in current['results']:
+        base = baseline_results.get(result['id'])
+        if base is None or 'medianMs' not in result:
+            continue
+        delta = result['medianMs'] - base['medianMs']
+        ratio = delta / base['medianMs'] if base['medianMs'] else 0.0
+        rows.append({
+            'id': result['id'],
+            'baselineMs': base['medianMs'],
+            'currentMs': result['medianMs'],
+            'change': round(ratio, 4),
+            'regression': ratio > threshold and delta > min_delta_ms
+        })
+    return rows
+
+def print_comparison(rows: List[Dict[str, Any]]) -> int:
+    regressions = [row for row in rows if row['regression']]
+    for row in rows:
+        flag = '回退' if row['regression'] else ''
+        print(f"{row['id']:<70} {row['baselineMs']:10.2f} -> {row['currentMs']:10.2f} ms "
+              f"{row['change'] * 100:+7.1f}% {flag}")
+    print(f'共对比 {len(rows)} 个用例，性能回退 {len(regressions)} 个')
+    return len(regressions)
+
+def main():
+    parser = argparse.ArgumentParser(description='算法模块与工作流基准测试')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='运行基准测试')
+    run_parser.add_argument('--sizes', type=float, nargs='+', default=[1, 5, 20, 40], help='图像尺寸（百万像素）')
+    run_parser.add_argument('--repeat', type=int, default=3, help='每个用例的重复次数')
+    run_parser.add_argument('--modules', nargs='+', help='只测试指定的算法模块')
+    run_parser.add_argument('--skip-workflows', action='store_true', help='不测试端到端工作流')
+    run_parser.add_argument('--output', default='bench_output.json', help='结果JSON文件')
+    run_parser.add_argument('--baseline', help='运行后与该基线对比')
+    run_parser.add_argument('--threshold', type=float, default=0.10, help='判定回退的耗时增加比例')
+    run_parser.add_argument('--min-delta-ms', type=float, default=1.0, help='判定回退的最小耗时增加（毫秒）')
+
+    compare_parser = subparsers.add_parser('compare', help='对比两次基准测试结果')
+    compare_parser.add_argument('baseline', help='基线JSON文件')
+    compare_parser.add_argument('current', help='当前结果JSON文件')
+    compare_parser.add_argument('--threshold', type=float, default=0.10, help='判定回退的耗时增加比例')
+    compare_parser.add_argument('--min-delta-ms', type=float, default=1.0, help='判定回退的最小耗时增加（毫秒）')
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        current = run(args.sizes, args.repeat, args.modules, args.skip_workflows)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+        print(f'结果已写入 {args.output}')
+        if not args.baseline:
+            return 0
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    else:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        with open(args.current, encoding='utf-8') as f:
+            current = json.load(f)
+
+    rows = compare(baseline, current, args.threshold, args.min_delta_ms)
+    return 1 if print_comparison(rows) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
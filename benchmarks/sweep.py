@@ -0,0 +1,92 @@
+"""
+参数扫描基准测试：滤波 → 边缘检测 → 分割 链路上，比较每个取值都重新执行整个工作流（逐次调用 /api/execute
+的做法，不使用节点输出缓存，含输出扩展为RGB）与 execute_sweep（上游只执行一次，目标节点的灰度/梯度等只计算一次）的总耗时，
+并校验每个取值的结果逐位一致（比较内容哈希，两种方式的耗时都不含校验）
+
+用例：
+  - threshold_value：分割节点的阈值（Sobel 之后的固定阈值分割）
+  - threshold1：边缘检测节点的 Canny 低阈值（下游接固定阈值分割）
+
+用法：
+    python -m benchmarks.sweep [--megapixels 20] [--values 32]
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from benchmarks.common import synthetic_image
+from algorithms import edge_detection, image_filter, image_segmentation
+from buffer_pool import BufferPool
+from caching import hash_array
+from workflow_engine import compile_workflow, execute_plan, execute_sweep, expand_gray, extract_image, with_parameter
+
+MODULES = {'image_filter': image_filter, 'edge_detection': edge_detection, 'image_segmentation': image_segmentation}
+
+def build_plan(edge_method: str):
+    nodes = [
+        {'id': 'filter', 'type': 'image_filter', 'data': {'parameters': {'filter_type': 'gaussian', 'kernel_size': 5}}},
+        {'id': 'edge', 'type': 'edge_detection', 'data': {'parameters': {'method': edge_method}}},
+        {'id': 'segment', 'type': 'image_segmentation', 'data': {'parameters': {'method': 'threshold',
+                                                                                'threshold_value': 60}}},
+    ]
+    edges = [{'source': 'filter', 'target': 'edge'}, {'source': 'edge', 'target': 'segment'}]
+    return compile_workflow(nodes, edges, MODULES)
+
+CASES = [
+    ('threshold_value', 'sobel', 'segment'),
+    ('threshold1', 'canny', 'edge'),
+]
+
+def run_case(image: np.ndarray, parameter: str, edge_method: str, target: str, values, buffers: BufferPool):
+    plan = build_plan(edge_method)
+
+    repeated_ms = 0.0
+    expected = []
+    for value in values:
+        start = time.perf_counter()
+        output = execute_plan(with_parameter(plan, target, parameter, value), image, buffers=buffers)[plan.sink]
+        repeated_ms += (time.perf_counter() - start) * 1000
+        expected.append(hash_array(extract_image(output)))
+        output = None
+
+    stats = {}
+    identical = True
+    for index, (value, output, compact) in enumerate(execute_sweep(plan, image, target, parameter, values,
+                                                                   stats=stats, buffers=buffers)):
+        result = extract_image(expand_gray(output) if compact else output)
+        identical = identical and hash_array(result) == expected[index]
+        result = None
+        output = None
+    sweep_ms = stats['upstreamMs'] + sum(stats['valueMs'])
+    return {'parameter': parameter, 'edgeMethod': edge_method, 'values': len(values),
+            'repeatedMs': round(repeated_ms, 1), 'sweepMs': round(sweep_ms, 1),
+            'upstreamMs': stats['upstreamMs'], 'perValueMs': round(float(np.median(stats['valueMs'])), 2),
+            'identical': identical}
+
+def main():
+    parser = argparse.ArgumentParser(description='参数扫描基准测试')
+    parser.add_argument('--megapixels', type=float, default=20, help='图像尺寸（百万像素）')
+    parser.add_argument('--values', type=int, default=32, help='取值个数（0-255 等间隔）')
+    parser.add_argument('--output', help='结果JSON文件')
+    args = parser.parse_args()
+
+    image = synthetic_image(args.megapixels)
+    values = [int(value) for value in np.linspace(0, 255, args.values)]
+    buffers = BufferPool(max_bytes=512 * 1024 * 1024)
+    results = []
+    print(f"图像 {args.megapixels} MP，{len(values)} 个取值")
+    print(f"{'参数':<16} {'逐次执行(ms)':>13} {'扫描(ms)':>10} {'上游(ms)':>9} {'每个取值(ms)':>13} {'一致':>4}")
+    for parameter, edge_method, target in CASES:
+        result = run_case(image, parameter, edge_method, target, values, buffers)
+        results.append(result)
+        print(f"{parameter:<16} {result['repeatedMs']:>13.1f} {result['sweepMs']:>10.1f} {result['upstreamMs']:>9.1f} "
+              f"{result['perValueMs']:>13.2f} {'是' if result['identical'] else '否':>4}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'megapixels': args.megapixels, 'results': results}, f, ensure_ascii=False, indent=2)
+
+if __name__ == '__main__':
+    main()
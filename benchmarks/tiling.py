@@ -0,0 +1,74 @@
+"""
+分块执行基准测试：比较局部运算整图执行与分块执行的耗时和临时内存峰值，并校验结果逐位一致
+
+内存峰值用 tracemalloc 统计（numpy 和 OpenCV 返回的数组都会计入），不含输入图像本身。
+
+用法：
+    python -m benchmarks.tiling [--megapixels 100] [--tile-size 1024] [--workers 4]
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from benchmarks.common import synthetic_image
+from algorithms import edge_detection, image_filter, image_segmentation
+from tiling import TilingOptions, module_footprint, run_tiled
+
+CASES = [
+    ('gaussian_k5', image_filter, {'filter_type': 'gaussian', 'kernel_size': 5}),
+    ('median_k7', image_filter, {'filter_type': 'median', 'kernel_size': 7}),
+    ('sobel', edge_detection, {'method': 'sobel'}),
+    ('laplacian', edge_detection, {'method': 'laplacian'}),
+    ('threshold', image_segmentation, {'method': 'threshold'}),
+]
+
+def _measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser(description='分块执行基准测试')
+    parser.add_argument('--megapixels', type=float, default=100, help='图像尺寸（百万像素）')
+    parser.add_argument('--tile-size', type=int, default=1024, help='块边长')
+    parser.add_argument('--workers', type=int, default=4, help='块执行线程数')
+    parser.add_argument('--cases', nargs='+', help='只运行指定的用例')
+    parser.add_argument('--output', help='结果JSON文件')
+    args = parser.parse_args()
+
+    image = synthetic_image(args.megapixels)
+    pool = ThreadPoolExecutor(max_workers=args.workers)
+    options = TilingOptions(tile_size=args.tile_size, min_pixels=0, pool=pool, max_in_flight=args.workers * 2)
+    results = []
+    print(f"{'用例':<14} {'整图(ms)':>10} {'分块(ms)':>10} {'整图峰值(MB)':>13} {'分块峰值(MB)':>13} {'块数':>6} {'一致':>4}")
+    for name, module, parameters in CASES:
+        if args.cases and name not in args.cases:
+            continue
+        whole, whole_time, whole_peak = _measure(lambda: module.execute({'image': image}, parameters)['image'])
+        (tiled, tiles), tiled_time, tiled_peak = _measure(lambda: run_tiled(
+            lambda tile: module.execute({'image': tile}, parameters)['image'],
+            image, module_footprint(module, parameters), options))
+        identical = bool(np.array_equal(whole, tiled))
+        del whole, tiled
+        results.append({'case': name, 'wholeMs': round(whole_time * 1000, 1), 'tiledMs': round(tiled_time * 1000, 1),
+                        'wholePeakBytes': whole_peak, 'tiledPeakBytes': tiled_peak, 'tiles': tiles,
+                        'identical': identical})
+        print(f"{name:<14} {whole_time * 1000:>10.1f} {tiled_time * 1000:>10.1f} {whole_peak / 1e6:>13.1f} "
+              f"{tiled_peak / 1e6:>13.1f} {tiles:>6} {'是' if identical else '否':>4}")
+    pool.shutdown()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'megapixels': args.megapixels, 'tileSize': args.tile_size, 'workers': args.workers,
+                       'results': results}, f, ensure_ascii=False, indent=2)
+
+if __name__ == '__main__':
+    main()
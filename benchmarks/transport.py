@@ -0,0 +1,76 @@
+"""
+图像传输方式基准测试：比较 base64-in-JSON 与二进制传输的负载大小和延迟
+
+用法：
+    python -m benchmarks.transport [--sizes 5 20] [--repeat 5]
+"""
+import argparse
+import base64
+import io
+import json
+
+from PIL import Image
+
+from benchmarks.common import measure, synthetic_image
+
+def run(sizes, repeat):
+    import app as app_module
+    app_module.app.config['MAX_CONTENT_LENGTH'] = None
+    client = app_module.app.test_client()
+
+    # 输出即输入的整幅ROI，使耗时集中在传输和编解码上
+    workflow = {
+        'nodes': [{'id': 'roi', 'type': 'roi_extraction',
+                   'data': {'parameters': {'x': 0, 'y': 0, 'width': 100000, 'height': 100000}}}],
+        'edges': []
+    }
+    workflow_id = client.post('/api/workflows', json=workflow).get_json()['workflowId']
+
+    results = []
+    for megapixels in sizes:
+        buffer = io.BytesIO()
+        Image.fromarray(synthetic_image(megapixels)).save(buffer, format='PNG')
+        png_bytes = buffer.getvalue()
+
+        json_body = json.dumps({
+            'workflowId': workflow_id, 'useCache': False,
+            'inputImage': 'data:image/png;base64,' + base64.b64encode(png_bytes).decode()
+        })
+        cases = {
+            'json_base64_png': lambda: client.post('/api/execute', data=json_body,
+                                                   content_type='application/json'),
+            'binary_png': lambda: client.post(
+                f'/api/execute?workflowId={workflow_id}&useCache=0&response=binary',
+                data=png_bytes, content_type='image/png'),
+            'binary_png_fast': lambda: client.post(
+                f'/api/execute?workflowId={workflow_id}&useCache=0&response=binary&compression=1',
+                data=png_bytes, content_type='image/png'),
+            'binary_jpeg_q90': lambda: client.post(
+                f'/api/execute?workflowId={workflow_id}&useCache=0&format=jpeg&quality=90',
+                data=png_bytes, content_type='image/png', headers={'Accept': 'image/jpeg'}),
+        }
+        for name, call in cases.items():
+            response = call()
+            assert response.status_code == 200, response.get_data(as_text=True)[:200]
+            request_bytes = len(json_body) if name.startswith('json') else len(png_bytes)
+            stats = measure(call, repeat=repeat)
+            stats.update({'case': name, 'megapixels': megapixels,
+                          'requestBytes': request_bytes, 'responseBytes': len(response.get_data())})
+            results.append(stats)
+            print(f"{megapixels:>4} MP  {name:<18} 请求 {request_bytes / 1e6:8.2f} MB  "
+                  f"响应 {stats['responseBytes'] / 1e6:8.2f} MB  中位耗时 {stats['medianMs']:9.1f} ms")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='图像传输方式基准测试')
+    parser.add_argument('--sizes', type=float, nargs='+', default=[5, 20], help='图像尺寸（百万像素）')
+    parser.add_argument('--repeat', type=int, default=5, help='每种情况的重复次数')
+    parser.add_argument('--output', help='将结果写入JSON文件')
+    args = parser.parse_args()
+    results = run(args.sizes, args.repeat)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+数组缓冲池
+按 (形状, 数据类型) 复用大数组，减少整幅图像的反复分配。执行引擎持有缓冲池，
+通过 inputs['buffers'] 交给算法模块：模块用 acquire() 取得输出和临时数组，临时数组用完后 release()；
+节点输出由执行引擎按所有权归还（见 workflow_engine._OutputStore）：只有本次执行新产生、
+没有交给缓存或其他调用方的输出，在最后一个下游节点执行完、且没有其他输出仍在使用时才归还。
+
+缓冲池本身不检查数组是否仍被引用，release() 的调用方负责保证之后不再使用该数组及其视图。
+"""
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+BufferKey = Tuple[Tuple[int, ...], str]
+
+class BufferPool:
+    """按字节预算保留空闲数组的线程安全缓冲池"""
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._free: 'OrderedDict[BufferKey, List[np.ndarray]]' = OrderedDict()
+        self._bytes = 0
+        self._free_ids = set()
+        self._issued: 'weakref.WeakValueDictionary[int, np.ndarray]' = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected = 0
+
+    def acquire(self, shape: Tuple[int, ...], dtype: Any = np.uint8) -> np.ndarray:
+        """取得指定形状和类型的数组（内容未初始化）"""
+        shape = tuple(int(size) for size in shape)
+        key = (shape, np.dtype(dtype).str)
+        with self._lock:
+            arrays = self._free.get(key)
+            if arrays:
+                array = arrays.pop()
+                if not arrays:
+                    del self._free[key]
+                self._bytes -= array.nbytes
+                self._free_ids.discard(id(array))
+                self.hits += 1
+                array.flags.writeable = True
+                return array
+            self.misses += 1
+        array = np.empty(shape, dtype=dtype)
+        with self._lock:
+            self._issued[id(array)] = array
+        return array
+
+    def owns(self, array: Any) -> bool:
+        """是否是由本缓冲池 acquire() 分配的整块数组（视图和其他数组返回 False）"""
+        if not isinstance(array, np.ndarray) or array.base is not None:
+            return False
+        with self._lock:
+            return self._issued.get(id(array)) is array
+
+    def release(self, array: np.ndarray) -> bool:
+        """
+        归还由 acquire() 取得的数组，返回是否回收
+
+        调用方保证归还后不再使用该数组及其视图；不是本缓冲池分配的数组、视图或超过字节预算的数组不回收。
+        """
+        if not self._put(array):
+            with self._lock:
+                self.rejected += 1
+            return False
+        return True
+
+    def _put(self, array: np.ndarray) -> bool:
+        if array.base is not None or array.nbytes > self.max_bytes:
+            return False
+        key = (array.shape, array.dtype.str)
+        with self._lock:
+            # 重复归还同一数组时不再加入，避免同一数组被分配给两个使用者
+            if self._issued.get(id(array)) is not array or id(array) in self._free_ids:
+                return False
+            self._free.setdefault(key, []).append(array)
+            self._free_ids.add(id(array))
+            self._free.move_to_end(key)
+            self._bytes += array.nbytes
+            while self._bytes > self.max_bytes and self._free:
+                old_key, arrays = next(iter(self._free.items()))
+                evicted = arrays.pop(0)
+                self._bytes -= evicted.nbytes
+                self._free_ids.discard(id(evicted))
+                if not arrays:
+                    del self._free[old_key]
+                self.evictions += 1
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._free.clear()
+            self._free_ids.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': sum(len(arrays) for arrays in self._free.values()),
+                'bytes': self._bytes,
+                'maxBytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'rejected': self.rejected,
+                'hitRate': self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,145 @@
+"""
+缓存工具
+提供按字节预算淘汰的LRU缓存、图像内容哈希以及节点输出缓存
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+def hash_array(array: np.ndarray) -> str:
+    """计算图像数组的内容哈希（包含形状和数据类型）"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f'{array.shape}|{array.dtype.str}|'.encode())
+    digest.update(memoryview(np.ascontiguousarray(array)).cast('B'))
+    return digest.hexdigest()
+
+def value_nbytes(value: Any) -> int:
+    """估算缓存值占用的字节数（数组按 nbytes 计算，同一数组只计一次）"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        seen = set()
+        total = 0
+        for item in value.values():
+            if isinstance(item, np.ndarray):
+                if id(item) not in seen:
+                    seen.add(id(item))
+                    total += item.nbytes
+            elif isinstance(item, (str, bytes)):
+                total += len(item)
+        return total
+    return 0
+
+class ByteLRUCache:
+    """按字节预算淘汰的线程安全LRU缓存"""
+
+    def __init__(self, max_bytes: int, sizeof: Callable[[Any], int] = value_nbytes):
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._entries: 'OrderedDict[Any, Any]' = OrderedDict()
+        self._sizes: Dict[Any, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Any) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Any, value: Any) -> bool:
+        """写入缓存，超过预算的单个值不缓存，返回是否写入"""
+        size = self._sizeof(value)
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._sizes[key]
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._sizes[key] = size
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                old_key, _ = self._entries.popitem(last=False)
+                self._bytes -= self._sizes.pop(old_key)
+                self.evictions += 1
+        return True
+
+    def pop(self, key: Any) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.pop(key, None)
+            if value is not None:
+                self._bytes -= self._sizes.pop(key)
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'maxBytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hitRate': self.hits / lookups if lookups else 0.0
+            }
+
+    def __contains__(self, key: Any) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+def _freeze(value: Any) -> Any:
+    """将数组设为只读；视图先复制一份，避免缓存长期持有整幅父图像"""
+    if isinstance(value, np.ndarray):
+        if not value.flags.owndata:
+            value = value.copy()
+        value.flags.writeable = False
+    return value
+
+class NodeOutputCache(ByteLRUCache):
+    """
+    节点输出缓存
+
+    键由输入图像哈希和节点签名（算法、参数以及全部上游链路）组成，
+    缓存中的数组均为只读，多个请求可以安全共享。
+    """
+
+    @staticmethod
+    def make_key(image_digest: str, signature: str) -> str:
+        return f'{image_digest}:{signature}'
+
+    def put(self, key: Any, value: Any) -> bool:
+        if isinstance(value, dict):
+            # 同一数组在多个键下出现时（如 image/output）保持共享
+            frozen_arrays = {}
+            frozen = {}
+            for name, item in value.items():
+                if isinstance(item, np.ndarray):
+                    if id(item) not in frozen_arrays:
+                        frozen_arrays[id(item)] = _freeze(item)
+                    item = frozen_arrays[id(item)]
+                frozen[name] = item
+            value = frozen
+        else:
+            value = _freeze(value)
+        return super().put(key, value)
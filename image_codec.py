@@ -0,0 +1,99 @@
+"""
+图像编解码
+输入图像解码以及结果图像按指定格式（PNG/JPEG/WebP）编码
+"""
+import io
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# 支持的输出格式：格式名 -> (OpenCV扩展名, MIME类型)
+OUTPUT_FORMATS = {
+    'png': ('.png', 'image/png'),
+    'jpeg': ('.jpg', 'image/jpeg'),
+    'webp': ('.webp', 'image/webp'),
+}
+
+FORMAT_ALIASES = {'jpg': 'jpeg'}
+
+MIME_TO_FORMAT = {mime: name for name, (_, mime) in OUTPUT_FORMATS.items()}
+
+# 默认编码参数：PNG压缩级别越低越快（文件略大），预览和有损格式使用质量参数
+DEFAULT_PNG_COMPRESSION = 1
+DEFAULT_QUALITY = 90
+
+def normalize_format(name: Optional[str]) -> Optional[str]:
+    """规范化输出格式名，不支持的格式返回 None"""
+    if not name:
+        return None
+    name = FORMAT_ALIASES.get(name.lower(), name.lower())
+    return name if name in OUTPUT_FORMATS else None
+
+def decode_image(image_data: bytes) -> np.ndarray:
+    """将压缩的图像字节解码为数组（RGB/RGBA/灰度，与PIL的模式一致）"""
+    return np.array(Image.open(io.BytesIO(image_data)))
+
+def _to_encodable_depth(image: np.ndarray, fmt: str) -> np.ndarray:
+    """
+    将数组转换为编码器支持的位深，uint8 直接使用不复制
+
+    - bool：转换为 0/255
+    - uint16：PNG 保留16位，其余格式取高8位
+    - 浮点及其他整数类型：截断到 [0, 255] 后转换为 uint8
+    """
+    if image.dtype == np.uint8:
+        return image
+    if image.dtype == np.bool_:
+        return image.view(np.uint8) * np.uint8(255)
+    if image.dtype == np.uint16:
+        return image if fmt == 'png' else (image >> 8).astype(np.uint8)
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+def _to_bgr_order(image: np.ndarray, fmt: str, color_order: str) -> np.ndarray:
+    """按通道数把图像整理成OpenCV编码需要的 灰度/BGR/BGRA 格式"""
+    if image.ndim == 3 and image.shape[2] == 1:
+        return image[:, :, 0]
+    if image.ndim == 2:
+        return image
+    channels = image.shape[2]
+    if channels == 4:
+        if fmt == 'jpeg':
+            code = cv2.COLOR_RGBA2BGR if color_order == 'rgb' else cv2.COLOR_BGRA2BGR
+            return cv2.cvtColor(image, code)
+        return cv2.cvtColor(image, cv2.COLOR_RGBA2BGRA) if color_order == 'rgb' else image
+    if channels == 3:
+        return cv2.cvtColor(image, cv2.COLOR_RGB2BGR) if color_order == 'rgb' else image
+    raise ValueError(f'不支持的图像通道数: {channels}')
+
+def encode_image(image: np.ndarray, fmt: str = 'png', quality: Optional[int] = None,
+                 compression: Optional[int] = None, color_order: str = 'rgb') -> Tuple[bytes, str]:
+    """
+    将结果图像编码为指定格式
+
+    Args:
+        image: 图像数组（灰度、RGB/RGBA 或 BGR/BGRA，任意数值类型）
+        fmt: 输出格式（png/jpeg/webp）
+        quality: JPEG/WebP 质量（1-100，默认90）
+        compression: PNG 压缩级别（0-9，默认1）
+        color_order: 彩色图像的通道顺序（'rgb' 或 'bgr'）
+
+    Returns:
+        (编码后的字节, MIME类型)
+    """
+    extension, mime_type = OUTPUT_FORMATS[fmt]
+    image = _to_bgr_order(_to_encodable_depth(image, fmt), fmt, color_order)
+
+    if fmt == 'png':
+        params = [cv2.IMWRITE_PNG_COMPRESSION,
+                  DEFAULT_PNG_COMPRESSION if compression is None else compression]
+    elif fmt == 'jpeg':
+        params = [cv2.IMWRITE_JPEG_QUALITY, DEFAULT_QUALITY if quality is None else quality]
+    else:
+        params = [cv2.IMWRITE_WEBP_QUALITY, DEFAULT_QUALITY if quality is None else quality]
+
+    ok, buffer = cv2.imencode(extension, image, params)
+    if not ok:
+        raise RuntimeError(f'图像编码失败: {fmt}')
+    return buffer.tobytes(), mime_type
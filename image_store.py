@@ -0,0 +1,83 @@
+"""
+已上传图像的解码存储
+上传的压缩图像只解码一次，解码结果以 .npy 格式（文件头记录形状和数据类型，其后是原始像素）
+保存在原文件旁边。执行时以只读方式内存映射打开，得到的数组直接引用页缓存：
+多个工作进程读取同一图像时共享同一份物理内存，ROI 截取等只读操作也不复制像素。
+"""
+import logging
+import os
+import threading
+from typing import Callable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DECODED_SUFFIX = '.npy'
+
+def decoded_path(filepath: str) -> str:
+    """原图像对应的解码文件路径"""
+    return filepath + DECODED_SUFFIX
+
+def store_decoded(filepath: str, image: np.ndarray) -> str:
+    """
+    保存解码后的图像（先写临时文件再改名，其他进程不会读到写了一半的文件）
+
+    Returns:
+        解码文件路径
+    """
+    path = decoded_path(filepath)
+    temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        with open(temp_path, 'wb') as f:
+            np.lib.format.write_array(f, np.ascontiguousarray(image), allow_pickle=False)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return path
+
+def open_decoded(filepath: str) -> Optional[np.ndarray]:
+    """
+    以只读内存映射打开解码文件
+
+    Returns:
+        只读数组；解码文件不存在、早于原文件（原文件被覆盖）或已损坏时返回 None
+    """
+    path = decoded_path(filepath)
+    try:
+        if os.stat(path).st_mtime_ns < os.stat(filepath).st_mtime_ns:
+            return None
+        array = np.load(path, mmap_mode='r', allow_pickle=False)
+    except (OSError, ValueError) as e:
+        if not isinstance(e, FileNotFoundError):
+            logger.warning("打开解码文件 %s 失败: %s", path, e)
+        return None
+    # 转为普通 ndarray 视图（仍引用映射内存），避免 np.memmap 子类传播到算法的计算结果中
+    return array.view(np.ndarray)
+
+def load_decoded(filepath: str, decode: Callable[[bytes], np.ndarray]) -> np.ndarray:
+    """
+    读取已上传图像的解码结果：优先映射解码文件，不存在时解码原文件并写入解码文件
+
+    解码文件写入失败（如磁盘空间不足）时返回堆内存中的只读数组。
+
+    Raises:
+        OSError: 原文件读取失败
+        Exception: 解码失败（decode 抛出的异常）
+    """
+    array = open_decoded(filepath)
+    if array is not None:
+        return array
+    with open(filepath, 'rb') as f:
+        image = decode(f.read())
+    try:
+        store_decoded(filepath, image)
+    except OSError as e:
+        logger.warning("保存解码文件失败，使用内存中的解码结果: %s", e)
+    else:
+        array = open_decoded(filepath)
+        if array is not None:
+            return array
+    image.flags.writeable = False
+    return image
@@ -52,10 +52,19 @@ if errorlevel 1 (
     )
 )
 
+pip install waitress -i https://pypi.tuna.tsinghua.edu.cn/simple
+if errorlevel 1 (
+    echo waitress 安装失败！
+    pause
+    exit /b 1
+)
+
 echo.
 echo ========================================
 echo 所有依赖安装完成！
 echo ========================================
 echo.
+echo 双击 run.bat 启动服务
+echo.
 pause
 
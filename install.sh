@@ -41,9 +41,17 @@ pip3 install opencv-python -i https://pypi.tuna.tsinghua.edu.cn/simple || {
     }
 }
 
+pip3 install gunicorn -i https://pypi.tuna.tsinghua.edu.cn/simple || {
+    echo "gunicorn 安装失败！"
+    exit 1
+}
+
 echo ""
 echo "========================================"
 echo "所有依赖安装完成！"
 echo "========================================"
 echo ""
+echo "启动服务: python3 serve.py"
+echo "开发调试: python3 app.py"
+echo ""
 
@@ -0,0 +1,76 @@
+"""
+按请求的性能分析
+用 cProfile 对单次工作流执行做确定性分析，输出累计耗时最高的函数或 pstats 格式的分析文件
+"""
+import cProfile
+import marshal
+import os
+import pstats
+import threading
+from typing import Any, Dict, List
+
+# cProfile 在 Python 3.12+ 中为进程级（sys.monitoring），同一时间只允许一个请求进行分析
+_PROFILE_LOCK = threading.Lock()
+
+SORT_KEYS = ('cumulative', 'tottime', 'ncalls')
+
+class ProfilerBusyError(RuntimeError):
+    """已有请求正在进行性能分析"""
+
+class RequestProfiler:
+    """
+    单次请求的性能分析器
+
+    用法：
+        with RequestProfiler() as profiler:
+            ...
+        profiler.top_functions(30)
+    """
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+        self._locked = False
+
+    def __enter__(self):
+        if not _PROFILE_LOCK.acquire(blocking=False):
+            raise ProfilerBusyError('已有请求正在进行性能分析，请稍后重试')
+        self._locked = True
+        self._profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self._profile.disable()
+        if self._locked:
+            self._locked = False
+            _PROFILE_LOCK.release()
+        return False
+
+    def top_functions(self, limit: int = 30, sort: str = 'cumulative') -> Dict[str, Any]:
+        """
+        按指定字段排序的前 limit 个函数
+
+        Returns:
+            {'sortBy', 'totalCalls', 'totalMs', 'functions': [{function, file, ncalls,
+             primitiveCalls, tottimeMs, cumtimeMs}, ...]}
+        """
+        stats = pstats.Stats(self._profile)
+        stats.sort_stats(sort)
+        functions: List[Dict[str, Any]] = []
+        for func in stats.fcn_list[:limit]:
+            primitive_calls, calls, tottime, cumtime, _ = stats.stats[func]
+            filename, lineno, name = func
+            functions.append({
+                'function': name,
+                'file': f'{os.path.basename(filename)}:{lineno}' if lineno else filename,
+                'ncalls': calls,
+                'primitiveCalls': primitive_calls,
+                'tottimeMs': round(tottime * 1000, 3),
+                'cumtimeMs': round(cumtime * 1000, 3),
+            })
+        return {'sortBy': sort, 'totalCalls': stats.total_calls,
+                'totalMs': round(stats.total_tt * 1000, 3), 'functions': functions}
+
+    def dump(self) -> bytes:
+        """pstats 格式的分析数据（与 cProfile 的 dump_stats 文件相同，可用 snakeviz 等工具查看）"""
+        self._profile.create_stats()
+        return marshal.dumps(self._profile.stats)
@@ -1,6 +1,6 @@
 @echo off
 echo 正在启动工业质检算法组合平台...
 echo.
-python app.py
+python serve.py
 pause
 
@@ -0,0 +1,145 @@
+"""
+生产环境启动入口
+
+Linux/macOS 使用 gunicorn（多进程 + 每进程多线程），算法模块和OCR模型在主进程中预加载后再
+fork 工作进程，各进程共享只读内存页；Windows 或未安装 gunicorn 时使用 waitress（单进程多线程）。
+节点/分块线程数和各项缓存预算未单独配置时按工作进程数均分（见 app.py），整机总量不随进程数增长。
+
+用法：
+    python serve.py [--workers 4] [--threads 4] [--port 5000]
+
+配置也可以通过环境变量提供：HOST、PORT、SERVER_WORKERS、SERVER_THREADS、SERVER_TIMEOUT、
+SERVER_GRACEFUL_TIMEOUT、PRELOAD_OCR（默认开启）、LOG_LEVEL。
+"""
+import argparse
+import gc
+import importlib.util
+import logging
+import os
+import signal
+import sys
+
+logger = logging.getLogger('serve')
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() not in ('', '0', 'false', 'no', 'off')
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='工业质检算法组合平台 - 生产环境启动')
+    parser.add_argument('--host', default=os.environ.get('HOST', '0.0.0.0'), help='监听地址')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 5000)), help='监听端口')
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('SERVER_WORKERS', os.cpu_count() or 1)),
+                        help='工作进程数（仅 gunicorn）')
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('SERVER_THREADS', 4)),
+                        help='每个工作进程的请求线程数')
+    parser.add_argument('--timeout', type=int, default=int(os.environ.get('SERVER_TIMEOUT', 120)),
+                        help='单个请求的超时时间（秒，仅 gunicorn）')
+    parser.add_argument('--graceful-timeout', type=int,
+                        default=int(os.environ.get('SERVER_GRACEFUL_TIMEOUT', 30)),
+                        help='收到退出信号后等待进行中请求完成的时间（秒）')
+    parser.add_argument('--no-preload-ocr', dest='preload_ocr', action='store_false',
+                        default=_env_flag('PRELOAD_OCR', True), help='不在启动时预加载OCR模型')
+    parser.add_argument('--server', choices=('auto', 'gunicorn', 'waitress'), default='auto',
+                        help='WSGI服务器（默认自动选择）')
+    return parser.parse_args()
+
+def preload(preload_ocr: bool):
+    """
+    导入应用并预加载算法模块（及其 warmup 钩子，如OCR模型）
+
+    Returns:
+        Flask 应用对象
+    """
+    import app as app_module
+    for name, module in app_module.ALGORITHM_MODULES.items():
+        if name == 'ocr_recognition' and not preload_ocr:
+            continue
+        warmup = getattr(module, 'warmup', None)
+        if warmup is not None:
+            try:
+                warmup()
+            except Exception as e:
+                logger.warning("预加载算法模块 %s 失败: %s", name, e)
+    logger.info("已加载 %d 个算法模块: %s", len(app_module.ALGORITHM_MODULES),
+                ', '.join(app_module.ALGORITHM_MODULES))
+    return app_module.app
+
+def shutdown_executors():
+    """关闭节点和分块线程池，等待进行中的节点执行完成"""
+    import app as app_module
+    app_module.NODE_POOL.shutdown(wait=True)
+    app_module.TILE_POOL.shutdown(wait=True)
+
+def run_gunicorn(application, args):
+    from gunicorn.app.base import BaseApplication
+
+    class StandaloneApplication(BaseApplication):
+        def __init__(self, wsgi_app, options):
+            self.application = wsgi_app
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return self.application
+
+    options = {
+        'bind': f'{args.host}:{args.port}',
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread',
+        'timeout': args.timeout,
+        'graceful_timeout': args.graceful_timeout,
+        'preload_app': True,
+        'worker_exit': lambda server, worker: shutdown_executors(),
+        'loglevel': os.environ.get('LOG_LEVEL', 'info').lower(),
+    }
+    # 预加载的对象不再参与循环垃圾回收，避免GC遍历时写入对象头导致共享页被复制
+    gc.freeze()
+    StandaloneApplication(application, options).run()
+
+def run_waitress(application, args):
+    from waitress import serve
+
+    if args.workers > 1:
+        logger.warning("waitress 为单进程服务器，忽略 --workers=%d，使用 %d 个线程", args.workers, args.threads)
+    # 收到 SIGTERM 时退出服务循环，并等待节点线程池中进行中的任务完成
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        serve(application, host=args.host, port=args.port, threads=args.threads)
+    finally:
+        shutdown_executors()
+
+def main():
+    logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO'),
+                        format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    args = parse_args()
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    server = args.server
+    if server == 'auto':
+        has_gunicorn = sys.platform != 'win32' and importlib.util.find_spec('gunicorn') is not None
+        server = 'gunicorn' if has_gunicorn else 'waitress'
+    if importlib.util.find_spec(server) is None:
+        logger.error("未安装 %s，请执行: pip install %s", server, server)
+        return 1
+
+    # 应用在导入时按工作进程数确定每个进程的线程数和缓存预算
+    os.environ['SERVER_WORKERS'] = str(args.workers if server == 'gunicorn' else 1)
+    application = preload(args.preload_ocr)
+    logger.info("使用 %s 启动服务: http://%s:%d（进程数 %d，每进程线程数 %d）", server, args.host, args.port,
+                args.workers if server == 'gunicorn' else 1, args.threads)
+    if server == 'gunicorn':
+        run_gunicorn(application, args)
+    else:
+        run_waitress(application, args)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
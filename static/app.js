@@ -1108,6 +1108,40 @@ function handleCanvasClick(e) {
     }
 }
 
+// 读取 Server-Sent Events 响应流，逐个事件回调 onEvent(event, data)
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder('utf-8');
+    let buffer = '';
+    
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) {
+            break;
+        }
+        buffer += decoder.decode(value, { stream: true });
+        
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) >= 0) {
+            const block = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            
+            let event = 'message';
+            let data = '';
+            block.split('\n').forEach(line => {
+                if (line.startsWith('event:')) {
+                    event = line.slice(6).trim();
+                } else if (line.startsWith('data:')) {
+                    data += line.slice(5).trim();
+                }
+            });
+            if (data) {
+                onEvent(event, JSON.parse(data));
+            }
+        }
+    }
+}
+
 // 执行工作流
 async function executeWorkflow() {
     if (!inputImage) {
@@ -1125,53 +1159,92 @@ async function executeWorkflow() {
         runBtn.disabled = true;
         runBtn.textContent = '执行中...';
         
-        const response = await fetch('/api/execute', {
+        // 清除上一次执行的节点状态
+        document.querySelectorAll('.node').forEach(el => {
+            el.classList.remove('running', 'done', 'failed');
+            el.removeAttribute('title');
+        });
+        
+        // 使用流式接口，每个节点完成后立即显示其中间结果
+        const response = await fetch('/api/execute/stream', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
             },
-            body: JSON.stringify({
+            // 已上传到服务器的图片只传文件名，由服务端读取（并缓存解码结果）
+            body: JSON.stringify(uploadedImageInfo && uploadedImageInfo.filename ? {
+                nodes: nodes,
+                edges: edges,
+                filename: uploadedImageInfo.filename
+            } : {
                 nodes: nodes,
                 edges: edges,
                 inputImage: inputImage
             })
         });
         
-        const result = await response.json();
+        if (!response.ok || !response.body) {
+            const result = await response.json();
+            alert('执行失败: ' + (result.error || '未知错误'));
+            return;
+        }
         
-        if (result.success) {
-            const outputImg = document.getElementById('outputImage');
-            const outputText = document.getElementById('outputText');
-            const placeholder = document.querySelector('#outputPreview .placeholder');
-            
-            // 显示图像结果
-            if (result.result) {
-                outputImg.src = result.result;
-                outputImg.style.display = 'block';
-            } else {
-                outputImg.style.display = 'none';
-            }
-            
-            // 显示文本结果（如OCR识别结果）
-            if (result.text) {
-                // 确保正确显示中文字符
-                outputText.textContent = result.text;
-                // 如果textContent显示为?，尝试使用innerText
-                if (outputText.textContent.includes('?') && result.text && !result.text.includes('?')) {
-                    outputText.innerText = result.text;
+        const outputImg = document.getElementById('outputImage');
+        const outputText = document.getElementById('outputText');
+        const placeholder = document.querySelector('#outputPreview .placeholder');
+        
+        await readEventStream(response, (event, data) => {
+            const nodeElement = data.node ? document.getElementById(data.node) : null;
+            if (event === 'node_start' && nodeElement) {
+                nodeElement.classList.add('running');
+            } else if (event === 'node_end') {
+                if (nodeElement) {
+                    nodeElement.classList.remove('running');
+                    nodeElement.classList.add('done');
+                    nodeElement.title = `耗时: ${data.durationMs} ms${data.cached ? '（缓存）' : ''}`;
                 }
-                outputText.style.display = 'block';
-            } else {
-                outputText.style.display = 'none';
-            }
-            
-            // 隐藏占位符
-            if (placeholder) {
-                placeholder.style.display = 'none';
+                // 显示中间结果预览
+                if (data.preview) {
+                    outputImg.src = data.preview;
+                    outputImg.style.display = 'block';
+                    if (placeholder) {
+                        placeholder.style.display = 'none';
+                    }
+                }
+            } else if (event === 'result') {
+                // 显示图像结果
+                if (data.result) {
+                    outputImg.src = data.result;
+                    outputImg.style.display = 'block';
+                } else {
+                    outputImg.style.display = 'none';
+                }
+                
+                // 显示文本结果（如OCR识别结果）
+                if (data.text) {
+                    // 确保正确显示中文字符
+                    outputText.textContent = data.text;
+                    // 如果textContent显示为?，尝试使用innerText
+                    if (outputText.textContent.includes('?') && data.text && !data.text.includes('?')) {
+                        outputText.innerText = data.text;
+                    }
+                    outputText.style.display = 'block';
+                } else {
+                    outputText.style.display = 'none';
+                }
+                
+                // 隐藏占位符
+                if (placeholder) {
+                    placeholder.style.display = 'none';
+                }
+            } else if (event === 'error') {
+                if (nodeElement) {
+                    nodeElement.classList.remove('running');
+                    nodeElement.classList.add('failed');
+                }
+                alert('执行失败: ' + (data.error || '未知错误'));
             }
-        } else {
-            alert('执行失败: ' + (result.error || '未知错误'));
-        }
+        });
     } catch (error) {
         alert('执行失败: ' + error.message);
     } finally {
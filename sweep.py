@@ -0,0 +1,121 @@
+"""
+参数扫描结果整理
+把 execute_sweep 逐个返回的输出节点结果压缩为缩略图条带和每个取值的统计量，
+每个取值的全尺寸结果处理完即丢弃，响应大小与图像尺寸无关。
+"""
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from workflow_engine import extract_image
+
+def parse_sweep_values(spec: Any, max_values: int) -> List[Any]:
+    """
+    解析参数取值：列表（按给定顺序），或 {"start", "stop", "step"} 描述的等差网格（包含 stop）
+
+    Raises:
+        ValueError: 取值定义无效或数量超过 max_values
+    """
+    if isinstance(spec, list):
+        values = list(spec)
+    elif isinstance(spec, dict):
+        try:
+            start = float(spec['start'])
+            stop = float(spec['stop'])
+            step = float(spec.get('step', 1))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError('values 网格需要数值 start、stop（可选 step）')
+        if step <= 0:
+            raise ValueError('values 网格的 step 必须大于0')
+        if stop < start:
+            raise ValueError('values 网格的 stop 不能小于 start')
+        count = int((stop - start) / step + 1e-9) + 1
+        if count > max_values:
+            raise ValueError(f'参数取值数 {count} 超过上限 {max_values}')
+        integral = all(float(value).is_integer() for value in (start, stop, step))
+        values = [int(start + index * step) if integral else round(start + index * step, 10)
+                  for index in range(count)]
+    else:
+        raise ValueError('values 必须是取值列表或 {"start", "stop", "step"} 网格')
+    if not values:
+        raise ValueError('values 不能为空')
+    if len(values) > max_values:
+        raise ValueError(f'参数取值数 {len(values)} 超过上限 {max_values}')
+    return values
+
+def image_statistics(image: np.ndarray) -> Dict[str, Any]:
+    """
+    图像统计量：均值、标准差、最小/最大值和非零像素比例（按全部通道计算）
+
+    uint8 图像只做一次直方图统计，其余类型直接计算。
+    """
+    if image.dtype == np.uint8:
+        flat = image.reshape(image.shape[0], -1)
+        hist = cv2.calcHist([flat], [0], None, [256], [0, 256]).ravel().astype(np.float64)
+        levels = np.arange(256, dtype=np.float64)
+        count = hist.sum()
+        mean = float(hist @ levels / count)
+        std = float(np.sqrt(max(0.0, hist @ (levels * levels) / count - mean * mean)))
+        occupied = np.flatnonzero(hist)
+        return {'mean': round(mean, 4), 'std': round(std, 4), 'min': int(occupied[0]), 'max': int(occupied[-1]),
+                'nonzeroRatio': round(1.0 - float(hist[0]) / count, 6)}
+    values = image.astype(np.float64, copy=False)
+    return {'mean': round(float(values.mean()), 4), 'std': round(float(values.std()), 4),
+            'min': float(values.min()), 'max': float(values.max()),
+            'nonzeroRatio': round(float(np.count_nonzero(values)) / values.size, 6)}
+
+def make_thumbnail(image: np.ndarray, height: int) -> np.ndarray:
+    """缩放到指定高度（保持宽高比，只缩小不放大）的三通道 uint8 缩略图，单通道结果扩展为RGB"""
+    if image.dtype != np.uint8:
+        image = cv2.convertScaleAbs(image)
+    scale = min(1.0, height / image.shape[0])
+    if scale < 1.0:
+        size = (max(1, int(round(image.shape[1] * scale))), height)
+        image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+    if image.ndim == 2:
+        return cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
+    if image.shape[2] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_RGBA2RGB)
+    return image
+
+class SweepSummary:
+    """逐个收集参数扫描结果：缩略图（拼成横向条带）和统计量"""
+
+    def __init__(self, thumbnail_height: int):
+        self.thumbnail_height = thumbnail_height
+        self.thumbnails: List[np.ndarray] = []
+        self.results: List[Dict[str, Any]] = []
+
+    def add(self, value: Any, output: Any, compact: bool, duration_ms: float) -> Dict[str, Any]:
+        """
+        记录一个取值的结果（统计量按输出图像计算，代表RGB结果的单通道图像与扩展后的统计相同）
+
+        Raises:
+            ValueError: 输出节点没有返回图像
+        """
+        image = extract_image(output)
+        if not isinstance(image, np.ndarray):
+            raise ValueError('输出节点未返回图像结果')
+        x = sum(thumbnail.shape[1] for thumbnail in self.thumbnails)
+        thumbnail = make_thumbnail(image, self.thumbnail_height)
+        self.thumbnails.append(thumbnail)
+        shape = list(image.shape) if not compact else list(image.shape) + [3]
+        entry = {'value': value, 'x': x, 'width': thumbnail.shape[1], 'shape': shape,
+                 'stats': image_statistics(image), 'durationMs': duration_ms}
+        text = output.get('text') if isinstance(output, dict) else None
+        if text:
+            entry['text'] = text
+        self.results.append(entry)
+        return entry
+
+    def strip(self) -> Optional[np.ndarray]:
+        """按取值顺序横向拼接的缩略图条带（高度不足的缩略图在底部补黑）"""
+        if not self.thumbnails:
+            return None
+        height = max(thumbnail.shape[0] for thumbnail in self.thumbnails)
+        return np.hstack([
+            thumbnail if thumbnail.shape[0] == height else
+            cv2.copyMakeBorder(thumbnail, 0, height - thumbnail.shape[0], 0, 0, cv2.BORDER_CONSTANT, value=0)
+            for thumbnail in self.thumbnails
+        ])
@@ -0,0 +1,7 @@
+"""
+测试公共配置：把项目根目录加入模块搜索路径（与 app.py 一样按顶层模块导入 workflow_engine、algorithms 等）
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,143 @@
+"""
+缓冲池：复用与拒绝规则，以及执行引擎按所有权归还节点输出（仍被使用的数组不会交给其他节点）
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+
+from buffer_pool import BufferPool
+from caching import NodeOutputCache
+from workflow_engine import compile_workflow, execute_plan
+
+SHAPE = (16, 24, 3)
+
+def fill(value):
+    """从缓冲池取得数组并填充为 value（输出为字典）"""
+    def execute(inputs, parameters):
+        result = inputs['buffers'].acquire(SHAPE, np.uint8)
+        result[...] = value
+        return {'image': result, 'output': result}
+    return SimpleNamespace(execute=execute)
+
+def increment():
+    """输入加一，结果写入从缓冲池取得的数组（输出直接为数组）"""
+    def execute(inputs, parameters):
+        result = inputs['buffers'].acquire(SHAPE, np.uint8)
+        np.add(inputs['image'], 1, out=result)
+        return result
+    return SimpleNamespace(execute=execute)
+
+def passthrough():
+    return SimpleNamespace(execute=lambda inputs, parameters: {'image': inputs['image']})
+
+def border_view():
+    return SimpleNamespace(execute=lambda inputs, parameters: {'image': inputs['image'][1:-1, 1:-1]})
+
+def chain(*modules):
+    names = [f'n{index}' for index in range(len(modules))]
+    nodes = [{'id': name, 'type': name} for name in names]
+    edges = [{'source': a, 'target': b} for a, b in zip(names, names[1:])]
+    return compile_workflow(nodes, edges, dict(zip(names, modules)))
+
+IMAGE = np.zeros(SHAPE, dtype=np.uint8)
+
+def test_release_then_acquire_reuses_array():
+    pool = BufferPool()
+    array = pool.acquire(SHAPE)
+    assert pool.owns(array)
+    assert pool.release(array)
+    assert pool.acquire(SHAPE) is array
+    assert pool.stats()['hits'] == 1
+
+def test_release_rejects_foreign_arrays_and_views():
+    pool = BufferPool()
+    array = pool.acquire(SHAPE)
+    assert not pool.owns(np.empty(SHAPE, dtype=np.uint8))
+    assert not pool.release(np.empty(SHAPE, dtype=np.uint8))
+    assert not pool.owns(array[1:])
+    assert not pool.release(array[1:])
+    assert pool.stats()['rejected'] == 2
+
+def test_double_release_hands_array_out_once():
+    pool = BufferPool()
+    array = pool.acquire(SHAPE)
+    assert pool.release(array)
+    assert not pool.release(array)
+    first, second = pool.acquire(SHAPE), pool.acquire(SHAPE)
+    assert first is array and second is not array
+
+def test_budget_evicts_oldest():
+    pool = BufferPool(max_bytes=2 * int(np.prod(SHAPE)))
+    arrays = [pool.acquire(SHAPE) for _ in range(3)]
+    for array in arrays:
+        pool.release(array)
+    stats = pool.stats()
+    assert stats['entries'] == 2 and stats['evictions'] == 1
+
+def test_plain_array_outputs_are_recycled():
+    pool = BufferPool()
+    plan = chain(fill(1), increment(), increment(), increment())
+    result = execute_plan(plan, IMAGE, buffers=pool)[plan.sink]
+    assert np.all(result == 4)
+    # 每个中间输出在下游执行完后归还，n2、n3 复用 n0、n1 的数组，最后只剩 n2 的数组空闲
+    stats = pool.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (2, 2, 1)
+
+def test_passthrough_output_keeps_array_alive():
+    pool = BufferPool()
+    plan = chain(fill(5), passthrough(), fill(9))
+    outputs = execute_plan(plan, IMAGE, outputs=['n1', 'n2'], buffers=pool)
+    assert np.all(outputs['n1']['image'] == 5)
+    assert np.all(outputs['n2']['image'] == 9)
+
+def test_view_output_keeps_base_alive():
+    pool = BufferPool()
+    plan = chain(fill(5), border_view(), fill(9), fill(11))
+    outputs = execute_plan(plan, IMAGE, outputs=['n1', 'n3'], buffers=pool)
+    assert np.all(outputs['n1']['image'] == 5)
+    assert np.all(outputs['n3']['image'] == 11)
+
+def test_passthrough_array_recycled_after_last_holder():
+    pool = BufferPool()
+    plan = chain(fill(5), passthrough(), increment(), fill(9))
+    result = execute_plan(plan, IMAGE, buffers=pool)[plan.sink]
+    assert np.all(result['image'] == 9)
+    assert pool.stats()['entries'] >= 1
+
+def test_cached_outputs_are_not_recycled():
+    pool = BufferPool()
+    cache = NodeOutputCache(max_bytes=64 * 1024 * 1024)
+    plan = chain(fill(5), increment(), increment())
+    execute_plan(plan, IMAGE, cache=cache, buffers=pool)
+    assert pool.stats()['entries'] == 0
+    other = chain(fill(7), increment(), increment())
+    execute_plan(other, IMAGE, cache=cache, buffers=pool)
+    result = execute_plan(plan, IMAGE, cache=cache, buffers=pool)[plan.sink]
+    assert np.all(result == 7)
+
+def test_source_not_recycled_while_slow_consumer_runs():
+    # n0 → n1（慢）、n0 → n2（快）→ n3：n2 最后收集 n0 的输入但先完成，n3 取得数组并写入后 n1 才读取输入
+    overwritten = threading.Event()
+
+    def slow_increment(inputs, parameters):
+        assert overwritten.wait(5)
+        return increment().execute(inputs, parameters)
+
+    def fill_and_signal(inputs, parameters):
+        output = fill(100).execute(inputs, parameters)
+        overwritten.set()
+        return output
+
+    modules = {'n0': fill(5), 'n1': SimpleNamespace(execute=slow_increment), 'n2': increment(),
+               'n3': SimpleNamespace(execute=fill_and_signal)}
+    nodes = [{'id': name, 'type': name} for name in modules]
+    edges = [{'source': 'n0', 'target': 'n1'}, {'source': 'n0', 'target': 'n2'}, {'source': 'n2', 'target': 'n3'}]
+    plan = compile_workflow(nodes, edges, modules)
+    assert plan.order.index('n1') < plan.order.index('n2')
+    pool = BufferPool()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        outputs = execute_plan(plan, IMAGE, pool=executor, max_parallel=2, outputs=['n1', 'n3'], buffers=pool)
+    assert np.all(outputs['n1'] == 6)
+    assert np.all(outputs['n3']['image'] == 100)
@@ -0,0 +1,92 @@
+"""
+裁剪下推：ROI提取上游的局部运算链只处理裁剪区域及重叠边，结果与整图处理后再裁剪逐位一致
+"""
+import numpy as np
+import pytest
+
+from algorithms import edge_detection, image_filter, image_segmentation, roi_extraction
+from benchmarks.common import synthetic_image
+from workflow_engine import bind_crop_pushdowns, compile_workflow, execute_plan, extract_image
+
+MODULES = {'image_filter': image_filter, 'edge_detection': edge_detection,
+           'image_segmentation': image_segmentation, 'roi_extraction': roi_extraction}
+
+ROIS = [
+    dict(x=100, y=80, width=50, height=40),   # 内部
+    dict(x=0, y=0, width=30, height=20),      # 左上角
+    dict(x=380, y=280, width=100, height=100),  # 超出右下边界
+    dict(x=5, y=5, width=1000, height=1000),  # 几乎整图
+    dict(x=150, y=120, width=0, height=30),   # 空区域
+    dict(x=500, y=400, width=20, height=20),  # 完全在图像外
+]
+
+@pytest.fixture(scope='module', params=[3, 1], ids=['rgb', 'gray'])
+def image(request):
+    return synthetic_image(0.12, channels=request.param, seed=7)[:300, :400]
+
+def chain_workflow(roi, edge_method='sobel'):
+    nodes = [{'id': 'f', 'type': 'image_filter', 'data': {'parameters': {'filter_type': 'gaussian', 'kernel_size': 7}}},
+             {'id': 'e', 'type': 'edge_detection', 'data': {'parameters': {'method': edge_method}}},
+             {'id': 'r', 'type': 'roi_extraction', 'data': {'parameters': roi}}]
+    edges = [{'source': 'f', 'target': 'e'}, {'source': 'e', 'target': 'r'}]
+    return nodes, edges
+
+def node_shapes(plan, image, **kwargs):
+    shapes = {}
+
+    def on_event(event, node_id, payload):
+        if event == 'node_end':
+            shapes[node_id] = extract_image(payload['output']).shape
+
+    result = execute_plan(plan, image, on_event=on_event, **kwargs)
+    return result, shapes
+
+def test_pushdown_found_for_local_chain():
+    plan = compile_workflow(*chain_workflow(ROIS[0]), MODULES)
+    assert len(plan.pushdowns) == 1
+    pushdown = plan.pushdowns[0]
+    assert (pushdown.crop, pushdown.chain) == ('r', ('f', 'e'))
+    assert pushdown.halo >= 3
+
+def test_no_pushdown_through_global_operator():
+    plan = compile_workflow(*chain_workflow(ROIS[0], edge_method='canny'), MODULES)
+    assert plan.pushdowns == ()
+
+def test_no_pushdown_when_chain_node_branches():
+    nodes, edges = chain_workflow(ROIS[0])
+    nodes.append({'id': 'side', 'type': 'image_segmentation', 'data': {'parameters': {'threshold_value': 50}}})
+    edges.append({'source': 'f', 'target': 'side'})
+    assert compile_workflow(nodes, edges, MODULES).pushdowns == ()
+
+def test_bind_restricts_first_node_to_window():
+    plan = compile_workflow(*chain_workflow(ROIS[0]), MODULES)
+    halo = plan.pushdowns[0].halo
+    bound = bind_crop_pushdowns(plan, (300, 400, 3), set())
+    assert bound.nodes['f'].input_window == (80 - halo, 120 + halo, 100 - halo, 150 + halo)
+    assert bound.nodes['e'].input_window is None
+    assert bound.nodes['f'].signature != plan.nodes['f'].signature
+    assert bound.nodes['r'].signature == plan.nodes['r'].signature
+    assert bind_crop_pushdowns(plan, (300, 400, 3), {'e'}).nodes['f'].input_window is None
+
+@pytest.mark.parametrize('roi', ROIS)
+def test_pushdown_matches_full_image(image, roi):
+    plan = compile_workflow(*chain_workflow(roi), MODULES)
+    expected = extract_image(execute_plan(plan, image, pushdown=False)[plan.sink])
+    result = extract_image(execute_plan(plan, image)[plan.sink])
+    assert result.shape == expected.shape
+    assert np.array_equal(result, expected)
+
+def test_chain_processes_only_window(image):
+    plan = compile_workflow(*chain_workflow(ROIS[0]), MODULES)
+    halo = plan.pushdowns[0].halo
+    _, shapes = node_shapes(plan, image)
+    assert shapes['f'][:2] == (40 + 2 * halo, 50 + 2 * halo)
+    assert shapes['r'][:2] == (40, 50)
+
+def test_kept_outputs_disable_pushdown(image):
+    plan = compile_workflow(*chain_workflow(ROIS[0]), MODULES)
+    result, shapes = node_shapes(plan, image, outputs=['e', 'r'])
+    assert shapes['f'][:2] == image.shape[:2]
+    assert extract_image(result['e']).shape[:2] == image.shape[:2]
+    expected = execute_plan(plan, image, pushdown=False)
+    assert np.array_equal(extract_image(result['r']), extract_image(expected['r']))
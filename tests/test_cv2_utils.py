@@ -0,0 +1,23 @@
+"""
+批量文本绘制：标签不重叠时 draw_text_batch 与逐段调用 put_text_safe 结果相同
+（三通道BGR图像；灰度图由 draw_annotations 先转为三通道）
+"""
+import numpy as np
+
+from algorithms.cv2_utils import draw_text_batch, put_text_safe
+
+ITEMS = [('批号 A01', (10, 30)), ('LOT-01', (10, 80)), ('合格', (10, 130)), ('PASS', (10, 180))]
+
+def test_batch_matches_per_item_without_overlap():
+    image = np.random.default_rng(0).integers(0, 256, (200, 240, 3), dtype=np.uint8)
+    expected = image.copy()
+    for text, position in ITEMS:
+        expected = put_text_safe(expected, text, position, font_size=18, color=(0, 255, 0))
+    result = draw_text_batch(image.copy(), ITEMS, font_size=18, color=(0, 255, 0))
+    assert np.array_equal(result, expected)
+
+def test_batch_english_only_draws_in_place():
+    image = np.zeros((60, 200, 3), dtype=np.uint8)
+    result = draw_text_batch(image, [('LOT-01', (5, 40))])
+    assert result is image
+    assert image.any()
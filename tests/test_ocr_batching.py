@@ -0,0 +1,97 @@
+"""
+OCR微批调度：并发到达的识别请求合并为一次下层 recognize_batch 调用，结果和异常分发回各调用方
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from algorithms import ocr_providers
+from algorithms.ocr_providers import OCRBatcher, OCRProvider, OCRProviderFactory, OCRResult
+
+class RecordingProvider(OCRProvider):
+    """记录每次调用的批大小；第一次调用阻塞到 release 被设置，结果文本为图像的像素值"""
+
+    def __init__(self, fail: bool = False):
+        self.calls = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.fail = fail
+
+    def is_available(self) -> bool:
+        return True
+
+    def get_name(self) -> str:
+        return 'recording'
+
+    def recognize(self, image, **kwargs):
+        return self.recognize_batch([image])[0]
+
+    def recognize_batch(self, images, **kwargs):
+        self.calls.append(len(images))
+        self.started.set()
+        self.release.wait(5)
+        if self.fail:
+            raise RuntimeError('推理失败')
+        return [OCRResult([str(int(image[0, 0]))], [1.0], [None]) for image in images]
+
+def image(value):
+    return np.full((4, 4), value, dtype=np.uint8)
+
+def test_concurrent_callers_merged_into_one_call():
+    provider = RecordingProvider()
+    batcher = OCRBatcher(provider, max_batch_size=8, max_wait_ms=0, concurrency=1)
+    submitted = threading.Semaphore(0)
+    submit = batcher.submit
+
+    def counting_submit(value):
+        future = submit(value)
+        submitted.release()
+        return future
+
+    batcher.submit = counting_submit
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        first = pool.submit(batcher.recognize, image(0))
+        assert provider.started.wait(5)
+        # 唯一的执行槽位被占用期间到达的请求留在队列中，下一批一起执行
+        rest = [pool.submit(batcher.recognize, image(value)) for value in range(1, 6)]
+        for _ in range(6):
+            assert submitted.acquire(timeout=5)
+        provider.release.set()
+        assert first.result(5).texts == ['0']
+        assert [future.result(5).texts for future in rest] == [[str(value)] for value in range(1, 6)]
+    assert provider.calls == [1, 5]
+    assert batcher.stats()['maxBatchSize'] == 5
+
+def test_batch_size_limit_splits_queue():
+    provider = RecordingProvider()
+    batcher = OCRBatcher(provider, max_batch_size=2, max_wait_ms=0, concurrency=1)
+    first = batcher.submit(image(0))
+    assert provider.started.wait(5)
+    rest = [batcher.submit(image(value)) for value in range(1, 6)]
+    provider.release.set()
+    assert [future.result(5).texts[0] for future in [first] + rest] == [str(value) for value in range(6)]
+    assert provider.calls == [1, 2, 2, 1]
+
+def test_errors_reach_every_caller_in_batch():
+    provider = RecordingProvider(fail=True)
+    batcher = OCRBatcher(provider, max_batch_size=8, max_wait_ms=0, concurrency=1)
+    first = batcher.submit(image(0))
+    assert provider.started.wait(5)
+    rest = [batcher.submit(image(value)) for value in range(1, 4)]
+    provider.release.set()
+    for future in [first] + rest:
+        with pytest.raises(RuntimeError):
+            future.result(5)
+
+@pytest.mark.parametrize('version, expected', [('2.7.3', 1), ('3.1.0', 8), (None, 1)])
+def test_default_batching_follows_batched_inference(monkeypatch, version, expected):
+    monkeypatch.setattr(OCRProviderFactory, 'batch_size', None)
+    monkeypatch.setattr(ocr_providers, 'paddleocr_version', lambda: version)
+    assert OCRProviderFactory.paddle_batch_size() == expected
+
+def test_configured_batch_size_wins(monkeypatch):
+    monkeypatch.setattr(OCRProviderFactory, 'batch_size', 4)
+    monkeypatch.setattr(ocr_providers, 'paddleocr_version', lambda: '2.7.3')
+    assert OCRProviderFactory.paddle_batch_size() == 4
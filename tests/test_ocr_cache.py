@@ -0,0 +1,95 @@
+"""
+OCR结果缓存：缓存键随提供者配置和图像内容变化，SQLite中结果的读写、过期和按容量淘汰
+"""
+import json
+
+import numpy as np
+import pytest
+
+from algorithms import ocr_cache
+from algorithms.ocr_cache import OCRResultCache
+from algorithms.ocr_providers import OCRResult
+
+SIGNATURE = {'provider': 'paddleocr', 'lang': 'ch', 'options': {'use_angle_cls': True}}
+
+def result(text):
+    return OCRResult([text], [0.98], [[(0, 0), (10, 0), (10, 5), (0, 5)]])
+
+@pytest.fixture
+def cache(tmp_path):
+    return OCRResultCache(str(tmp_path / 'cache' / 'ocr.sqlite3'), ttl=60, max_bytes=1 << 20)
+
+def test_key_depends_on_signature_and_image():
+    image = np.arange(48, dtype=np.uint8).reshape(4, 4, 3)
+    key = OCRResultCache.make_key(image, SIGNATURE)
+    assert key == OCRResultCache.make_key(image.copy(), dict(reversed(list(SIGNATURE.items()))))
+    assert key != OCRResultCache.make_key(image, dict(SIGNATURE, lang='en'))
+    assert key != OCRResultCache.make_key(image, dict(SIGNATURE, options={'use_angle_cls': False}))
+    changed = image.copy()
+    changed[0, 0, 0] += 1
+    assert key != OCRResultCache.make_key(changed, SIGNATURE)
+    assert key != OCRResultCache.make_key(image.reshape(4, 12), SIGNATURE)
+    assert key != OCRResultCache.make_key(image.astype(np.uint16), SIGNATURE)
+
+def test_key_of_view_matches_contiguous_copy():
+    image = np.random.default_rng(0).integers(0, 256, (20, 30, 3), dtype=np.uint8)
+    view = image[2:12, 5:25]
+    assert not view.flags['C_CONTIGUOUS']
+    assert OCRResultCache.make_key(view, SIGNATURE) == OCRResultCache.make_key(view.copy(), SIGNATURE)
+
+def test_roundtrip_and_persistence(cache):
+    key = OCRResultCache.make_key(np.zeros((4, 4, 3), dtype=np.uint8), SIGNATURE)
+    assert cache.get(key) is None
+    cache.put(key, result('标签'))
+    cached = cache.get(key)
+    assert cached.texts == ['标签'] and cached.scores == [0.98]
+    assert [tuple(point) for point in cached.boxes[0]] == [(0, 0), (10, 0), (10, 5), (0, 5)]
+    # 重新打开同一数据库文件（如服务重启）后仍能读取
+    reopened = OCRResultCache(cache.path, ttl=60)
+    assert reopened.get(key).texts == ['标签']
+    stats = cache.stats()
+    assert (stats['entries'], stats['hits'], stats['misses']) == (1, 1, 1)
+
+def test_expired_results_ignored(cache, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ocr_cache.time, 'time', lambda: now[0])
+    cache.put('key', result('a'))
+    now[0] += 59
+    assert cache.get('key') is not None
+    now[0] += 2
+    assert cache.get('key') is None
+
+def test_eviction_keeps_recently_used(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ocr_cache.time, 'time', lambda: now[0])
+    size = len(json.dumps(result('x' * 100).to_dict(), ensure_ascii=False).encode('utf-8'))
+    cache = OCRResultCache(str(tmp_path / 'ocr.sqlite3'), ttl=0, max_bytes=size * 4)
+    for index in range(4):
+        cache.put(f'key{index}', result(str(index) * 100))
+        now[0] += ocr_cache.TOUCH_INTERVAL + 1
+    assert cache.get('key0') is not None  # 刷新最近访问时间
+    cache.put('key4', result('4' * 100))
+    assert cache.stats()['bytes'] <= cache.max_bytes
+    assert cache.stats()['evictions'] >= 1
+    assert cache.get('key0') is not None
+    assert cache.get('key1') is None
+    assert cache.get('key4') is not None
+
+def test_paddleocr_signature_reads_version_once(monkeypatch):
+    from algorithms import ocr_providers
+    calls = []
+
+    def version(name):
+        calls.append(name)
+        return '2.7.3'
+
+    monkeypatch.setattr(ocr_providers.importlib.metadata, 'version', version)
+    ocr_providers.paddleocr_version.cache_clear()
+    try:
+        provider = ocr_providers.PaddleOCRProvider()
+        ocr_providers.PaddleOCRProvider(lang='en')
+        signatures = [provider.cache_signature() for _ in range(3)]
+    finally:
+        ocr_providers.paddleocr_version.cache_clear()
+    assert calls == ['paddleocr']
+    assert signatures[0]['model'] == 'paddleocr-2.7.3'
@@ -0,0 +1,151 @@
+"""
+DeepSeekOCR 远程调用容错：熔断器状态机，以及半开试探调用以各种方式失败后熔断器都能恢复
+（不发出真实网络请求，_post 由测试替换）
+"""
+import numpy as np
+import pytest
+import requests
+
+from algorithms.ocr_providers import (CircuitBreaker, CircuitOpenError, DeepSeekOCRProvider, OCRPoolTimeoutError,
+                                      RemoteCallError)
+
+RESPONSE = {'choices': [{'message': {'content': '{"texts": ["A"], "scores": [0.9], '
+                                                '"boxes": [[[0, 0], [1, 0], [1, 1], [0, 1]]]}'}}]}
+
+def make_provider(post, reset_timeout=0.0):
+    provider = DeepSeekOCRProvider(api_key='test', max_concurrency=1, timeout=0.05, max_retries=0,
+                                   breaker_threshold=1, breaker_reset=reset_timeout)
+    provider._post = post
+    return provider
+
+def trip(provider):
+    """一次可重试的远程失败，阈值为1时熔断器打开"""
+    def failing(payload):
+        raise RemoteCallError('HTTP 503', retryable=True, status=503)
+    post, provider._post = provider._post, failing
+    with pytest.raises(RemoteCallError):
+        provider._call(dict)
+    provider._post = post
+    assert provider.breaker.state == CircuitBreaker.OPEN
+
+def test_breaker_opens_after_threshold_and_rejects():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    assert breaker.allow() is False
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    assert breaker.rejected == 1
+
+def test_breaker_half_open_admits_single_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow() is True
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() is False
+
+def test_breaker_failed_trial_reopens():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0)
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.allow() is True
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+def test_breaker_released_trial_admits_next():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow() is True
+    breaker.release_trial()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow() is True
+
+def test_remote_failure_in_trial_reopens_then_recovers():
+    provider = make_provider(lambda payload: RESPONSE)
+    trip(provider)
+    trip(provider)
+    assert provider._call(dict) == RESPONSE
+    assert provider.breaker.state == CircuitBreaker.CLOSED
+
+def test_payload_error_in_trial_releases_breaker():
+    provider = make_provider(lambda payload: RESPONSE)
+    trip(provider)
+    # 5 通道图像无法编码为 PNG
+    with pytest.raises(Exception):
+        provider.recognize(np.zeros((4, 4, 5), dtype=np.uint8))
+    assert provider.breaker.state == CircuitBreaker.HALF_OPEN
+    assert provider._call(dict) == RESPONSE
+    assert provider.breaker.state == CircuitBreaker.CLOSED
+
+def test_slot_timeout_in_trial_releases_breaker():
+    provider = make_provider(lambda payload: RESPONSE)
+    trip(provider)
+    provider._slots.acquire()
+    try:
+        with pytest.raises(OCRPoolTimeoutError):
+            provider._call(dict)
+    finally:
+        provider._slots.release()
+    assert provider._call(dict) == RESPONSE
+    assert provider.breaker.state == CircuitBreaker.CLOSED
+
+def test_unexpected_error_in_trial_reopens():
+    def broken(payload):
+        raise KeyError('unexpected')
+    provider = make_provider(broken)
+    trip(provider)
+    with pytest.raises(KeyError):
+        provider._call(dict)
+    assert provider.breaker.state == CircuitBreaker.OPEN
+    provider._post = lambda payload: RESPONSE
+    assert provider._call(dict) == RESPONSE
+
+@pytest.mark.parametrize('error, retryable', [
+    (requests.TooManyRedirects('loop'), False),
+    (requests.exceptions.InvalidURL('bad'), False),
+    (requests.exceptions.ChunkedEncodingError('cut'), True),
+    (requests.ConnectTimeout('slow'), True),
+])
+def test_post_wraps_request_exceptions(error, retryable):
+    class Session:
+        def post(self, *args, **kwargs):
+            raise error
+    provider = DeepSeekOCRProvider(api_key='test')
+    provider._session = Session()
+    with pytest.raises(RemoteCallError) as info:
+        provider._post({})
+    assert info.value.retryable is retryable
+    assert info.value.status is None
+
+def test_request_exception_in_trial_does_not_lock_breaker():
+    provider = DeepSeekOCRProvider(api_key='test', max_retries=0, breaker_threshold=1, breaker_reset=0)
+
+    class Session:
+        error = requests.TooManyRedirects('loop')
+
+        def post(self, *args, **kwargs):
+            if self.error:
+                raise self.error
+
+            class Response:
+                status_code = 200
+                headers = {}
+
+                @staticmethod
+                def json():
+                    return RESPONSE
+            return Response()
+    provider._session = Session()
+    trip(provider)
+    with pytest.raises(RemoteCallError):
+        provider._call(dict)
+    assert provider.breaker.state == CircuitBreaker.HALF_OPEN
+    provider._session.error = None
+    assert provider._call(dict) == RESPONSE
+    assert provider.breaker.state == CircuitBreaker.CLOSED
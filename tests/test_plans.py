@@ -0,0 +1,133 @@
+"""
+工作流编译与执行计划注册：工作流ID的稳定性、PlanRegistry，以及从保存的定义重新编译后仍使用客户端的ID
+"""
+import base64
+import io
+import json
+
+import pytest
+from PIL import Image
+
+import app as server
+from workflow_engine import PlanRegistry, WorkflowError, compile_workflow, with_parameter, workflow_id
+from algorithms import edge_detection, image_filter
+
+MODULES = {'image_filter': image_filter, 'edge_detection': edge_detection}
+
+def definition(first=1, second=2):
+    nodes = [
+        {'id': first, 'type': 'image_filter', 'position': {'x': 10, 'y': 20},
+         'data': {'label': '滤波', 'parameters': {'filter_type': 'gaussian', 'kernel_size': 5}}},
+        {'id': second, 'type': 'edge_detection', 'data': {'parameters': {'method': 'sobel'}}},
+    ]
+    return nodes, [{'id': 'e1', 'source': first, 'target': second}]
+
+def test_id_ignores_layout_and_depends_on_parameters():
+    nodes, edges = definition()
+    moved = json.loads(json.dumps(nodes))
+    moved[0]['position'] = {'x': 99, 'y': 99}
+    moved[0]['data']['label'] = '其他'
+    assert workflow_id(nodes, edges) == workflow_id(moved, edges)
+    moved[0]['data']['parameters']['kernel_size'] = 7
+    assert workflow_id(nodes, edges) != workflow_id(moved, edges)
+
+def test_id_stable_across_normalization():
+    nodes, edges = definition(1, 2)
+    plan = compile_workflow(nodes, edges, MODULES)
+    assert plan.order == ('1', '2')
+    assert compile_workflow(plan.workflow['nodes'], plan.workflow['edges'], MODULES).plan_id == plan.plan_id
+    assert compile_workflow(*definition('1', '2'), MODULES).plan_id == plan.plan_id
+
+def test_with_parameter_changes_signatures_downstream():
+    plan = compile_workflow(*definition('f', 'e'), MODULES)
+    changed = with_parameter(plan, 'f', 'kernel_size', 9)
+    assert changed.nodes['f'].parameters['kernel_size'] == 9
+    assert plan.nodes['f'].parameters['kernel_size'] == 5
+    assert changed.nodes['f'].signature != plan.nodes['f'].signature
+    assert changed.nodes['e'].signature != plan.nodes['e'].signature
+    assert changed.plan_id != plan.plan_id
+
+@pytest.mark.parametrize('nodes, edges', [
+    ([], []),
+    ([{'id': 'a', 'type': 'missing'}], []),
+    ([{'id': 'a', 'type': 'image_filter'}, {'id': 'a', 'type': 'image_filter'}], []),
+    ([{'id': 'a', 'type': 'image_filter'}], [{'source': 'a', 'target': 'b'}]),
+    ([{'id': 'a', 'type': 'image_filter'}, {'id': 'b', 'type': 'image_filter'}],
+     [{'source': 'a', 'target': 'b'}, {'source': 'b', 'target': 'a'}]),
+])
+def test_invalid_workflows_rejected(nodes, edges):
+    with pytest.raises(WorkflowError):
+        compile_workflow(nodes, edges, MODULES)
+
+@pytest.mark.parametrize('nodes, edges', [
+    (['a'], []),
+    ([{'id': 'a', 'type': 'image_filter'}], ['a->b']),
+    ([{'type': 'image_filter'}], []),
+    ([{'id': '', 'type': 'image_filter'}], []),
+    ([{'id': 'a', 'type': 'image_filter', 'data': 'x'}], []),
+    ([{'id': 'a', 'type': 'image_filter', 'data': {'parameters': [1]}}], []),
+    ({'id': 'a'}, []),
+])
+def test_malformed_definitions_rejected_before_hashing(nodes, edges):
+    with pytest.raises(WorkflowError):
+        workflow_id(nodes, edges)
+    with pytest.raises(WorkflowError):
+        PlanRegistry().get_or_compile(nodes, edges, MODULES)
+
+def test_zero_is_a_valid_node_id():
+    plan = compile_workflow(*definition(0, 1), MODULES)
+    assert plan.order == ('0', '1')
+
+def test_registry_reuses_and_evicts_least_recent():
+    registry = PlanRegistry(max_plans=2)
+    first = registry.get_or_compile(*definition('a', 'b'), MODULES)
+    assert registry.get_or_compile(*definition('a', 'b'), MODULES) is first
+    second = registry.get_or_compile(*definition('c', 'd'), MODULES)
+    registry.get(first.plan_id)
+    registry.get_or_compile(*definition('x', 'y'), MODULES)
+    assert len(registry) == 2
+    assert registry.get(first.plan_id) is first
+    assert registry.get(second.plan_id) is None
+    assert registry.remove(first.plan_id)
+    assert not registry.remove(first.plan_id)
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setitem(server.app.config, 'WORKFLOW_FOLDER', str(tmp_path))
+    monkeypatch.setattr(server, 'PLAN_REGISTRY', PlanRegistry())
+    return server.app.test_client()
+
+def test_malformed_execute_request_returns_400(client):
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8)).save(buffer, format='PNG')
+    image = 'data:image/png;base64,' + base64.b64encode(buffer.getvalue()).decode()
+    response = client.post('/api/execute', json={'nodes': ['a'], 'edges': [], 'inputImage': image})
+    assert response.status_code == 400
+    assert 'id' in response.get_json()['error']
+    assert client.post('/api/workflows', json={'nodes': [{'id': 'a'}], 'edges': [1]}).status_code == 400
+
+def test_registered_workflow_recompiled_under_client_id(client):
+    nodes, edges = definition(1, 2)
+    plan_id = client.post('/api/workflows', json={'nodes': nodes, 'edges': edges}).get_json()['workflowId']
+    # 模拟其他工作进程：注册表中没有该计划，从保存的定义重新编译
+    server.PLAN_REGISTRY.remove(plan_id)
+    response = client.get(f'/api/workflows/{plan_id}')
+    assert response.status_code == 200
+    assert response.get_json()['workflowId'] == plan_id
+    assert server.PLAN_REGISTRY.get(plan_id) is not None
+    assert len(server.PLAN_REGISTRY) == 1
+
+def test_stale_saved_id_registered_under_requested_id(client, tmp_path):
+    plan = compile_workflow(*definition('a', 'b'), server.ALGORITHM_MODULES)
+    stale_id = 'f' * 16
+    (tmp_path / f'{stale_id}.json').write_text(json.dumps(plan.workflow), encoding='utf-8')
+    assert server.lookup_plan(stale_id).plan_id == stale_id
+    assert server.PLAN_REGISTRY.get(stale_id) is not None
+
+def test_saved_file_with_other_id_ignored(client, tmp_path):
+    plan = compile_workflow(*definition('a', 'b'), server.ALGORITHM_MODULES)
+    other_id = 'e' * 16
+    (tmp_path / f'{other_id}.json').write_text(json.dumps(dict(plan.workflow, workflowId=plan.plan_id)),
+                                               encoding='utf-8')
+    assert server.lookup_plan(other_id) is None
+    assert client.get(f'/api/workflows/{other_id}').status_code == 404
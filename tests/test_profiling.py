@@ -0,0 +1,64 @@
+"""
+性能分析：profile=1 的请求全部在请求线程中执行，分析结果包含节点和OCR识别内部的函数
+"""
+import base64
+import io
+import threading
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import app as server
+from algorithms.ocr_providers import OCRBatcher, OCRProvider, OCRResult, run_inline
+from tiling import TilingOptions
+
+class ThreadRecordingProvider(OCRProvider):
+    def __init__(self):
+        self.threads = []
+
+    def is_available(self) -> bool:
+        return True
+
+    def get_name(self) -> str:
+        return 'thread-recording'
+
+    def recognize(self, image, **kwargs):
+        return self.recognize_batch([image])[0]
+
+    def recognize_batch(self, images, **kwargs):
+        self.threads.append(threading.current_thread())
+        return [OCRResult([], [], []) for _ in images]
+
+def test_run_inline_bypasses_batcher_thread():
+    provider = ThreadRecordingProvider()
+    batcher = OCRBatcher(provider, max_batch_size=8, max_wait_ms=0)
+    image = np.zeros((4, 4, 3), dtype=np.uint8)
+    with run_inline():
+        batcher.recognize(image)
+        batcher.recognize_batch([image, image])
+    assert provider.threads == [threading.current_thread()] * 2
+    assert batcher.stats()['batches'] == 0
+    batcher.recognize(image)
+    assert provider.threads[-1] is not threading.current_thread()
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setitem(server.app.config, 'ENABLE_PROFILING', True)
+    # 任意大小的图像都会分块执行
+    monkeypatch.setattr(server, 'TILING', TilingOptions(tile_size=32, min_pixels=0, pool=server.TILE_POOL))
+    return server.app.test_client()
+
+def test_profiled_request_runs_nodes_in_request_thread(client):
+    buffer = io.BytesIO()
+    Image.fromarray(np.random.default_rng(0).integers(0, 256, (96, 128, 3), dtype=np.uint8)).save(buffer, format='PNG')
+    nodes = [{'id': 'f', 'type': 'image_filter', 'data': {'parameters': {'filter_type': 'gaussian'}}},
+             {'id': 'e', 'type': 'edge_detection', 'data': {'parameters': {'method': 'sobel'}}}]
+    response = client.post('/api/execute', json={
+        'nodes': nodes, 'edges': [{'source': 'f', 'target': 'e'}], 'profile': 1, 'profileTop': 100000,
+        'inputImage': 'data:image/png;base64,' + base64.b64encode(buffer.getvalue()).decode()})
+    assert response.status_code == 200
+    functions = {(item['function'], item['file'].split(':')[0]) for item in response.get_json()['profile']['functions']}
+    assert ('execute', 'image_filter.py') in functions
+    assert ('execute', 'edge_detection.py') in functions
+    assert not any(name == 'run_tiled' for name, _ in functions)
@@ -0,0 +1,32 @@
+"""
+多进程部署：线程数和缓存预算的默认值按工作进程数均分，单独配置的值按每个进程生效
+"""
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+KEYS = ('WORKFLOW_MAX_WORKERS', 'NODE_CACHE_MAX_BYTES', 'IMAGE_CACHE_MAX_BYTES', 'BUFFER_POOL_MAX_BYTES')
+
+def app_config(**env):
+    """在子进程中按给定环境变量导入应用，返回相关配置"""
+    environ = {key: value for key, value in os.environ.items() if key not in KEYS + ('SERVER_WORKERS', )}
+    environ.update(env)
+    script = ('import json, app; print(json.dumps({key: app.app.config[key] for key in %r}))' % (KEYS, ))
+    output = subprocess.run([sys.executable, '-c', script], cwd=ROOT, env=environ, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def test_defaults_divided_by_worker_count():
+    single = app_config()
+    divided = app_config(SERVER_WORKERS='4')
+    assert divided['WORKFLOW_MAX_WORKERS'] == max(1, (os.cpu_count() or 4) // 4)
+    assert divided['NODE_CACHE_MAX_BYTES'] == single['NODE_CACHE_MAX_BYTES'] // 4
+    assert divided['IMAGE_CACHE_MAX_BYTES'] == single['IMAGE_CACHE_MAX_BYTES'] // 4
+    assert divided['BUFFER_POOL_MAX_BYTES'] == single['BUFFER_POOL_MAX_BYTES'] // 4
+
+def test_explicit_values_are_per_worker():
+    config = app_config(SERVER_WORKERS='4', WORKFLOW_MAX_WORKERS='3', NODE_CACHE_MAX_BYTES='1000')
+    assert config['WORKFLOW_MAX_WORKERS'] == 3
+    assert config['NODE_CACHE_MAX_BYTES'] == 1000
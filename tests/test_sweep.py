@@ -0,0 +1,94 @@
+"""
+参数扫描：节点划分、预计算结果的复用条件，以及每个取值的结果与单独执行该取值的工作流逐位一致
+"""
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+
+from algorithms import edge_detection, image_filter, image_segmentation, roi_extraction
+from sweep import parse_sweep_values
+from workflow_engine import (WorkflowError, compile_workflow, execute_plan, execute_sweep, expand_gray,
+                             sweep_partition, with_parameter)
+
+MODULES = {'image_filter': image_filter, 'edge_detection': edge_detection,
+           'image_segmentation': image_segmentation, 'roi_extraction': roi_extraction}
+
+def make_image(height=120, width=160):
+    rng = np.random.default_rng(7)
+    image = cv2.GaussianBlur(rng.integers(0, 256, (height, width, 3), dtype=np.uint8), (0, 0), 3)
+    return cv2.normalize(image, None, 0, 255, cv2.NORM_MINMAX)
+
+def build(nodes, edges, modules=MODULES):
+    return compile_workflow([{'id': node_id, 'type': kind, 'data': {'parameters': parameters}}
+                             for node_id, kind, parameters in nodes],
+                            [{'source': a, 'target': b} for a, b in edges], modules)
+
+def assert_sweep_matches(plan, image, target, name, values, **options):
+    swept = list(execute_sweep(plan, image, target, name, values, **options))
+    assert [value for value, _, _ in swept] == list(values)
+    for value, output, compact in swept:
+        expected = execute_plan(with_parameter(plan, target, name, value), image, **options)[plan.sink]
+        result = expand_gray(output) if compact else output
+        assert np.array_equal(result['image'], expected['image']), value
+
+def test_partition_splits_upstream_and_downstream():
+    plan = build([('a', 'image_filter', {}), ('b', 'edge_detection', {}), ('c', 'image_segmentation', {}),
+                  ('side', 'image_filter', {})],
+                 [('a', 'b'), ('b', 'c'), ('a', 'side')])
+    assert sweep_partition(plan, 'b') == (('a',), ('b', 'c'))
+    with pytest.raises(WorkflowError):
+        sweep_partition(plan, 'side')
+    with pytest.raises(WorkflowError):
+        sweep_partition(plan, 'missing')
+
+@pytest.mark.parametrize('edge, target, name, values', [
+    ({'method': 'canny'}, 'edge', 'threshold1', [0, 40, 90, 200]),
+    ({'method': 'canny'}, 'edge', 'threshold2', [60, 150, 255]),
+    ({'method': 'sobel'}, 'edge', 'threshold1', [10, 20]),
+    ({'method': 'sobel'}, 'seg', 'threshold_value', [0, 30, 31, 60, 254, 255, 300]),
+    ({'method': 'laplacian'}, 'edge', 'method', ['canny', 'sobel']),
+])
+def test_sweep_matches_per_value_execution(edge, target, name, values):
+    plan = build([('blur', 'image_filter', {'filter_type': 'gaussian', 'kernel_size': 5}),
+                  ('edge', 'edge_detection', edge),
+                  ('seg', 'image_segmentation', {'method': 'threshold', 'threshold_value': 60})],
+                 [('blur', 'edge'), ('edge', 'seg')])
+    assert_sweep_matches(plan, make_image(), target, name, values)
+
+def radius_blur():
+    """作用半径随参数变化、实现了 prepare_sweep 的局部运算（预计算时记住输入）"""
+    def execute(inputs, parameters):
+        size = 2 * int(parameters.get('radius', 1)) + 1
+        result = cv2.blur(inputs['image'], (size, size))
+        return {'image': result, 'output': result}
+
+    def prepare_sweep(inputs, parameters, name):
+        return lambda value: execute(inputs, dict(parameters, **{name: value}))
+
+    return SimpleNamespace(execute=execute, prepare_sweep=prepare_sweep,
+                           get_footprint=lambda parameters: int(parameters.get('radius', 1)),
+                           get_color_spec=lambda parameters: {'input': 'any', 'output': 'same'})
+
+def test_prepared_target_rebuilt_when_input_window_changes():
+    modules = dict(MODULES, radius_blur=radius_blur())
+    plan = build([('blur', 'radius_blur', {'radius': 1}),
+                  ('roi', 'roi_extraction', {'x': 40, 'y': 30, 'width': 50, 'height': 40})],
+                 [('blur', 'roi')], modules)
+    assert plan.pushdowns
+    assert_sweep_matches(plan, make_image(), 'blur', 'radius', [1, 4, 9, 4])
+
+@pytest.mark.parametrize('spec, expected', [
+    ([3, 1, 2], [3, 1, 2]),
+    ({'start': 0, 'stop': 10, 'step': 5}, [0, 5, 10]),
+    ({'start': 0.5, 'stop': 1.5, 'step': 0.5}, [0.5, 1.0, 1.5]),
+])
+def test_parse_sweep_values(spec, expected):
+    assert parse_sweep_values(spec, 16) == expected
+
+@pytest.mark.parametrize('spec', [[], {'start': 0}, {'start': 0, 'stop': 1, 'step': 0},
+                                  {'start': 0, 'stop': 100}, 'abc', list(range(17))])
+def test_parse_sweep_values_rejects_invalid(spec):
+    with pytest.raises(ValueError):
+        parse_sweep_values(spec, 16)
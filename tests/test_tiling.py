@@ -0,0 +1,81 @@
+"""
+分块执行：块切分、重叠边，以及分块结果与整图执行逐位一致
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from algorithms import edge_detection, image_filter, image_segmentation
+from benchmarks.common import synthetic_image
+from tiling import TilingOptions, module_footprint, run_tiled, should_tile, split_tiles
+from workflow_engine import compile_workflow, execute_plan, extract_image
+
+LOCAL_CASES = [
+    (image_filter, {'filter_type': 'blur', 'kernel_size': 5}),
+    (image_filter, {'filter_type': 'gaussian', 'kernel_size': 7}),
+    (image_filter, {'filter_type': 'median', 'kernel_size': 5}),
+    (edge_detection, {'method': 'sobel'}),
+    (edge_detection, {'method': 'laplacian'}),
+    (image_segmentation, {'method': 'threshold', 'threshold_value': 100}),
+]
+
+@pytest.fixture(scope='module', params=[3, 1], ids=['rgb', 'gray'])
+def image(request):
+    return synthetic_image(0.08, channels=request.param, seed=3)
+
+def test_split_tiles_cover_image_once():
+    tiles = split_tiles(70, 100, 32, 3)
+    coverage = np.zeros((70, 100), dtype=np.int32)
+    for tile in tiles:
+        y0, y1, x0, x1 = tile.inner
+        coverage[y0:y1, x0:x1] += 1
+        oy0, oy1, ox0, ox1 = tile.outer
+        assert (oy0, ox0) == (max(0, y0 - 3), max(0, x0 - 3))
+        assert (oy1, ox1) == (min(70, y1 + 3), min(100, x1 + 3))
+    assert len(tiles) == 3 * 4
+    assert np.all(coverage == 1)
+
+def test_global_operators_declare_no_footprint():
+    assert module_footprint(edge_detection, {'method': 'canny'}) is None
+    assert module_footprint(image_segmentation, {'method': 'watershed'}) is None
+    assert module_footprint(image_filter, {'filter_type': 'bilateral', 'kernel_size': 9}) is None
+    assert module_footprint(image_filter, {'filter_type': 'median', 'kernel_size': 4}) == 2
+
+def test_should_tile():
+    options = TilingOptions(tile_size=64, min_pixels=10_000)
+    large = np.zeros((200, 200), dtype=np.uint8)
+    assert should_tile(large, 2, options)
+    assert not should_tile(large, None, options)
+    assert not should_tile(large, 2, None)
+    assert not should_tile(np.zeros((50, 50), dtype=np.uint8), 2, options)
+
+@pytest.mark.parametrize('module, parameters', LOCAL_CASES)
+@pytest.mark.parametrize('tile_size', [37, 64])
+def test_tiled_matches_whole_image(image, module, parameters, tile_size):
+    halo = module_footprint(module, parameters)
+    whole = module.execute({'image': image}, parameters)['image']
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        for options in (TilingOptions(tile_size=tile_size, min_pixels=0),
+                        TilingOptions(tile_size=tile_size, min_pixels=0, pool=pool, max_in_flight=2)):
+            tiled, count = run_tiled(lambda tile: module.execute({'image': tile}, parameters)['image'],
+                                     image, halo, options)
+            assert count > 1
+            assert np.array_equal(tiled, whole)
+
+def test_tile_output_size_mismatch_rejected(image):
+    with pytest.raises(ValueError):
+        run_tiled(lambda tile: tile[1:], image, 1, TilingOptions(tile_size=64, min_pixels=0))
+
+def test_tiled_workflow_matches_untiled(image):
+    modules = {'image_filter': image_filter, 'edge_detection': edge_detection,
+               'image_segmentation': image_segmentation}
+    nodes = [{'id': 'f', 'type': 'image_filter', 'data': {'parameters': {'filter_type': 'gaussian', 'kernel_size': 5}}},
+             {'id': 'e', 'type': 'edge_detection', 'data': {'parameters': {'method': 'sobel'}}},
+             {'id': 's', 'type': 'image_segmentation', 'data': {'parameters': {'threshold_value': 40}}}]
+    plan = compile_workflow(nodes, [{'source': 'f', 'target': 'e'}, {'source': 'e', 'target': 's'}], modules)
+    expected = execute_plan(plan, image)[plan.sink]
+    stats = {}
+    result = execute_plan(plan, image, tiling=TilingOptions(tile_size=48, min_pixels=0), stats=stats)[plan.sink]
+    assert np.array_equal(extract_image(result), extract_image(expected))
+    assert all(node['tiles'] > 1 for node in stats['nodes'])
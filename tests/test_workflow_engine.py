@@ -0,0 +1,117 @@
+"""
+执行引擎：并行、缓存、分块、缓冲池和裁剪下推等执行方式的结果，与逐节点直接调用 execute 的串行执行逐位一致
+"""
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from algorithms import edge_detection, image_filter, image_registration, image_segmentation, roi_extraction
+from buffer_pool import BufferPool
+from caching import NodeOutputCache
+from tiling import TilingOptions
+from workflow_engine import (NodeExecutionError, compile_workflow, execute_plan, expand_gray, extract_image,
+                             gather_inputs)
+
+MODULES = {'image_filter': image_filter, 'edge_detection': edge_detection, 'image_segmentation': image_segmentation,
+           'image_registration': image_registration, 'roi_extraction': roi_extraction}
+
+PARAMETERS = {
+    'image_filter': [{'filter_type': filter_type, 'kernel_size': kernel_size}
+                     for filter_type in ('blur', 'gaussian', 'median', 'bilateral') for kernel_size in (3, 7)],
+    'edge_detection': [{'method': method} for method in ('canny', 'sobel', 'laplacian')],
+    'image_segmentation': [{'method': method} for method in ('threshold', 'canny', 'watershed')],
+    'image_registration': [{'angle': 17, 'scale': 0.9}],
+    'roi_extraction': [{'x': 40, 'y': 30, 'width': 120, 'height': 90}, {'x': 0, 'y': 0, 'width': 1000, 'height': 50}],
+}
+
+def random_workflow(rng: random.Random):
+    """随机生成的有向无环图（节点只连接到之前的节点，可能有多个上游和分支）"""
+    nodes, edges = [], []
+    for index in range(rng.randint(2, 6)):
+        algorithm = rng.choice(list(PARAMETERS))
+        nodes.append({'id': f'n{index}', 'type': algorithm,
+                      'data': {'parameters': dict(rng.choice(PARAMETERS[algorithm]))}})
+        if index:
+            for source in rng.sample(range(index), rng.randint(1, min(2, index))):
+                edges.append({'source': f'n{source}', 'target': f'n{index}'})
+    return nodes, edges
+
+def reference_outputs(plan, image):
+    """逐节点直接调用 execute 串行执行，声明输出灰度的节点立即把结果扩展为RGB（与模块内部转换颜色时一致）"""
+    outputs = {}
+    for node_id in plan.order:
+        plan_node = plan.nodes[node_id]
+        output = plan_node.module.execute(gather_inputs(plan_node, outputs, image), dict(plan_node.parameters))
+        outputs[node_id] = expand_gray(output) if plan_node.color_spec['output'] == 'gray' else output
+    return outputs
+
+@pytest.fixture(scope='module')
+def images():
+    generator = np.random.default_rng(0)
+    rgb = generator.integers(0, 256, (120, 160, 3), dtype=np.uint8)
+    return {'rgb': rgb, 'gray': rgb[:, :, 1].copy()}
+
+@pytest.fixture(scope='module')
+def pool():
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        yield executor
+
+MODES = {
+    'serial': lambda pool: {},
+    'parallel': lambda pool: {'pool': pool, 'max_parallel': 3},
+    'cache': lambda pool: {'cache': NodeOutputCache(max_bytes=1 << 26)},
+    'tiling': lambda pool: {'tiling': TilingOptions(tile_size=48, min_pixels=0)},
+    'buffers': lambda pool: {'buffers': BufferPool(max_bytes=1 << 26)},
+    'combined': lambda pool: {'pool': pool, 'max_parallel': 3, 'buffers': BufferPool(max_bytes=1 << 26),
+                              'tiling': TilingOptions(tile_size=48, min_pixels=0, pool=pool)},
+}
+
+@pytest.mark.parametrize('mode', list(MODES))
+def test_execution_modes_match_reference(images, pool, mode):
+    rng = random.Random(11)
+    for _ in range(30):
+        nodes, edges = random_workflow(rng)
+        plan = compile_workflow(nodes, edges, MODULES)
+        for image in images.values():
+            expected = reference_outputs(plan, image)
+            options = MODES[mode](pool)
+            # 每种方式执行两次：缓存命中、缓冲池复用数组时结果也必须不变；
+            # 只保留输出节点时中间输出被释放，且可能下推裁剪
+            for keep in (plan.order, plan.order, None, None):
+                result = execute_plan(plan, image, outputs=keep, **options)
+                assert set(keep or [plan.sink]) <= set(result)
+                for node_id in result:
+                    actual, wanted = extract_image(result[node_id]), extract_image(expected[node_id])
+                    assert actual.shape == wanted.shape, (mode, nodes, node_id)
+                    assert np.array_equal(actual, wanted), (mode, nodes, node_id)
+
+def test_sink_output_matches_reference_and_intermediates_released(images):
+    nodes = [{'id': 'f', 'type': 'image_filter', 'data': {'parameters': {'filter_type': 'gaussian'}}},
+             {'id': 'e', 'type': 'edge_detection', 'data': {'parameters': {'method': 'sobel'}}},
+             {'id': 's', 'type': 'image_segmentation', 'data': {'parameters': {}}}]
+    plan = compile_workflow(nodes, [{'source': 'f', 'target': 'e'}, {'source': 'e', 'target': 's'}], MODULES)
+    stats = {}
+    result = execute_plan(plan, images['rgb'], stats=stats)
+    assert list(result) == ['s']
+    assert np.array_equal(extract_image(result['s']), extract_image(reference_outputs(plan, images['rgb'])['s']))
+    assert stats['releasedOutputs'] == 2
+    assert [node['node'] for node in stats['nodes']] == ['f', 'e', 's']
+
+class _Failing:
+    @staticmethod
+    def execute(inputs, parameters):
+        raise RuntimeError(parameters['message'])
+
+def test_earliest_failing_node_reported(images, pool):
+    modules = dict(MODULES, failing=_Failing)
+    nodes = [{'id': 'a', 'type': 'failing', 'data': {'parameters': {'message': 'a'}}},
+             {'id': 'b', 'type': 'failing', 'data': {'parameters': {'message': 'b'}}},
+             {'id': 'c', 'type': 'image_filter', 'data': {'parameters': {}}}]
+    edges = [{'source': 'a', 'target': 'c'}, {'source': 'b', 'target': 'c'}]
+    plan = compile_workflow(nodes, edges, modules)
+    for options in ({}, {'pool': pool, 'max_parallel': 2}):
+        with pytest.raises(NodeExecutionError) as excinfo:
+            execute_plan(plan, images['rgb'], **options)
+        assert excinfo.value.node_id == plan.order[0]
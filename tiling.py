@@ -0,0 +1,113 @@
+"""
+大图分块执行
+算法模块通过 get_footprint(parameters) 声明空间作用半径：输出像素只取决于输入中该半径内的像素
+（逐像素运算为0），返回 None 表示全局运算（Otsu、分水岭、Canny的滞后连接、几何变换等）。
+局部运算可以把图像切成带重叠边（halo）的块并行处理，再把每块的内部区域拼回整图，
+结果与整图处理逐位一致；块的临时内存只与块大小有关。
+"""
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Deque, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+class TilingOptions(NamedTuple):
+    """分块执行配置"""
+    tile_size: int = 1024            # 块的边长（不含重叠边）
+    min_pixels: int = 16_000_000     # 像素数达到该值的图像才分块
+    pool: Optional[Executor] = None  # 块执行线程池（为 None 时在当前线程逐块执行）
+    max_in_flight: int = 4           # 同时提交的块数上限（限制未拼接的块结果占用的内存）
+
+class Tile(NamedTuple):
+    """一个块：inner 为该块负责输出的区域，outer 为加上重叠边后实际输入的区域（均为 y0, y1, x0, x1）"""
+    inner: Tuple[int, int, int, int]
+    outer: Tuple[int, int, int, int]
+
+def module_footprint(module: Any, parameters: Any) -> Optional[int]:
+    """读取模块声明的作用半径，未声明或声明无效时按全局运算处理"""
+    get_footprint = getattr(module, 'get_footprint', None)
+    if get_footprint is None:
+        return None
+    try:
+        footprint = get_footprint(parameters)
+    except Exception:
+        return None
+    if footprint is None or int(footprint) < 0:
+        return None
+    return int(footprint)
+
+def split_tiles(height: int, width: int, tile_size: int, halo: int) -> List[Tile]:
+    """按行优先顺序切分块，重叠边在图像边界处截断（图像边界仍由算法自身的边界处理方式决定）"""
+    tiles = []
+    for y0 in range(0, height, tile_size):
+        y1 = min(y0 + tile_size, height)
+        for x0 in range(0, width, tile_size):
+            x1 = min(x0 + tile_size, width)
+            tiles.append(Tile((y0, y1, x0, x1),
+                              (max(0, y0 - halo), min(height, y1 + halo),
+                               max(0, x0 - halo), min(width, x1 + halo))))
+    return tiles
+
+def should_tile(image: Any, footprint: Optional[int], options: Optional[TilingOptions]) -> bool:
+    """局部运算且图像足够大时才分块（块数不足2时没有意义）"""
+    if options is None or footprint is None or not isinstance(image, np.ndarray) or image.ndim not in (2, 3):
+        return False
+    height, width = image.shape[:2]
+    return height * width >= options.min_pixels and (height > options.tile_size or width > options.tile_size)
+
+def run_tiled(func: Callable[[np.ndarray], np.ndarray], image: np.ndarray, halo: int,
+              options: TilingOptions) -> Tuple[np.ndarray, int]:
+    """
+    分块执行局部运算并拼接结果
+
+    Args:
+        func: 对单个块（含重叠边）执行运算，返回与输入块同宽高的图像
+        image: 输入图像
+        halo: 重叠边宽度（算法的作用半径）
+        options: 分块配置
+
+    Returns:
+        (拼接后的输出图像, 块数)
+
+    Raises:
+        ValueError: 块的输出尺寸与输入不一致（模块声明的作用半径与实际行为不符）
+    """
+    height, width = image.shape[:2]
+    tiles = split_tiles(height, width, options.tile_size, halo)
+    output: Optional[np.ndarray] = None
+
+    def process(tile: Tile) -> np.ndarray:
+        oy0, oy1, ox0, ox1 = tile.outer
+        return func(image[oy0:oy1, ox0:ox1])
+
+    def place(tile: Tile, result: np.ndarray):
+        nonlocal output
+        oy0, oy1, ox0, ox1 = tile.outer
+        if not isinstance(result, np.ndarray) or result.shape[:2] != (oy1 - oy0, ox1 - ox0):
+            raise ValueError(f'分块输出尺寸 {getattr(result, "shape", None)} 与输入块 '
+                             f'{(oy1 - oy0, ox1 - ox0)} 不一致，该算法不能分块执行')
+        if output is None:
+            output = np.empty((height, width) + result.shape[2:], dtype=result.dtype)
+        y0, y1, x0, x1 = tile.inner
+        output[y0:y1, x0:x1] = result[y0 - oy0:y1 - oy0, x0 - ox0:x1 - ox0]
+
+    if options.pool is None:
+        for tile in tiles:
+            place(tile, process(tile))
+        return output, len(tiles)
+
+    # 滑动窗口提交：最多 max_in_flight 个块在执行或等待拼接
+    in_flight: Deque[Tuple[Tile, Future]] = deque()
+    try:
+        for tile in tiles:
+            while len(in_flight) >= max(1, options.max_in_flight):
+                done_tile, future = in_flight.popleft()
+                place(done_tile, future.result())
+            in_flight.append((tile, options.pool.submit(process, tile)))
+        while in_flight:
+            done_tile, future = in_flight.popleft()
+            place(done_tile, future.result())
+    finally:
+        for _, future in in_flight:
+            future.cancel()
+    return output, len(tiles)
@@ -0,0 +1,967 @@
+"""
+工作流引擎
+负责工作流的校验、编译（生成不可变的执行计划）以及按执行计划运行节点
+"""
+import copy
+import hashlib
+import heapq
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, FIRST_COMPLETED, wait
+from types import MappingProxyType
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Any, Optional, NamedTuple, Set, Tuple
+
+import cv2
+import numpy as np
+
+from buffer_pool import BufferPool
+from caching import NodeOutputCache, hash_array, value_nbytes
+from tiling import TilingOptions, module_footprint, run_tiled, should_tile
+
+# ==================== 异常 ====================
+
+class WorkflowError(ValueError):
+    """工作流定义无效（节点/边引用错误、存在环、算法不存在等）"""
+    pass
+
+class NodeExecutionError(RuntimeError):
+    """节点执行失败"""
+    def __init__(self, node_id: str, message: str):
+        super().__init__(message)
+        self.node_id = node_id
+
+# ==================== 执行计划 ====================
+
+class PlanNode(NamedTuple):
+    """执行计划中的单个节点（编译后不可变）"""
+    id: str
+    algorithm: str
+    module: Any
+    parameters: MappingProxyType
+    sources: Tuple[str, ...]      # 上游节点（按边的定义顺序，后者覆盖前者）
+    consumers: Tuple[str, ...]    # 下游节点
+    signature: str                # 节点签名（算法、参数及全部上游链路的哈希），用于输出缓存
+    color_spec: MappingProxyType  # 输入/输出颜色空间声明（见 module_color_spec）
+    input_window: Optional[Tuple[int, int, int, int]] = None  # 只读取原始图像的该区域（裁剪下推时设置）
+
+class CropPushdown(NamedTuple):
+    """可提前执行的裁剪：裁剪节点上游是从原始图像开始的局部运算链"""
+    crop: str                     # 裁剪节点
+    chain: Tuple[str, ...]        # 上游局部运算链（按执行顺序，第一个节点读取原始图像）
+    halo: int                     # 链上各节点作用半径之和
+
+class ExecutionPlan(NamedTuple):
+    """编译后的执行计划"""
+    plan_id: str
+    order: Tuple[str, ...]                 # 拓扑执行顺序
+    nodes: MappingProxyType                # node_id -> PlanNode
+    sink: str                              # 默认输出节点
+    workflow: Dict[str, Any]               # 规范化的工作流定义（可序列化，供子进程重新编译）
+    pushdowns: Tuple[CropPushdown, ...] = ()  # 可提前执行的裁剪（执行时按图像尺寸绑定）
+
+    def describe(self) -> Dict[str, Any]:
+        """返回可序列化的计划描述"""
+        return {
+            'workflowId': self.plan_id,
+            'order': list(self.order),
+            'sink': self.sink,
+            'nodes': [
+                {
+                    'id': node_id,
+                    'type': self.nodes[node_id].algorithm,
+                    'sources': list(self.nodes[node_id].sources),
+                    'consumers': list(self.nodes[node_id].consumers)
+                }
+                for node_id in self.order
+            ],
+            'pushdowns': [
+                {'crop': pushdown.crop, 'chain': list(pushdown.chain), 'halo': pushdown.halo}
+                for pushdown in self.pushdowns
+            ]
+        }
+
+def _check_structure(nodes: Any, edges: Any):
+    """
+    校验节点和边的类型（在计算工作流ID和编译前调用，无效定义统一报告为 WorkflowError）
+
+    Raises:
+        WorkflowError: 工作流定义无效
+    """
+    if not isinstance(nodes, list) or not isinstance(edges, list):
+        raise WorkflowError('nodes 和 edges 必须是列表')
+    for node in nodes:
+        if not isinstance(node, dict) or node.get('id') in (None, ''):
+            raise WorkflowError('节点缺少 id')
+        data = node.get('data') or {}
+        if not isinstance(data, dict) or not isinstance(data.get('parameters') or {}, dict):
+            raise WorkflowError(f'节点 {node["id"]} 的参数定义无效')
+    for edge in edges:
+        if not isinstance(edge, dict):
+            raise WorkflowError('边定义无效')
+
+def _canonical_graph(nodes: List[Dict], edges: List[Dict]) -> Dict[str, Any]:
+    """
+    提取与执行相关的图结构（忽略节点坐标等界面信息）
+
+    节点和边的 id 与 compile_workflow 一样转为字符串，原始定义和编译后保存的规范化定义得到相同的工作流ID
+
+    Raises:
+        WorkflowError: 工作流定义无效
+    """
+    _check_structure(nodes, edges)
+    return {
+        'nodes': [
+            [str(n.get('id')), n.get('type'), (n.get('data') or {}).get('parameters') or {}]
+            for n in nodes
+        ],
+        'edges': [[str(e.get('source')), str(e.get('target'))] for e in edges]
+    }
+
+def _canonical_json(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False,
+                      separators=(',', ':'), default=str)
+
+def workflow_id(nodes: List[Dict], edges: List[Dict]) -> str:
+    """
+    根据图结构计算工作流ID（相同的图得到相同的ID）
+
+    Raises:
+        WorkflowError: 工作流定义无效
+    """
+    canonical = _canonical_json(_canonical_graph(nodes, edges))
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:16]
+
+def topological_order(node_ids: List[str], edges: List[Tuple[str, str]]) -> List[str]:
+    """
+    拓扑排序，确定节点执行顺序
+
+    Raises:
+        WorkflowError: 图中存在环
+    """
+    graph = {node_id: [] for node_id in node_ids}
+    in_degree = {node_id: 0 for node_id in node_ids}
+    for source, target in edges:
+        graph[source].append(target)
+        in_degree[target] += 1
+
+    # 找到所有入度为0的节点
+    queue = [node_id for node_id in node_ids if in_degree[node_id] == 0]
+    result = []
+    head = 0
+    while head < len(queue):
+        node_id = queue[head]
+        head += 1
+        result.append(node_id)
+        for neighbor in graph[node_id]:
+            in_degree[neighbor] -= 1
+            if in_degree[neighbor] == 0:
+                queue.append(neighbor)
+
+    if len(result) < len(node_ids):
+        cyclic = [node_id for node_id in node_ids if in_degree[node_id] > 0]
+        raise WorkflowError(f'工作流中存在环，涉及节点: {", ".join(cyclic)}')
+    return result
+
+def compile_workflow(nodes: List[Dict], edges: List[Dict],
+                     modules: Dict[str, Any]) -> ExecutionPlan:
+    """
+    校验工作流并编译为执行计划
+
+    Args:
+        nodes: 节点列表，每个节点包含 id、type、data.parameters
+        edges: 边列表，每条边包含 source、target
+        modules: 算法模块注册表（算法名 -> 模块）
+
+    Returns:
+        ExecutionPlan: 不可变的执行计划
+
+    Raises:
+        WorkflowError: 工作流定义无效
+    """
+    _check_structure(nodes, edges)
+    if not nodes:
+        raise WorkflowError('工作流中没有节点')
+
+    node_ids = []
+    node_defs = {}
+    for node in nodes:
+        node_id = str(node['id'])
+        if node_id in node_defs:
+            raise WorkflowError(f'节点 id 重复: {node_id}')
+        algorithm_name = node.get('type')
+        if algorithm_name not in modules:
+            raise WorkflowError(f'算法 {algorithm_name} 不存在')
+        node_ids.append(node_id)
+        node_defs[node_id] = node
+
+    edge_pairs = []
+    for edge in edges:
+        source = str(edge.get('source'))
+        target = str(edge.get('target'))
+        if source not in node_defs or target not in node_defs:
+            raise WorkflowError(f'边引用了不存在的节点: {source} -> {target}')
+        edge_pairs.append((source, target))
+
+    order = topological_order(node_ids, edge_pairs)
+
+    sources = {node_id: [] for node_id in node_ids}
+    consumers = {node_id: [] for node_id in node_ids}
+    for source, target in edge_pairs:
+        sources[target].append(source)
+        if target not in consumers[source]:
+            consumers[source].append(target)
+
+    # 按拓扑顺序编译，保证上游节点的签名先于下游计算
+    plan_nodes = {}
+    for node_id in order:
+        node = node_defs[node_id]
+        parameters = copy.deepcopy((node.get('data') or {}).get('parameters') or {})
+        signature_source = _canonical_json([
+            node['type'], parameters,
+            [plan_nodes[source_id].signature for source_id in sources[node_id]]
+        ])
+        plan_nodes[node_id] = PlanNode(
+            id=node_id,
+            algorithm=node['type'],
+            module=modules[node['type']],
+            parameters=MappingProxyType(parameters),
+            sources=tuple(sources[node_id]),
+            consumers=tuple(consumers[node_id]),
+            signature=hashlib.sha1(signature_source.encode('utf-8')).hexdigest(),
+            color_spec=MappingProxyType(module_color_spec(modules[node['type']], parameters))
+        )
+
+    # 没有下游的第一个节点作为默认输出（无环图中一定存在）
+    sink = next(node_id for node_id in node_ids if not consumers[node_id])
+
+    workflow = {
+        'nodes': [
+            {'id': node_id, 'type': plan_nodes[node_id].algorithm,
+             'data': {'parameters': copy.deepcopy(dict(plan_nodes[node_id].parameters))}}
+            for node_id in node_ids
+        ],
+        'edges': [{'source': source, 'target': target} for source, target in edge_pairs]
+    }
+
+    return ExecutionPlan(
+        plan_id=workflow_id(nodes, edges),
+        order=tuple(order),
+        nodes=MappingProxyType(plan_nodes),
+        sink=sink,
+        workflow=workflow,
+        pushdowns=find_crop_pushdowns(plan_nodes)
+    )
+
+# ==================== 裁剪下推 ====================
+
+def find_crop_pushdowns(plan_nodes: Dict[str, PlanNode]) -> Tuple[CropPushdown, ...]:
+    """
+    查找可以提前执行的裁剪
+
+    裁剪节点（模块实现了 get_crop 和 crop_parameters）只有一个上游，且上游一直到原始图像都是
+    声明了作用半径的局部运算、每个节点只有一个下游时，链上的节点只需处理裁剪区域加上
+    各节点作用半径之和的重叠边，结果与整图处理后再裁剪逐位一致。
+    """
+    pushdowns = []
+    for node in plan_nodes.values():
+        if not (hasattr(node.module, 'get_crop') and hasattr(node.module, 'crop_parameters')):
+            continue
+        if len(set(node.sources)) != 1:
+            continue
+        chain = []
+        halo = 0
+        current = plan_nodes[node.sources[0]]
+        while True:
+            footprint = module_footprint(current.module, current.parameters)
+            if footprint is None or len(current.consumers) != 1:
+                chain = []
+                break
+            chain.append(current.id)
+            halo += footprint
+            if not current.sources:
+                break
+            if len(set(current.sources)) != 1:
+                chain = []
+                break
+            current = plan_nodes[current.sources[0]]
+        if chain:
+            pushdowns.append(CropPushdown(crop=node.id, chain=tuple(reversed(chain)), halo=halo))
+    return tuple(pushdowns)
+
+def bind_crop_pushdowns(plan: ExecutionPlan, shape: Tuple[int, ...], keep: Set[str]) -> ExecutionPlan:
+    """
+    按输入图像尺寸绑定裁剪下推，返回改写后的执行计划
+
+    链的第一个节点只读取原始图像中裁剪区域加重叠边的部分，链上节点的缓存签名加上该区域；
+    裁剪节点改为从缩小后的图像中截取同一区域，输出（及缓存签名）不变。
+    链上节点的输出需要保留、裁剪区域为空或重叠边已覆盖整图时不下推。
+    """
+    height, width = shape[:2]
+    nodes = dict(plan.nodes)
+    for pushdown in plan.pushdowns:
+        if keep.intersection(pushdown.chain):
+            continue
+        crop_node = plan.nodes[pushdown.crop]
+        try:
+            window = crop_node.module.get_crop(crop_node.parameters, shape)
+        except Exception:
+            continue
+        if window is None:
+            continue
+        y0, y1, x0, x1 = window
+        halo = pushdown.halo
+        outer = (max(0, y0 - halo), min(height, y1 + halo), max(0, x0 - halo), min(width, x1 + halo))
+        if outer == (0, height, 0, width):
+            continue
+        suffix = '@' + ','.join(str(value) for value in outer)
+        for index, node_id in enumerate(pushdown.chain):
+            nodes[node_id] = nodes[node_id]._replace(signature=nodes[node_id].signature + suffix,
+                                                     input_window=outer if index == 0 else None)
+        inner = (y0 - outer[0], y1 - outer[0], x0 - outer[2], x1 - outer[2])
+        nodes[pushdown.crop] = crop_node._replace(
+            parameters=MappingProxyType(crop_node.module.crop_parameters(crop_node.parameters, inner)))
+    return plan._replace(nodes=MappingProxyType(nodes))
+
+# ==================== 执行计划注册表 ====================
+
+class PlanRegistry:
+    """已编译执行计划的注册表（按最近使用淘汰）"""
+
+    def __init__(self, max_plans: int = 256):
+        self.max_plans = max_plans
+        self._plans: 'OrderedDict[str, ExecutionPlan]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, plan_id: str) -> Optional[ExecutionPlan]:
+        with self._lock:
+            plan = self._plans.get(plan_id)
+            if plan is not None:
+                self._plans.move_to_end(plan_id)
+            return plan
+
+    def register(self, plan: ExecutionPlan) -> ExecutionPlan:
+        with self._lock:
+            self._plans[plan.plan_id] = plan
+            self._plans.move_to_end(plan.plan_id)
+            while len(self._plans) > self.max_plans:
+                self._plans.popitem(last=False)
+        return plan
+
+    def remove(self, plan_id: str) -> bool:
+        with self._lock:
+            return self._plans.pop(plan_id, None) is not None
+
+    def get_or_compile(self, nodes: List[Dict], edges: List[Dict],
+                       modules: Dict[str, Any]) -> ExecutionPlan:
+        """
+        查找相同结构的已编译计划，不存在时编译并注册
+
+        Raises:
+            WorkflowError: 工作流定义无效
+        """
+        plan = self.get(workflow_id(nodes, edges))
+        if plan is None:
+            plan = self.register(compile_workflow(nodes, edges, modules))
+        return plan
+
+    def __len__(self):
+        return len(self._plans)
+
+# ==================== 执行 ====================
+
+# 未声明颜色空间的模块：输入需要原样的彩色图像，输出与输入一致
+DEFAULT_COLOR_SPEC = {'input': 'rgb', 'output': 'same'}
+
+def module_color_spec(module: Any, parameters: Any) -> Dict[str, str]:
+    """
+    读取模块声明的颜色空间 get_color_spec(parameters)，返回 {'input': ..., 'output': ...}
+
+    - input 为 'gray'（模块内部只使用灰度）或 'any'（逐通道运算，单通道输入的结果等于
+      三通道相同输入结果的任一通道）时，上游的单通道结果直接传入；为 'rgb' 时先扩展为三通道
+    - output 为 'gray' 时模块返回单通道图像，代表三个通道相同的RGB结果；为 'same' 时
+      输出与输入的颜色空间一致
+
+    未声明或声明无效时按 DEFAULT_COLOR_SPEC 处理。
+    """
+    get_color_spec = getattr(module, 'get_color_spec', None)
+    if get_color_spec is None:
+        return dict(DEFAULT_COLOR_SPEC)
+    try:
+        spec = dict(get_color_spec(parameters) or {})
+    except Exception:
+        return dict(DEFAULT_COLOR_SPEC)
+    if spec.get('input') not in ('gray', 'any', 'rgb'):
+        spec['input'] = DEFAULT_COLOR_SPEC['input']
+    if spec.get('output') not in ('gray', 'same'):
+        spec['output'] = DEFAULT_COLOR_SPEC['output']
+    return spec
+
+def expand_gray(output: Any) -> Any:
+    """把单通道的节点输出扩展为三通道RGB（字典中引用同一图像的键一起替换，不修改原输出）"""
+    image = extract_image(output)
+    if not isinstance(image, np.ndarray) or image.ndim != 2:
+        return output
+    expanded = cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
+    if isinstance(output, dict):
+        return {key: expanded if value is image else value for key, value in output.items()}
+    return expanded
+
+def extract_image(output: Any) -> Optional[np.ndarray]:
+    """从节点输出中提取图像（字典的 'image' 或 'output' 键，或直接为数组）"""
+    if isinstance(output, dict):
+        image = output.get('image')
+        if image is None:
+            image = output.get('output')
+        return image
+    if isinstance(output, np.ndarray):
+        return output
+    return None
+
+def image_source(plan_node: PlanNode, node_outputs: Dict[str, Any]) -> Optional[str]:
+    """节点的图像输入来源：最后一个有图像输出的上游节点，没有时返回 None（使用原始图像）"""
+    selected = None
+    for source_id in plan_node.sources:
+        source_output = node_outputs.get(source_id)
+        if source_output is not None and extract_image(source_output) is not None:
+            selected = source_id
+    return selected
+
+def gather_inputs(plan_node: PlanNode, node_outputs: Dict[str, Any],
+                  source_image: np.ndarray) -> Dict[str, Any]:
+    """收集节点输入：取最后一个有图像输出的上游节点，没有时使用原始图像"""
+    source_id = image_source(plan_node, node_outputs)
+    return {'image': source_image if source_id is None else extract_image(node_outputs[source_id])}
+
+def run_node(plan_node: PlanNode, inputs: Dict[str, Any]) -> Any:
+    """
+    执行单个节点
+
+    Raises:
+        NodeExecutionError: 节点执行出错或未返回结果
+    """
+    try:
+        result = plan_node.module.execute(inputs, plan_node.parameters)
+    except Exception as e:
+        raise NodeExecutionError(plan_node.id, f'执行节点 {plan_node.id} 时出错: {str(e)}') from e
+    if result is None:
+        raise NodeExecutionError(plan_node.id, f'节点 {plan_node.id} 执行后未返回结果')
+    return result
+
+def run_node_tiled(plan_node: PlanNode, inputs: Dict[str, Any], halo: int,
+                   tiling: TilingOptions) -> Tuple[Dict[str, Any], int]:
+    """
+    分块执行局部运算节点，结果与整图执行逐位一致
+
+    Returns:
+        (节点输出, 块数)
+
+    Raises:
+        NodeExecutionError: 节点执行出错
+    """
+    def process(tile: np.ndarray) -> np.ndarray:
+        output = extract_image(plan_node.module.execute({'image': tile}, plan_node.parameters))
+        if output is None:
+            raise ValueError('分块执行未返回图像')
+        return output
+
+    try:
+        image, tiles = run_tiled(process, inputs['image'], halo, tiling)
+    except Exception as e:
+        raise NodeExecutionError(plan_node.id, f'执行节点 {plan_node.id} 时出错: {str(e)}') from e
+    return {'image': image, 'output': image}, tiles
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+def current_rss() -> Optional[int]:
+    """当前进程的常驻内存（字节），无法获取时返回 None"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    if sys.platform == 'win32':
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class ProcessMemoryCounters(ctypes.Structure):
+                _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                            ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                            ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+            counters = ProcessMemoryCounters()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize
+        except Exception:
+            pass
+    return None
+
+def _output_arrays(output: Any) -> List[np.ndarray]:
+    """节点输出中的数组（字典的值或输出本身，同一数组只取一次）"""
+    if isinstance(output, dict):
+        return list({id(item): item for item in output.values() if isinstance(item, np.ndarray)}.values())
+    if isinstance(output, np.ndarray):
+        return [output]
+    return []
+
+def _root_array(array: np.ndarray) -> np.ndarray:
+    """视图所属的整块数组（不是视图时为数组本身）"""
+    while isinstance(array.base, np.ndarray):
+        array = array.base
+    return array
+
+class _OutputStore:
+    """
+    单次执行的节点输出存储
+
+    按执行计划统计每个输出剩余的下游消费者数，最后一个消费者读取输入后即释放该输出
+    （需要保留的输出节点除外），长链工作流的内存占用因此接近两份中间结果。
+
+    提供缓冲池时按所有权归还数组：本次执行新产生（owned）的输出中由缓冲池分配的数组，在读取它的所有
+    下游节点都执行完后归还（并行执行时最后收集输入的节点不一定最后完成）；仍被其他节点输出、正在执行的节点输入直接或以视图引用的数组不归还。
+    不归本次执行所有的输出（来自或存入节点输出缓存、参数扫描中所有取值共享的输出）中的数组在本次执行中都不归还。
+
+    同时记录哪些输出是代表RGB结果的单通道图像（compact）：下游声明需要 'rgb' 输入时才扩展，
+    保留的输出在 finish() 中扩展为三通道，对调用方与逐节点转换颜色时完全一致。
+
+    提供 upstream 时，其中的输出视为已执行完的节点（不在执行计划中），只读取、不释放也不回收。
+    """
+
+    def __init__(self, plan: ExecutionPlan, keep: Set[str], stats: Optional[Dict[str, Any]],
+                 buffers: Optional[BufferPool] = None, upstream: Optional['UpstreamOutputs'] = None):
+        self.plan = plan
+        self.keep = keep
+        self.buffers = buffers
+        self.reading: Dict[str, int] = {}
+        self.released: Dict[str, Any] = {}
+        self.recyclable: Dict[str, List[np.ndarray]] = {}
+        self.pinned: Dict[int, np.ndarray] = {}
+        self.outputs = {}
+        self.remaining = {node_id: len(plan.nodes[node_id].consumers) for node_id in plan.order}
+        self.stats = stats
+        self.live_bytes = 0
+        self.compact: Set[str] = set()
+        self.input_compact: Dict[str, bool] = {}
+        if upstream is not None:
+            self.outputs.update(upstream.outputs)
+            self.compact.update(upstream.compact)
+            self.keep = keep | set(upstream.outputs)
+            self.remaining.update({node_id: 0 for node_id in upstream.outputs})
+        if stats is not None:
+            stats['peakOutputBytes'] = 0
+            stats['peakRssBytes'] = current_rss()
+            stats['releasedOutputs'] = 0
+            stats['nodes'] = []
+
+    def take_inputs(self, plan_node: PlanNode, source_image: np.ndarray) -> Dict[str, Any]:
+        """收集节点输入（按节点的颜色空间声明决定是否扩展单通道输入），并释放已没有其他消费者的上游输出"""
+        source_id = image_source(plan_node, self.outputs)
+        if source_id is not None:
+            inputs = {'image': extract_image(self.outputs[source_id])}
+        elif plan_node.input_window is not None:
+            y0, y1, x0, x1 = plan_node.input_window
+            inputs = {'image': source_image[y0:y1, x0:x1]}
+        else:
+            inputs = {'image': source_image}
+        compact = source_id in self.compact
+        if compact and plan_node.color_spec['input'] == 'rgb':
+            inputs['image'] = expand_gray(inputs['image'])
+            compact = False
+        self.input_compact[plan_node.id] = compact
+        for source_id in set(plan_node.sources):
+            self.remaining[source_id] -= 1
+            if self.buffers is not None:
+                self.reading[source_id] = self.reading.get(source_id, 0) + 1
+            if self.remaining[source_id] == 0 and source_id not in self.keep:
+                released = self.outputs.pop(source_id, None)
+                if released is not None and self.stats is not None:
+                    self.live_bytes -= value_nbytes(released)
+                    self.stats['releasedOutputs'] += 1
+                if released is not None and self.buffers is not None:
+                    # 本节点及其他正在执行的下游节点还要读取该输出，都执行完后再归还
+                    self.released[source_id] = released
+        return inputs
+
+    def store(self, node_id: str, output: Any, owned: bool = True):
+        """
+        保存节点输出
+
+        Args:
+            owned: 输出是否由本次执行新产生、没有被其他对象（节点输出缓存、共享的扫描结果）持有
+        """
+        spec = self.plan.nodes[node_id].color_spec
+        image = extract_image(output)
+        if isinstance(image, np.ndarray) and image.ndim == 2 and (
+                spec['output'] == 'gray' or (spec['output'] == 'same' and self.input_compact.get(node_id))):
+            self.compact.add(node_id)
+        self.outputs[node_id] = output
+        if self.buffers is not None:
+            self._track(node_id, output, owned)
+        if self.stats is not None:
+            self.live_bytes += value_nbytes(output)
+            self.stats['peakOutputBytes'] = max(self.stats['peakOutputBytes'], self.live_bytes)
+            rss = current_rss()
+            if rss is not None:
+                self.stats['peakRssBytes'] = max(self.stats['peakRssBytes'] or 0, rss)
+
+    def _track(self, node_id: str, output: Any, owned: bool):
+        """记录输出中可归还的数组，并归还所有下游节点都已执行完的上游输出中不再使用的数组"""
+        arrays = _output_arrays(output)
+        if owned:
+            self.recyclable[node_id] = [array for array in arrays if self.buffers.owns(array)]
+        else:
+            for array in arrays:
+                root = _root_array(array)
+                self.pinned[id(root)] = root
+        finished = []
+        for source_id in set(self.plan.nodes[node_id].sources):
+            self.reading[source_id] -= 1
+            if self.reading[source_id] == 0 and source_id in self.released:
+                del self.released[source_id]
+                finished.append(source_id)
+        if not finished:
+            return
+        # 仍保存的输出和仍有下游节点在读取的输出（含其中的视图）引用的数组不归还
+        in_use = set(self.pinned)
+        for value in list(self.outputs.values()) + list(self.released.values()):
+            in_use.update(id(_root_array(array)) for array in _output_arrays(value))
+        for source_id in finished:
+            for array in self.recyclable.pop(source_id, ()):
+                if id(array) not in in_use:
+                    self.buffers.release(array)
+                    in_use.add(id(array))
+
+    def finish(self) -> Dict[str, Any]:
+        """返回保留的输出，代表RGB结果的单通道输出在此扩展为三通道"""
+        return {node_id: expand_gray(output) if node_id in self.compact else output
+                for node_id, output in self.outputs.items()}
+
+def execute_plan(plan: ExecutionPlan, image: np.ndarray,
+                 pool: Optional[Executor] = None, max_parallel: int = 1,
+                 cache: Optional[NodeOutputCache] = None,
+                 image_digest: Optional[str] = None,
+                 on_event: Optional[Callable[[str, str, Dict[str, Any]], None]] = None,
+                 outputs: Optional[Iterable[str]] = None,
+                 stats: Optional[Dict[str, Any]] = None,
+                 tiling: Optional[TilingOptions] = None,
+                 pushdown: bool = True,
+                 buffers: Optional[BufferPool] = None) -> Dict[str, Any]:
+    """
+    按执行计划运行工作流
+
+    所有上游节点完成后节点即进入就绪状态，就绪节点提交到线程池并行执行；
+    每个节点的输入只取决于其上游输出，因此结果与串行执行完全一致。
+    中间结果在最后一个下游节点读取后立即释放，只保留 outputs 指定的节点输出。
+    声明了颜色空间的模块之间以单通道图像传递，只在需要RGB的下游节点和返回结果时扩展。
+
+    Args:
+        plan: 执行计划
+        image: 原始输入图像
+        pool: 线程池（为 None 时串行执行）
+        max_parallel: 本次请求最多同时执行的节点数
+        cache: 节点输出缓存（为 None 时不使用缓存）
+        image_digest: 输入图像的内容哈希（未提供时按需计算）
+        on_event: 节点事件回调 on_event(event, node_id, payload)，event 为 node_start
+                  或 node_end（payload 含 output、duration 秒数和 cached；output 为节点的原始输出，
+                  可能是代表RGB结果的单通道图像），可能在工作线程中调用
+        outputs: 需要保留输出的节点（默认为执行计划的输出节点）
+        stats: 如提供，写入执行统计：peakOutputBytes（同时持有的节点输出字节数峰值）、
+               peakRssBytes（节点完成时采样的进程常驻内存峰值）、releasedOutputs，
+               以及 nodes（按完成顺序的节点耗时：node、algorithm、durationMs、cached、tiles）
+        tiling: 分块执行配置（为 None 时不分块）；声明了作用半径的局部运算节点在输入图像
+                足够大时分块并行执行
+        pushdown: 是否提前执行裁剪（见 find_crop_pushdowns），链上节点只处理裁剪区域及重叠边，
+                  其中间输出（含 on_event 中的输出）是缩小后的图像
+        buffers: 缓冲池（为 None 时不复用数组）；整图执行的节点通过 inputs['buffers'] 取得输出和临时数组，
+                 中间输出在最后一个下游节点执行完后归还缓冲池（见 _OutputStore；使用 cache 时输出由缓存持有，
+                 不归还）。on_event 回调返回后不能继续持有 output 中的数组
+
+    Returns:
+        需要保留的节点输出（node_id -> 输出）
+
+    Raises:
+        NodeExecutionError: 节点执行失败（多个节点失败时取执行顺序最靠前的）
+    """
+    if cache is not None and image_digest is None:
+        image_digest = hash_array(image)
+    evaluate = _node_evaluator(cache, image_digest, on_event, stats, tiling, buffers)
+    keep = set(outputs) if outputs is not None else {plan.sink}
+    if pushdown and plan.pushdowns and isinstance(image, np.ndarray):
+        plan = bind_crop_pushdowns(plan, image.shape, keep)
+    store = _OutputStore(plan, keep, stats, buffers)
+    _schedule(plan, image, store, evaluate, pool, max_parallel)
+    return store.finish()
+
+def _node_evaluator(cache: Optional[NodeOutputCache], image_digest: Optional[str],
+                    on_event: Optional[Callable[[str, str, Dict[str, Any]], None]],
+                    stats: Optional[Dict[str, Any]], tiling: Optional[TilingOptions],
+                    buffers: Optional[BufferPool]) -> Callable[[PlanNode, Dict[str, Any]], Tuple[Any, bool]]:
+    """
+    生成执行单个节点的函数 evaluate(plan_node, inputs)：查找缓存、按需分块执行、记录耗时并发出事件
+
+    evaluate 返回 (输出, 是否归本次执行所有)：使用节点输出缓存时输出由缓存持有，不归本次执行所有
+    """
+    def evaluate(plan_node: PlanNode, inputs: Dict[str, Any]) -> Tuple[Any, bool]:
+        if on_event is not None:
+            on_event('node_start', plan_node.id, {})
+        start = time.perf_counter()
+        output = None
+        if cache is not None:
+            key = cache.make_key(image_digest, plan_node.signature)
+            output = cache.get(key)
+        cached = output is not None
+        tiles = 0
+        if output is None:
+            halo = module_footprint(plan_node.module, plan_node.parameters) if tiling is not None else None
+            if should_tile(inputs.get('image'), halo, tiling):
+                output, tiles = run_node_tiled(plan_node, inputs, halo, tiling)
+            else:
+                if buffers is not None:
+                    inputs['buffers'] = buffers
+                output = run_node(plan_node, inputs)
+            if cache is not None:
+                cache.put(key, output)
+        duration = time.perf_counter() - start
+        if stats is not None:
+            stats['nodes'].append({'node': plan_node.id, 'algorithm': plan_node.algorithm,
+                                   'durationMs': round(duration * 1000, 3), 'cached': cached, 'tiles': tiles})
+        if on_event is not None:
+            on_event('node_end', plan_node.id, {'output': output, 'cached': cached, 'duration': duration})
+        return output, cache is None
+
+    return evaluate
+
+def _schedule(plan: ExecutionPlan, image: np.ndarray, store: _OutputStore,
+              evaluate: Callable[[PlanNode, Dict[str, Any]], Tuple[Any, bool]],
+              pool: Optional[Executor], max_parallel: int):
+    """
+    按执行计划调度节点，输出写入 store（不在执行计划中的上游视为已完成）
+
+    Raises:
+        NodeExecutionError: 节点执行失败（多个节点失败时取执行顺序最靠前的）
+    """
+    if pool is None or max_parallel <= 1:
+        for node_id in plan.order:
+            plan_node = plan.nodes[node_id]
+            store.store(node_id, *evaluate(plan_node, store.take_inputs(plan_node, image)))
+        return
+
+    rank = {node_id: index for index, node_id in enumerate(plan.order)}
+    pending = {node_id: len({source_id for source_id in plan.nodes[node_id].sources if source_id in plan.nodes})
+               for node_id in plan.order}
+    ready = [rank[node_id] for node_id in plan.order if pending[node_id] == 0]
+    running = {}
+    errors = []
+
+    def complete(node_id: str, result: Tuple[Any, bool]):
+        store.store(node_id, *result)
+        for consumer_id in plan.nodes[node_id].consumers:
+            pending[consumer_id] -= 1
+            if pending[consumer_id] == 0:
+                heapq.heappush(ready, rank[consumer_id])
+
+    while ready or running:
+        if not errors:
+            # 只有一个就绪节点且没有其他节点在执行时，直接在当前线程执行
+            if len(ready) == 1 and not running:
+                plan_node = plan.nodes[plan.order[heapq.heappop(ready)]]
+                try:
+                    complete(plan_node.id, evaluate(plan_node, store.take_inputs(plan_node, image)))
+                except NodeExecutionError as e:
+                    errors.append(e)
+                continue
+            while ready and len(running) < max_parallel:
+                plan_node = plan.nodes[plan.order[heapq.heappop(ready)]]
+                running[pool.submit(evaluate, plan_node, store.take_inputs(plan_node, image))] = plan_node.id
+        if not running:
+            break
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            node_id = running.pop(future)
+            try:
+                complete(node_id, future.result())
+            except NodeExecutionError as e:
+                errors.append(e)
+        del done, future
+
+    if errors:
+        raise min(errors, key=lambda e: rank[e.node_id])
+
+# ==================== 参数扫描 ====================
+
+class UpstreamOutputs(NamedTuple):
+    """参数扫描中只计算一次的上游输出（节点的原始输出，compact 为其中代表RGB结果的单通道输出）"""
+    outputs: Dict[str, Any]
+    compact: FrozenSet[str]
+
+def sweep_partition(plan: ExecutionPlan, target: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """
+    划分参数扫描的节点（均按执行顺序）
+
+    Returns:
+        (fixed, varying)：varying 为目标节点及其全部下游，每个取值都要重新执行；
+        fixed 为 varying 的其余上游，只执行一次。与二者都无关的节点不影响输出，不执行
+
+    Raises:
+        WorkflowError: 目标节点不存在，或输出节点不在目标节点下游
+    """
+    if target not in plan.nodes:
+        raise WorkflowError(f'节点 {target} 不存在')
+    varying = {target}
+    for node_id in plan.order:
+        if node_id not in varying and varying.intersection(plan.nodes[node_id].sources):
+            varying.add(node_id)
+    if plan.sink not in varying:
+        raise WorkflowError(f'输出节点 {plan.sink} 不在节点 {target} 的下游，扫描该节点的参数不影响输出')
+    fixed = set()
+    stack = [source_id for node_id in varying for source_id in plan.nodes[node_id].sources]
+    while stack:
+        node_id = stack.pop()
+        if node_id not in varying and node_id not in fixed:
+            fixed.add(node_id)
+            stack.extend(plan.nodes[node_id].sources)
+    return (tuple(node_id for node_id in plan.order if node_id in fixed),
+            tuple(node_id for node_id in plan.order if node_id in varying))
+
+def _subplan(plan: ExecutionPlan, node_ids: Iterable[str]) -> ExecutionPlan:
+    """只包含指定节点的执行计划：下游列表只保留其中的节点，裁剪下推只保留整条链和裁剪节点都在其中的"""
+    selected = set(node_ids)
+    nodes = {node_id: plan.nodes[node_id]._replace(
+                 consumers=tuple(consumer_id for consumer_id in plan.nodes[node_id].consumers
+                                 if consumer_id in selected))
+             for node_id in plan.order if node_id in selected}
+    pushdowns = tuple(pushdown for pushdown in plan.pushdowns
+                      if pushdown.crop in selected and selected.issuperset(pushdown.chain))
+    return plan._replace(order=tuple(node_id for node_id in plan.order if node_id in selected),
+                         nodes=MappingProxyType(nodes), pushdowns=pushdowns)
+
+def with_parameter(plan: ExecutionPlan, node_id: str, name: str, value: Any) -> ExecutionPlan:
+    """重新编译修改了一个节点参数的执行计划（下游节点的签名和颜色空间随之更新）"""
+    nodes = copy.deepcopy(plan.workflow['nodes'])
+    for node in nodes:
+        if node['id'] == node_id:
+            node['data']['parameters'][name] = value
+    modules = {plan_node.algorithm: plan_node.module for plan_node in plan.nodes.values()}
+    return compile_workflow(nodes, plan.workflow['edges'], modules)
+
+def _prepare_sweep(plan_node: PlanNode, inputs: Dict[str, Any], name: str) -> Optional[Callable[[Any], Any]]:
+    """
+    调用模块的 prepare_sweep(inputs, parameters, name)：模块预先计算与该参数无关的部分，
+    返回 run(value)（参数取 value 时的输出，与 execute() 逐位一致）；未实现或不支持该参数时返回 None
+
+    Raises:
+        NodeExecutionError: 预计算出错
+    """
+    prepare = getattr(plan_node.module, 'prepare_sweep', None)
+    if prepare is None:
+        return None
+    try:
+        run = prepare(inputs, plan_node.parameters, name)
+    except Exception as e:
+        raise NodeExecutionError(plan_node.id, f'执行节点 {plan_node.id} 时出错: {str(e)}') from e
+    if run is None:
+        return None
+
+    def run_value(value: Any) -> Any:
+        try:
+            output = run(value)
+        except Exception as e:
+            raise NodeExecutionError(plan_node.id, f'执行节点 {plan_node.id} 时出错: {str(e)}') from e
+        if output is None:
+            raise NodeExecutionError(plan_node.id, f'节点 {plan_node.id} 执行后未返回结果')
+        return output
+
+    return run_value
+
+def execute_sweep(plan: ExecutionPlan, image: np.ndarray, target: str, name: str, values: Iterable[Any],
+                  pool: Optional[Executor] = None, max_parallel: int = 1,
+                  cache: Optional[NodeOutputCache] = None,
+                  image_digest: Optional[str] = None,
+                  stats: Optional[Dict[str, Any]] = None,
+                  tiling: Optional[TilingOptions] = None,
+                  pushdown: bool = True,
+                  buffers: Optional[BufferPool] = None) -> Iterator[Tuple[Any, Any, bool]]:
+    """
+    参数扫描：目标节点的参数 name 依次取 values 中的值，逐个返回输出节点的结果
+
+    目标节点的上游（见 sweep_partition）只执行一次，其输出在所有取值间共享；每个取值只重新执行
+    目标节点及其下游（不使用节点输出缓存，避免扫描结果挤占缓存）。模块实现了 prepare_sweep 时，
+    目标节点与参数无关的部分（灰度转换、梯度等）也只计算一次。取值逐个执行，同时只持有一个取值的中间结果。
+
+    Args:
+        plan: 执行计划
+        image: 原始输入图像
+        target: 目标节点
+        name: 扫描的参数名
+        values: 参数取值
+        pool、max_parallel、cache、image_digest、tiling、pushdown、buffers: 同 execute_plan（cache 只用于上游）
+        stats: 如提供，写入上游执行的统计（同 execute_plan），以及 upstreamMs（上游执行耗时）和
+               valueMs（按取值顺序追加的每个取值的执行耗时）
+
+    Yields:
+        (取值, 输出节点的原始输出, 是否为代表RGB结果的单通道图像)
+
+    Raises:
+        WorkflowError: 目标节点不存在或输出节点不在其下游
+        NodeExecutionError: 节点执行失败
+    """
+    fixed, varying = sweep_partition(plan, target)
+    frontier = {source_id for node_id in varying for source_id in plan.nodes[node_id].sources
+                if source_id not in varying}
+    if cache is not None and image_digest is None:
+        image_digest = hash_array(image)
+
+    start = time.perf_counter()
+    upstream_plan = _subplan(plan, fixed)
+    if pushdown and upstream_plan.pushdowns and isinstance(image, np.ndarray):
+        upstream_plan = bind_crop_pushdowns(upstream_plan, image.shape, frontier)
+    store = _OutputStore(upstream_plan, frontier, stats, buffers)
+    _schedule(upstream_plan, image, store, _node_evaluator(cache, image_digest, None, stats, tiling, buffers),
+              pool, max_parallel)
+    upstream = UpstreamOutputs(outputs=dict(store.outputs), compact=frozenset(store.compact & frontier))
+    del store
+    if stats is not None:
+        stats['upstreamMs'] = round((time.perf_counter() - start) * 1000, 3)
+        stats['valueMs'] = []
+
+    evaluate = _node_evaluator(None, None, None, None, tiling, buffers)
+    # 目标节点的上游输出在取值间不变，其输入只取决于读取的原始图像区域（裁剪下推，随作用半径和裁剪区域变化）
+    # 和是否扩展为RGB（随颜色空间声明变化）；预计算结果按二者缓存，只保留最近一个
+    prepared: Dict[Any, Optional[Callable[[Any], Any]]] = {}
+
+    def evaluate_value(plan_node: PlanNode, inputs: Dict[str, Any]) -> Tuple[Any, bool]:
+        if plan_node.id != target:
+            return evaluate(plan_node, inputs)
+        key = (plan_node.input_window, plan_node.color_spec['input'])
+        if key not in prepared:
+            prepared.clear()
+            if buffers is not None:
+                inputs['buffers'] = buffers
+            prepared[key] = _prepare_sweep(plan_node, inputs, name)
+        if prepared[key] is None:
+            return evaluate(plan_node, inputs)
+        # 预计算的输出可能在取值之间共享（如参数不影响结果时），不归单个取值的执行所有
+        return prepared[key](plan_node.parameters.get(name)), False
+
+    for value in values:
+        start = time.perf_counter()
+        value_plan = _subplan(with_parameter(plan, target, name, value), varying)
+        if pushdown and value_plan.pushdowns and isinstance(image, np.ndarray):
+            value_plan = bind_crop_pushdowns(value_plan, image.shape, {plan.sink})
+        store = _OutputStore(value_plan, {plan.sink}, None, buffers, upstream)
+        _schedule(value_plan, image, store, evaluate_value, pool, max_parallel)
+        output, compact = store.outputs[plan.sink], plan.sink in store.compact
+        del store
+        if stats is not None:
+            stats['valueMs'].append(round((time.perf_counter() - start) * 1000, 3))
+        yield value, output, compact
+        output = None